@@ -0,0 +1,367 @@
+"""
+Generates synthetic 3dmigoto frame dump of configurable size, doesn't require Blender:
+
+    python generate_dump.py OUTPUT_FOLDER --objects 1 --components 8 --vertices 20000 --textures 4
+
+Dump mimics EFMI draw chain: every object is skinned by compute shader call (SKELETON_CS_0) writing bones to u0,
+which is then read as vs-t0 by draw calls of its components (DRAW_VS) along with IB, VB0-VB2 and ps-t0..tN textures.
+Each component is drawn with `--passes` calls sharing the same buffers, like it happens for outline and shadow passes.
+"""
+import os
+import sys
+import struct
+import argparse
+import numpy
+
+from pathlib import Path
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+# (SemanticName, SemanticIndex, Format, InputSlot, AlignedByteOffset, numpy type, values count)
+VB_ELEMENTS = [
+    ('POSITION', 0, 'R32G32B32_FLOAT', 0, 0, numpy.float32, 3),
+    ('NORMAL', 0, 'R32_FLOAT', 0, 12, numpy.uint32, 1),
+    ('TEXCOORD', 0, 'R32G32_FLOAT', 1, 0, numpy.float32, 2),
+    ('TEXCOORD', 4, 'R8G8B8A8_SNORM', 1, 8, numpy.int8, 4),
+    ('BLENDWEIGHTS', 0, 'R16G16B16A16_UNORM', 2, 0, numpy.uint16, 4),
+    ('BLENDINDICES', 0, 'R8G8B8A8_UINT', 2, 8, numpy.uint8, 4),
+]
+
+VB_STRIDES = {0: 16, 1: 12, 2: 12}
+
+DXGI_FORMAT_R16_UINT = 57
+
+BONE_BYTE_SIZE = 48
+
+
+@dataclass
+class DumpSpec:
+    objects: int = 1
+    components: int = 8
+    vertices: int = 20000
+    textures: int = 4
+    shared_textures: int = 1
+    texture_size: int = 256
+    passes: int = 2
+    bones: int = 96
+    seed: int = 0
+
+
+@dataclass
+class MeshData:
+    vertex_buffers: List[numpy.ndarray]
+    faces: numpy.ndarray
+
+
+def get_element_name(semantic_name: str, semantic_index: int) -> str:
+    return semantic_name if semantic_index == 0 else f'{semantic_name}{semantic_index}'
+
+
+def get_vb_dtype(input_slot: int) -> numpy.dtype:
+    return numpy.dtype({
+        'names': [get_element_name(name, index) for name, index, _, slot, _, _, _ in VB_ELEMENTS if slot == input_slot],
+        'formats': [(numpy_type, (count,)) if count > 1 else numpy_type for _, _, _, slot, _, numpy_type, count in VB_ELEMENTS if slot == input_slot],
+        'offsets': [offset for _, _, _, slot, offset, _, _ in VB_ELEMENTS if slot == input_slot],
+        'itemsize': VB_STRIDES[input_slot],
+    })
+
+
+def encode_normals(normals: numpy.ndarray) -> numpy.ndarray:
+    """
+    Packs unit vectors to 10-10-10-2 format with octahedral normal in XY, zero tangent in Z and packed data flag set
+    """
+    n = normals / numpy.abs(normals).sum(axis=1, keepdims=True)
+    mask = n[:, 2] < 0
+    x, y = n[:, 0].copy(), n[:, 1].copy()
+    x[mask] = (1.0 - numpy.abs(n[mask, 1])) * numpy.sign(n[mask, 0])
+    y[mask] = (1.0 - numpy.abs(n[mask, 0])) * numpy.sign(n[mask, 1])
+    x = numpy.clip(numpy.rint(x * 511), -511, 511).astype(numpy.int32) & 0x3FF
+    y = numpy.clip(numpy.rint(y * 511), -511, 511).astype(numpy.int32) & 0x3FF
+    return (x | (y << 10) | (1 << 30)).astype(numpy.uint32)
+
+
+def build_mesh(rng: numpy.random.Generator, vertex_count: int, height: float, bones_count: int) -> MeshData:
+    """
+    Builds cylinder-shaped grid mesh with given number of vertices (rounded down to full grid rows)
+    """
+    columns = 32
+    rows = max(2, vertex_count // columns)
+    vertex_count = rows * columns
+
+    angles = numpy.tile(numpy.linspace(0, 2 * numpy.pi, columns, endpoint=False), rows)
+    heights = numpy.repeat(numpy.linspace(0, height, rows), columns)
+    normals = numpy.stack([numpy.cos(angles), numpy.sin(angles), numpy.zeros(vertex_count)], axis=1)
+
+    vb0 = numpy.zeros(vertex_count, dtype=get_vb_dtype(0))
+    vb0['POSITION'] = numpy.stack([normals[:, 0] * 0.2, normals[:, 1] * 0.2, heights], axis=1)
+    vb0['NORMAL'] = encode_normals(normals)
+
+    vb1 = numpy.zeros(vertex_count, dtype=get_vb_dtype(1))
+    vb1['TEXCOORD'] = numpy.stack([angles / (2 * numpy.pi), heights / height], axis=1)
+    vb1['TEXCOORD4'] = rng.integers(-127, 128, size=(vertex_count, 4))
+
+    # Weights are sorted in descending order and sum up to 1.0 like the ones exported by game engines
+    weights = -numpy.sort(-rng.random((vertex_count, 4)), axis=1)
+    weights = numpy.rint(weights / weights.sum(axis=1, keepdims=True) * 65535).astype(numpy.uint16)
+    vb2 = numpy.zeros(vertex_count, dtype=get_vb_dtype(2))
+    vb2['BLENDWEIGHTS'] = weights
+    vb2['BLENDINDICES'] = rng.integers(0, bones_count, size=(vertex_count, 4))
+
+    grid = numpy.arange(vertex_count).reshape(rows, columns)
+    quad_a = grid[:-1, :]
+    quad_b = numpy.roll(grid, -1, axis=1)[:-1, :]
+    quad_c = grid[1:, :]
+    quad_d = numpy.roll(grid, -1, axis=1)[1:, :]
+    faces = numpy.concatenate([
+        numpy.stack([quad_a, quad_b, quad_c], axis=-1).reshape(-1, 3),
+        numpy.stack([quad_b, quad_d, quad_c], axis=-1).reshape(-1, 3),
+    ]).astype(numpy.uint16)
+
+    return MeshData(vertex_buffers=[vb0, vb1, vb2], faces=faces)
+
+
+def format_vb_header(input_slot: int, vertex_count: int) -> str:
+    lines = [
+        f'stride: {VB_STRIDES[input_slot]}',
+        f'first vertex: 0',
+        f'vertex count: {vertex_count}',
+        f'topology: trianglelist',
+    ]
+    # Every VB header lists all elements of the input layout, regardless of their input slot
+    for element_id, (name, index, dxgi_format, slot, offset, _, _) in enumerate(VB_ELEMENTS):
+        lines += [
+            f'element[{element_id}]:',
+            f'  SemanticName: {name}',
+            f'  SemanticIndex: {index}',
+            f'  Format: {dxgi_format}',
+            f'  InputSlot: {slot}',
+            f'  AlignedByteOffset: {offset}',
+            f'  InputSlotClass: per-vertex',
+            f'  InstanceDataStepRate: 0',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+def format_vb_txt(input_slot: int, data: numpy.ndarray) -> str:
+    """
+    Returns VB .txt contents, values are written the way 3dmigoto does it: floats for float and norm formats, integers for uint ones
+    """
+    elements = [element for element in VB_ELEMENTS if element[3] == input_slot]
+    columns, line_formats = [], []
+    for name, index, dxgi_format, _, offset, _, count in elements:
+        element_name = get_element_name(name, index)
+        values = data[element_name].reshape(len(data), count)
+        value_format = '%.9g'
+        if dxgi_format.endswith('_UINT'):
+            value_format = '%d'
+        elif dxgi_format.endswith('_UNORM'):
+            values = values / numpy.iinfo(values.dtype).max
+        elif dxgi_format.endswith('_SNORM'):
+            values = numpy.maximum(values / numpy.iinfo(values.dtype).max, -1.0)
+        elif values.dtype == numpy.uint32:
+            # Encoded data is declared as R32_FLOAT, so 3dmigoto shows its bits as floats
+            values = values.view(numpy.float32)
+        columns.append(values.astype(numpy.float64))
+        line_formats.append(f'vb{input_slot}[%d]+{offset:03d} {element_name}: ' + ', '.join([value_format] * count))
+
+    vertex_format = '\n'.join(line_formats) + '\n'
+    rows = numpy.concatenate(columns, axis=1).tolist()
+    values_per_line = [len(column[0]) for column in columns]
+
+    vertices = []
+    for vertex_id, row in enumerate(rows):
+        args, start = [], 0
+        for count in values_per_line:
+            args.append(vertex_id)
+            args.extend(row[start:start + count])
+            start += count
+        vertices.append(vertex_format % tuple(args))
+
+    return format_vb_header(input_slot, len(data)) + '\nvertex-data:\n\n' + '\n'.join(vertices)
+
+
+def format_ib_txt(faces: numpy.ndarray) -> str:
+    header = '\n'.join([
+        f'byte offset: 0',
+        f'first index: 0',
+        f'index count: {faces.size}',
+        f'topology: trianglelist',
+        f'format: DXGI_FORMAT_R16_UINT',
+    ])
+    return header + '\n\n' + '\n'.join(' '.join(map(str, face)) for face in faces.tolist()) + '\n'
+
+
+def build_dds(rng: numpy.random.Generator, size: int) -> bytes:
+    """
+    Returns uncompressed 32-bit RGBA .dds texture filled with noise, so every texture gets unique contents
+    """
+    header = struct.pack('<4s7I44s8I5I',
+        b'DDS ', 124, 0x100F, size, size, size * 4, 0, 1, b'\x00' * 44,
+        32, 0x41, 0, 32, 0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000,
+        0x1000, 0, 0, 0, 0)
+    return header + rng.integers(0, 256, size=size * size * 4, dtype=numpy.uint8).tobytes()
+
+
+class DumpGenerator:
+    def __init__(self, spec: DumpSpec, dump_directory: Path):
+        self.spec = spec
+        self.dump_directory = Path(dump_directory)
+        self.rng = numpy.random.default_rng(spec.seed)
+        self.call_id = 0
+        self.log_lines: List[str] = []
+        self.used_hashes = set()
+        self.pointers_count = 0
+        self.vs_hash = self.new_hash(16)
+        self.ps_hash = self.new_hash(16)
+        self.cs_hash = self.new_hash(16)
+
+    def new_hash(self, length: int = 8) -> str:
+        while True:
+            resource_hash = ''.join(f'{x:02x}' for x in self.rng.integers(0, 256, size=length // 2).tolist())
+            if resource_hash not in self.used_hashes:
+                self.used_hashes.add(resource_hash)
+                return resource_hash
+
+    def new_pointer(self) -> str:
+        self.pointers_count += 1
+        return f'0x{0x000001EC00000000 + self.pointers_count * 0x1000:016X}'
+
+    def next_call(self) -> str:
+        self.call_id += 1
+        return f'{self.call_id:06d}'
+
+    def log(self, call_id: str, command: str, entries: List[Tuple[int, str]] = ()):
+        self.log_lines.append(f'{call_id} {command}')
+        for slot_id, resource_hash in entries:
+            self.log_lines.append(f'       {slot_id}: view={self.new_pointer()} resource={self.new_pointer()} hash={resource_hash}')
+
+    def write_resource(self, call_id: str, resource_ref: str, resource_hash: str, shaders: str, ext: str,
+                       data: bytes, header: str = None):
+        path = self.dump_directory / f'{call_id}-{resource_ref}={resource_hash}-{shaders}.{ext}'
+        with open(path, 'wb') as f:
+            f.write(data)
+        if header is not None:
+            with open(path.with_suffix('.txt'), 'w') as f:
+                f.write(header)
+
+    def generate(self):
+        self.dump_directory.mkdir(parents=True, exist_ok=True)
+
+        component_index = 0
+        for object_id in range(self.spec.objects):
+            shared_textures = [(self.new_hash(), build_dds(self.rng, self.spec.texture_size)) for _ in range(self.spec.shared_textures)]
+            skeleton_hash = self.new_hash()
+            self.add_skeleton_call(skeleton_hash)
+            for _ in range(self.spec.components):
+                # Components are sorted by max Z of their vertices, so every component gets its own height
+                height = 1.0 + component_index * 0.01
+                self.add_component_calls(skeleton_hash, height, shared_textures)
+                component_index += 1
+
+        with open(self.dump_directory / 'log.txt', 'w') as f:
+            f.write('\n'.join(self.log_lines) + '\n')
+
+    def add_skeleton_call(self, skeleton_hash: str):
+        call_id = self.next_call()
+        shaders = f'cs={self.cs_hash}'
+        self.log(call_id, f'CSSetShader(pComputeShader:{self.new_pointer()}, ppClassInstances:0x0000000000000000, NumClassInstances:0) hash={self.cs_hash}')
+        self.log(call_id, f'CSSetUnorderedAccessViews(StartSlot:0, NumUAVs:1, ppUnorderedAccessViews:{self.new_pointer()}, pUAVInitialCounts:0x0000000000000000)',
+                 [(0, skeleton_hash)])
+        self.log(call_id, f'Dispatch(ThreadGroupCountX:{(self.spec.bones + 63) // 64}, ThreadGroupCountY:1, ThreadGroupCountZ:1)')
+        bones = self.rng.random(self.spec.bones * BONE_BYTE_SIZE // 4, dtype=numpy.float32)
+        self.write_resource(call_id, 'u0', skeleton_hash, shaders, 'buf', bones.tobytes())
+
+    def add_component_calls(self, skeleton_hash: str, height: float, shared_textures: List[Tuple[str, bytes]]):
+        mesh = build_mesh(self.rng, self.spec.vertices, height, self.spec.bones)
+
+        ib_hash = self.new_hash()
+        vb_hashes = [self.new_hash() for _ in mesh.vertex_buffers]
+        vb_headers = [format_vb_txt(input_slot, data) for input_slot, data in enumerate(mesh.vertex_buffers)]
+        ib_header = format_ib_txt(mesh.faces)
+
+        textures_count = max(0, self.spec.textures - len(shared_textures))
+        textures = [(self.new_hash(), build_dds(self.rng, self.spec.texture_size)) for _ in range(textures_count)]
+        textures += shared_textures[:self.spec.textures]
+
+        for pass_id in range(self.spec.passes):
+            call_id = self.next_call()
+            shaders = f'vs={self.vs_hash}-ps={self.ps_hash}'
+
+            self.log(call_id, f'VSSetShader(pVertexShader:{self.new_pointer()}, ppClassInstances:0x0000000000000000, NumClassInstances:0) hash={self.vs_hash}')
+            self.log(call_id, f'PSSetShader(pPixelShader:{self.new_pointer()}, ppClassInstances:0x0000000000000000, NumClassInstances:0) hash={self.ps_hash}')
+            self.log(call_id, f'IASetIndexBuffer(pIndexBuffer:{self.new_pointer()}, Format:{DXGI_FORMAT_R16_UINT}, Offset:0) hash={ib_hash}')
+            self.log(call_id, f'IASetVertexBuffers(StartSlot:0, NumBuffers:{len(vb_hashes)}, ppVertexBuffers:{self.new_pointer()}, pStrides:{self.new_pointer()}, pOffsets:{self.new_pointer()})',
+                     list(enumerate(vb_hashes)))
+            self.log(call_id, f'VSSetShaderResources(StartSlot:0, NumViews:1, ppShaderResourceViews:{self.new_pointer()})',
+                     [(0, skeleton_hash)])
+
+            self.write_resource(call_id, 'ib', ib_hash, shaders, 'buf', mesh.faces.tobytes(), ib_header)
+            for input_slot, (vb_hash, data) in enumerate(zip(vb_hashes, mesh.vertex_buffers)):
+                self.write_resource(call_id, f'vb{input_slot}', vb_hash, shaders, 'buf', data.tobytes(), vb_headers[input_slot])
+            self.write_resource(call_id, 'vs-t0', skeleton_hash, shaders, 'buf', b'\x00' * self.spec.bones * BONE_BYTE_SIZE)
+
+            # Only the main pass samples textures, extra ones (outline, shadow) are drawn without them
+            if pass_id == 0 and len(textures) > 0:
+                self.log(call_id, f'PSSetShaderResources(StartSlot:0, NumViews:{len(textures)}, ppShaderResourceViews:{self.new_pointer()})',
+                         [(slot_id, texture_hash) for slot_id, (texture_hash, _) in enumerate(textures)])
+                for slot_id, (texture_hash, texture_data) in enumerate(textures):
+                    self.write_resource(call_id, f'ps-t{slot_id}', texture_hash, shaders, 'dds', texture_data)
+
+            self.log(call_id, f'DrawIndexed(IndexCount:{mesh.faces.size}, StartIndexLocation:0, BaseVertexLocation:0)')
+
+
+def generate_dump(dump_directory: Path, spec: DumpSpec):
+    if Path(dump_directory).is_dir() and len(os.listdir(dump_directory)) > 0:
+        raise ValueError(f'Dump folder {dump_directory} is not empty!')
+    DumpGenerator(spec, dump_directory).generate()
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    defaults = DumpSpec()
+    parser.add_argument('--objects', type=int, default=defaults.objects, help='number of skinned objects')
+    parser.add_argument('--components', type=int, default=defaults.components, help='number of components per object')
+    parser.add_argument('--vertices', type=int, default=defaults.vertices, help='number of vertices per component (up to 65535)')
+    parser.add_argument('--textures', type=int, default=defaults.textures, help='number of textures per component')
+    parser.add_argument('--shared-textures', type=int, default=defaults.shared_textures, help='number of textures shared between components of object')
+    parser.add_argument('--texture-size', type=int, default=defaults.texture_size, help='width and height of textures')
+    parser.add_argument('--passes', type=int, default=defaults.passes, help='number of draw calls per component')
+    parser.add_argument('--bones', type=int, default=defaults.bones, help='number of bones per object')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def get_spec(args: argparse.Namespace) -> DumpSpec:
+    if not 0 < args.vertices <= 65535:
+        raise ValueError(f'Vertices count must be within 1..65535 range to fit R16_UINT index buffer!')
+    return DumpSpec(
+        objects=args.objects,
+        components=args.components,
+        vertices=args.vertices,
+        textures=args.textures,
+        shared_textures=args.shared_textures,
+        texture_size=args.texture_size,
+        passes=args.passes,
+        bones=args.bones,
+        seed=args.seed,
+    )
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog='generate_dump.py', description='Synthetic 3dmigoto frame dump generator')
+    parser.add_argument('output', type=Path, help='path to empty or non-existing dump folder')
+    add_spec_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        spec = get_spec(args)
+        generate_dump(args.output, spec)
+    except ValueError as e:
+        print(f'ERROR: {e}')
+        return 1
+
+    print(f'Generated {spec} dump in {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,342 @@
+"""
+Times stages of objects extraction and mod export against synthetic (or provided) frame dump, requires Blender:
+
+    blender --background --factory-startup --python run_benchmarks.py -- --components 8 --vertices 20000 --repeat 3
+    blender --background --factory-startup --python run_benchmarks.py -- --dump FRAME_DUMP_FOLDER --json results.json
+    blender --background --factory-startup --python run_benchmarks.py -- --baseline results.json
+
+Every stage is timed by wrapping corresponding function or method for the duration of benchmark, so numbers include
+all calls made during single run. Results can be saved as JSON and used as baseline for later runs, stages that got
+slower than baseline by more than `--threshold` are reported as regressions and fail the run with exit code 1.
+"""
+import sys
+import time
+import json
+import shutil
+import argparse
+import tempfile
+import statistics
+import importlib
+
+from pathlib import Path
+from contextlib import contextmanager, ExitStack
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+import bpy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_dump import DumpSpec, generate_dump, add_spec_arguments, get_spec
+
+
+ADDON_PATH = Path(__file__).resolve().parent.parent / 'efmi-tools'
+
+
+class StageTimer:
+    """
+    Accumulates time spent in wrapped functions per stage, nested calls of the same stage are counted once
+    """
+    def __init__(self):
+        self.runs: Dict[str, List[float]] = {}
+        self.calls: Dict[str, int] = {}
+        self.current_run: Dict[str, float] = {}
+        self.active_stages = set()
+
+    @contextmanager
+    def run(self):
+        self.current_run = {}
+        try:
+            yield
+        finally:
+            for stage, duration in self.current_run.items():
+                self.runs.setdefault(stage, []).append(duration)
+
+    @contextmanager
+    def stage(self, name: str):
+        if name in self.active_stages:
+            yield
+            return
+        self.active_stages.add(name)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.active_stages.discard(name)
+            self.current_run[name] = self.current_run.get(name, 0.0) + time.perf_counter() - start_time
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    @contextmanager
+    def wrap(self, owner, attribute_name: str, name: Optional[str] = None):
+        """
+        Replaces function or method of given class or module with timed one until context exits
+        """
+        name = name or f'{owner.__name__}.{attribute_name}'
+        original = owner.__dict__[attribute_name]
+        is_static = isinstance(original, staticmethod)
+        function = original.__func__ if is_static else original
+
+        def timed(*args, **kwargs):
+            with self.stage(name):
+                return function(*args, **kwargs)
+
+        setattr(owner, attribute_name, staticmethod(timed) if is_static else timed)
+        try:
+            yield
+        finally:
+            setattr(owner, attribute_name, original)
+
+    def get_results(self) -> Dict[str, dict]:
+        return {
+            stage: {'runs': runs, 'calls': self.calls[stage] // len(runs)}
+            for stage, runs in self.runs.items()
+        }
+
+
+def import_addon():
+    """
+    Imports add-on package by its folder name the same way cli.py does it, so relative imports are resolved
+    """
+    sys.path.insert(0, str(ADDON_PATH.parent))
+    return importlib.import_module(f'{ADDON_PATH.name}.cli')
+
+
+def get_module(name: str):
+    return importlib.import_module(f'{ADDON_PATH.name}.{name}')
+
+
+def clear_dump_index(dump_path: Path):
+    utility = get_module('migoto_io.blender_interface.utility')
+    dump_parser = get_module('migoto_io.dump_parser.dump_parser')
+    dump_parser.Dump.get_index_path(utility.get_cache_dir('DumpIndex'), dump_path).unlink(missing_ok=True)
+
+
+def get_extraction_stages(timer: StageTimer) -> ExitStack:
+    dump_parser = get_module('migoto_io.dump_parser.dump_parser')
+    log_parser = get_module('migoto_io.dump_parser.log_parser')
+    calls_collector = get_module('migoto_io.dump_parser.calls_collector')
+    resource_collector = get_module('migoto_io.dump_parser.resource_collector')
+    filename_parser = get_module('migoto_io.dump_parser.filename_parser')
+    data_extractor = get_module('extract_frame_data.data_extractor')
+    shapekey_builder = get_module('extract_frame_data.shapekey_builder')
+    component_builder = get_module('extract_frame_data.component_builder')
+    output_builder = get_module('extract_frame_data.output_builder')
+    extract_frame_data = get_module('extract_frame_data.extract_frame_data')
+
+    stages = ExitStack()
+    stages.enter_context(timer.wrap(extract_frame_data, 'extract_frame_data', 'extract_frame_data'))
+    stages.enter_context(timer.wrap(dump_parser.Dump, '__post_init__', 'Dump'))
+    stages.enter_context(timer.wrap(dump_parser.Dump, 'index_resources', 'Dump.index_resources'))
+    stages.enter_context(timer.wrap(log_parser.FrameDumpLog, 'parse_log', 'FrameDumpLog.parse_log'))
+    stages.enter_context(timer.wrap(calls_collector.CallsCollector, '__post_init__', 'CallsCollector'))
+    stages.enter_context(timer.wrap(resource_collector.ResourceCollector, '__post_init__', 'ResourceCollector'))
+    stages.enter_context(timer.wrap(filename_parser.WrappedResource, 'load_buffer', 'WrappedResource.load_buffer'))
+    stages.enter_context(timer.wrap(data_extractor.DataExtractor, '__post_init__', 'DataExtractor'))
+    stages.enter_context(timer.wrap(data_extractor.DataExtractor, 'handle_draw_vs', 'DataExtractor.handle_draw_vs'))
+    stages.enter_context(timer.wrap(shapekey_builder.ShapeKeyBuilder, '__post_init__', 'ShapeKeyBuilder'))
+    stages.enter_context(timer.wrap(component_builder.ComponentBuilder, '__post_init__', 'ComponentBuilder'))
+    stages.enter_context(timer.wrap(output_builder.OutputBuilder, '__post_init__', 'OutputBuilder'))
+    stages.enter_context(timer.wrap(extract_frame_data, 'write_objects', 'write_objects'))
+    return stages
+
+
+def get_export_stages(timer: StageTimer) -> ExitStack:
+    blender_export = get_module('blender_export.blender_export')
+    object_merger = get_module('blender_export.object_merger')
+    ModExporter = blender_export.ModExporter
+
+    stages = ExitStack()
+    stages.enter_context(timer.wrap(ModExporter, 'export_mod', 'ModExporter.export_mod'))
+    stages.enter_context(timer.wrap(ModExporter, 'get_component_fingerprint', 'ModExporter.get_component_fingerprint'))
+    stages.enter_context(timer.wrap(ModExporter, 'build_merged_object', 'ModExporter.build_merged_object'))
+    stages.enter_context(timer.wrap(object_merger.ObjectMerger, '__post_init__', 'ObjectMerger'))
+    stages.enter_context(timer.wrap(ModExporter, 'build_data_buffers', 'ModExporter.build_data_buffers'))
+    stages.enter_context(timer.wrap(ModExporter, 'build_mod_ini', 'ModExporter.build_mod_ini'))
+    stages.enter_context(timer.wrap(ModExporter, 'write_files', 'ModExporter.write_files'))
+    return stages
+
+
+def run_txt_parsing(timer: StageTimer, dump_path: Path):
+    """
+    Parses headers and vertex data of all unique VB0 and VB1 .txt files of the dump
+    These are fallback paths of DataExtractor, so they're not covered by extraction run with healthy dump
+    """
+    filename_parser = get_module('migoto_io.dump_parser.filename_parser')
+    byte_buffer = get_module('migoto_io.data_model.byte_buffer')
+    dxgi_format = get_module('migoto_io.data_model.dxgi_format')
+    BufferLayout, BufferSemantic, AbstractSemantic, Semantic = byte_buffer.BufferLayout, byte_buffer.BufferSemantic, byte_buffer.AbstractSemantic, byte_buffer.Semantic
+    DXGIFormat = dxgi_format.DXGIFormat
+
+    # Layouts and semantic remaps are the same DataExtractor produces for EFMI VB0 and VB1
+    layouts = {
+        0: (lambda: BufferLayout([
+            BufferSemantic(AbstractSemantic(Semantic.Position, 0), DXGIFormat.R32G32B32_FLOAT),
+            BufferSemantic(AbstractSemantic(Semantic.EncodedData, 0), DXGIFormat.R32_UINT),
+        ]), {AbstractSemantic(Semantic.EncodedData, 0): AbstractSemantic(Semantic.Normal, 0)}),
+        1: (lambda: BufferLayout([
+            BufferSemantic(AbstractSemantic(Semantic.TexCoord, 0), DXGIFormat.R32G32_FLOAT),
+            BufferSemantic(AbstractSemantic(Semantic.Color, 0), DXGIFormat.R8G8B8A8_SNORM),
+        ]), {AbstractSemantic(Semantic.Color, 0): AbstractSemantic(Semantic.TexCoord, 4)}),
+    }
+
+    txt_paths = {}
+    for path in sorted(dump_path.glob('*-vb[01]=*.buf')):
+        descriptor = filename_parser.ResourceDescriptor(str(path))
+        txt_paths.setdefault((descriptor.slot_id, descriptor.hash), path.with_suffix('.txt'))
+
+    for (slot_id, _), txt_path in txt_paths.items():
+        if not txt_path.is_file():
+            continue
+        with timer.stage('MigotoFormat.extract_txt_file_fmt_text'):
+            with open(txt_path, 'r') as f:
+                fmt = byte_buffer.MigotoFormat.from_fmt_text(byte_buffer.MigotoFormat.extract_txt_file_fmt_text(f))
+        create_layout, remapped_semantics = layouts[slot_id]
+        with timer.stage('NumpyBuffer.import_txt_data'):
+            with open(txt_path, 'r') as f:
+                buffer = byte_buffer.NumpyBuffer(create_layout(), size=fmt.vertex_count)
+                buffer.import_txt_data(f.read(), remapped_semantics)
+
+
+def format_duration(seconds: float) -> str:
+    return f'{seconds * 1000:.1f}ms' if seconds < 1 else f'{seconds:.3f}s'
+
+
+def print_results(results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None):
+    print(f'\n{"Stage":<45}{"Calls":>8}{"Min":>12}{"Median":>12}{"Max":>12}{"Baseline":>12}')
+    for stage, result in results.items():
+        runs = result['runs']
+        baseline_median = ''
+        if baseline is not None and stage in baseline:
+            baseline_median = format_duration(statistics.median(baseline[stage]['runs']))
+        print(f'{stage:<45}{result["calls"]:>8}{format_duration(min(runs)):>12}{format_duration(statistics.median(runs)):>12}'
+              f'{format_duration(max(runs)):>12}{baseline_median:>12}')
+
+
+def get_regressions(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, min_delta: float) -> List[str]:
+    regressions = []
+    for stage, result in results.items():
+        if stage not in baseline:
+            continue
+        median = statistics.median(result['runs'])
+        baseline_median = statistics.median(baseline[stage]['runs'])
+        # Tiny stages are too noisy to be compared relatively
+        if median - baseline_median < min_delta:
+            continue
+        if median > baseline_median * (1 + threshold):
+            regressions.append(f'{stage}: {format_duration(median)} vs {format_duration(baseline_median)} '
+                               f'(+{(median / baseline_median - 1) * 100:.0f}%)')
+    return regressions
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog='run_benchmarks.py', description='EFMI Tools extraction and export benchmark')
+    parser.add_argument('--dump', type=Path, help='path to existing frame dump folder, synthetic one is generated if not specified')
+    parser.add_argument('--work-dir', type=Path, help='folder for generated dump and outputs, temporary one is used if not specified')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs of every benchmark')
+    parser.add_argument('--skip-export', action='store_true', help='benchmark only objects extraction')
+    parser.add_argument('--warm-index', action='store_true', help='keep cached dump index between runs')
+    parser.add_argument('--export-cache', action='store_true', help='enable export cache, so only the first export run is full')
+    parser.add_argument('--json', type=Path, help='path to write results to')
+    parser.add_argument('--baseline', type=Path, help='path to results of earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25, help='relative slowdown against baseline treated as regression')
+    parser.add_argument('--min-delta', type=float, default=0.02, help='absolute slowdown in seconds below which stages are never reported')
+    add_spec_arguments(parser)
+    args = parser.parse_args(argv)
+
+    cli = import_addon()
+    cfg = cli.register_settings()
+
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix='efmi-benchmark-'))
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    spec: Optional[DumpSpec] = None
+    dump_path = args.dump
+    if dump_path is None:
+        spec = get_spec(args)
+        dump_path = work_dir / 'FrameAnalysis-Synthetic'
+        if dump_path.is_dir():
+            shutil.rmtree(dump_path)
+        start_time = time.perf_counter()
+        generate_dump(dump_path, spec)
+        print(f'Generated synthetic dump in {time.perf_counter() - start_time:.3f}s: {spec}')
+
+    timer = StageTimer()
+
+    cfg.frame_dump_folder = str(dump_path)
+    cfg.extract_output_folder = str(work_dir / 'Extracted')
+    cfg.extract_targets = ''
+
+    extract_frame_data = get_module('extract_frame_data.extract_frame_data')
+
+    objects = {}
+    with get_extraction_stages(timer):
+        for _ in range(args.repeat):
+            if not args.warm_index:
+                clear_dump_index(dump_path)
+            with timer.run():
+                objects = extract_frame_data.extract_frame_data(cfg)
+
+    with timer.run():
+        run_txt_parsing(timer, dump_path)
+
+    if not args.skip_export and len(objects) > 0:
+        object_name = next(iter(objects.keys()))
+
+        cfg.object_source_folder = str(work_dir / 'Extracted' / object_name)
+        cfg.import_skeleton_type = 'COMPONENT'
+        cfg.mod_skeleton_type = cfg.import_skeleton_type
+
+        blender_import = get_module('blender_import.blender_import')
+        with timer.run():
+            with timer.wrap(blender_import.ObjectImporter, 'import_object', 'ObjectImporter.import_object'):
+                blender_import.blender_import(None, bpy.context, cfg)
+
+        cli.apply_settings(cfg, {
+            'component_collection': object_name,
+            'mod_output_folder': str(work_dir / 'Mod'),
+            'allow_export_without_lods': True,
+            'use_export_cache': args.export_cache,
+            'custom_template_live_update': False,
+            'partial_export': False,
+            'write_ini': True,
+            'copy_textures': True,
+        })
+
+        with get_export_stages(timer):
+            for _ in range(args.repeat):
+                with timer.run():
+                    cli.run_export(cfg)
+
+    results = timer.get_results()
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['stages']
+
+    print_results(results, baseline)
+
+    if args.json is not None:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'blender_version': bpy.app.version_string,
+                'dump': str(dump_path) if spec is None else asdict(spec),
+                'repeat': args.repeat,
+                'stages': results,
+            }, f, indent=4)
+
+    if baseline is not None:
+        regressions = get_regressions(results, baseline, args.threshold, args.min_delta)
+        if len(regressions) > 0:
+            print(f'\nFound {len(regressions)} regressions against {args.baseline}:')
+            for regression in regressions:
+                print(f'  {regression}')
+            return 1
+        print(f'\nNo regressions found against {args.baseline}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    sys.exit(main(argv))
@@ -46,6 +46,14 @@ def register():
 
 
 def unregister():
+    # Live updates and vertex weights tracking could be started only if export modules were loaded by operator
+    live_ini_updater = sys.modules.get(f'{__name__}.blender_export.live_ini_updater', None)
+    if live_ini_updater is not None:
+        live_ini_updater.stop_live_ini_updates()
+    export_cache = sys.modules.get(f'{__name__}.blender_export.export_cache', None)
+    if export_cache is not None:
+        export_cache.vertex_groups_digests.stop_tracking()
+
     auto_load.unregister()
 
     del bpy.types.Scene.efmi_tools_settings
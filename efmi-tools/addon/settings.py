@@ -29,11 +29,13 @@ class EFMI_Settings(bpy.types.PropertyGroup):
 
     vertex_ids_cache: bpy.props.StringProperty(
         name = "Vertex Ids Cache",
+        description = "Key of .npz sidecar with vertex ids cached for partial export",
         default = ""
     ) # type: ignore
 
     index_data_cache: bpy.props.StringProperty(
         name = "Index Data Cache",
+        description = "Key of .npz sidecar with index data cached for partial export",
         default = ""
     ) # type: ignore
     
@@ -69,6 +71,13 @@ class EFMI_Settings(bpy.types.PropertyGroup):
         update=lambda self, context: self.on_update_clear_error('frame_dump_folder'),
     ) # type: ignore
 
+    extract_targets: StringProperty(
+        name="Target IB Hashes",
+        description="Comma-separated list of IB hashes to extract as separate objects from single dump (use `+` to join multiple IB hashes into one object). Leave empty to extract all objects",
+        default='',
+        update=lambda self, context: self.on_update_clear_error('extract_targets'),
+    ) # type: ignore
+
     skip_small_textures: BoolProperty(
         name="Textures Filtering: Skip Small",
         description="Skip texture smaller than specified size",
@@ -303,6 +312,12 @@ class EFMI_Settings(bpy.types.PropertyGroup):
         default=True,
     ) # type: ignore
 
+    bake_smooth_normals: BoolProperty(
+        name="Bake Smooth Normals",
+        description="Store smooth normals converted to tangent space as octahedron coordinates in COLOR1 attribute of exported objects. Overwrites existing COLOR1 data",
+        default=False,
+    ) # type: ignore
+
     unrestricted_custom_shape_keys: BoolProperty(
         name="Unrestricted Custom Shape Keys",
         description="Allows to use Custom Shape Keys for components that don't have them by default. Generates extra mod.ini logic",
@@ -458,6 +473,18 @@ class EFMI_Settings(bpy.types.PropertyGroup):
         default=True,
     ) # type: ignore
 
+    use_export_cache: BoolProperty(
+        name="Use Export Cache",
+        description="Reuse data buffers of components which objects and export settings didn't change since the last export. Uncheck to force full re-export",
+        default=False,
+    ) # type: ignore
+
+    write_performance_trace: BoolProperty(
+        name="Write Performance Trace",
+        description="Write timings of extraction and export stages to Chrome trace JSON in EFMI-Tools/Traces temp folder. Open it in chrome://tracing or ui.perfetto.dev",
+        default=False,
+    ) # type: ignore
+
     export_on_reload: BoolProperty(
         name="Export On Reload",
         description="Trigger mod export on addon reload. Useful for export debugging.",
@@ -14,11 +14,6 @@ from ..migoto_io.blender_interface.objects import *
 from ..migoto_io.blender_interface.collections import *
 from ..migoto_io.blender_interface.utility import *
 
-from ..blender_import.blender_import import blender_import
-from ..blender_export.blender_export import blender_export
-from ..blender_export.ini_maker import IniMaker
-from ..extract_frame_data.extract_frame_data import extract_frame_data
-
 from .modules.toolbox.ui import *
 
 
@@ -188,6 +183,9 @@ class EFMI_TOOLS_PT_SIDEBAR(bpy.types.Panel):
 
         layout.row().prop(cfg, 'extract_output_folder')
 
+        row = add_row_with_error_handler(layout, cfg, 'extract_targets')
+        row.prop(cfg, 'extract_targets')
+
         layout.row()
 
         col = layout.column(align=True)
@@ -309,6 +307,7 @@ class EFMI_TOOLS_PT_SidePanelAdvancedExport(bpy.types.Panel):
         if not cfg.partial_export:
             # layout.row().prop(cfg, 'skip_known_cubemap_textures')
             layout.row().prop(cfg, 'add_missing_vertex_groups')
+            layout.row().prop(cfg, 'bake_smooth_normals')
             layout.row().prop(cfg, 'allow_export_without_lods')
             # layout.row().prop(cfg, 'unrestricted_custom_shape_keys')
             if cfg.mod_skeleton_type == 'MERGED':
@@ -432,6 +431,8 @@ class EFMI_Import(bpy.types.Operator):
             clear_error(cfg)
 
             cfg.mod_skeleton_type = cfg.import_skeleton_type
+
+            from ..blender_import.blender_import import blender_import
             
             blender_import(self, context, cfg)
 
@@ -449,49 +450,15 @@ class EFMI_Export(bpy.types.Operator):
     bl_label = "Export Mod"
     bl_description = "Export object as EFMI mod"
 
-    def get_excluded_buffers(self, context):
-        """
-        Calculates list of exported buffers and processed semantics based on partial export settings
-        Speeds up export of single buffer up to 5 times compared to full export
-        """
-        cfg = context.scene.efmi_tools_settings
-
-        if cfg.partial_export:
-            # Loop data is used to create list of exported vertices, so there are only two options for partial export:
-            # 1. Recalculate each time whenever Index / Vector / Color / TexCoord buffers is selected
-            # 2. Load from cache if there is no Index / Vector / Color / TexCoord buffers selected
-            exclude_buffers = []
-
-            if not cfg.export_index:
-                exclude_buffers.append('Index')
-            if not cfg.export_positions:
-                exclude_buffers.append('Position')
-            if not cfg.export_blends:
-                exclude_buffers.append('Blend')
-            if not cfg.export_vectors:
-                exclude_buffers.append('Vector')
-            if not cfg.export_colors:
-                exclude_buffers.append('Color')
-            if not cfg.export_texcoords:
-                exclude_buffers.append('TexCoord')
-            if not cfg.export_shapekeys:
-                exclude_buffers.append('ShapeKeyOffset')
-                exclude_buffers.append('ShapeKeyVertexId')
-                exclude_buffers.append('ShapeKeyVertexOffset')
-                
-            return exclude_buffers
-    
-        else:
-
-            return []
-
     def execute(self, context):
         try:
             cfg = context.scene.efmi_tools_settings
 
             clear_error(cfg)
 
-            excluded_buffers = self.get_excluded_buffers(context)
+            from ..blender_export.blender_export import blender_export, get_excluded_buffers
+
+            excluded_buffers = get_excluded_buffers(cfg)
 
             blender_export(self, context, cfg, excluded_buffers)
             
@@ -515,10 +482,12 @@ class EFMI_ExtractFrameData(bpy.types.Operator):
 
             clear_error(cfg)
 
-            output = extract_frame_data(cfg)
+            from ..extract_frame_data.extract_frame_data import extract_frame_data
+
+            objects = extract_frame_data(cfg)
             
             objects_missing_shapekeys = []
-            for object_hash, object_data in output.objects.items():
+            for object_hash, object_data in objects.items():
                 if object_data.shapekeys.offsets_hash and not object_data.shapekeys.shapekey_offsets:
                     objects_missing_shapekeys.append(object_hash)
             if len(objects_missing_shapekeys) > 0:
@@ -548,10 +517,12 @@ class EFMI_ImportLODData(bpy.types.Operator):
 
             clear_error(cfg)
 
-            output = extract_frame_data(cfg, extract_lods=True)
+            from ..extract_frame_data.extract_frame_data import extract_frame_data
+
+            objects = extract_frame_data(cfg, extract_lods=True)
             
             # objects_missing_shapekeys = []
-            # for object_hash, object_data in output.objects.items():
+            # for object_hash, object_data in objects.items():
             #     if object_data.shapekeys.offsets_hash and not object_data.shapekeys.shapekey_offsets:
             #         objects_missing_shapekeys.append(object_hash)
 
@@ -594,6 +565,7 @@ class EFMI_OpenIniTemplateEditor(bpy.types.Operator):
             text = bpy.data.texts.new(text_name)
         
         if not text.as_string().strip():
+            from ..blender_export.ini_maker import IniMaker
             text.clear()
             text.write(IniMaker.get_default_template(context, cfg, remove_code_comments=True))
             text.cursor_set(0)
@@ -656,6 +628,8 @@ class EFMI_IniTemplateEditor_Reset(bpy.types.Operator):
         else:
             text = bpy.data.texts.new(text_name)
         
+        from ..blender_export.ini_maker import IniMaker
+
         text.clear()
         text.write(IniMaker.get_default_template(context, cfg, remove_code_comments=True))
         text.cursor_set(0)
@@ -732,6 +706,8 @@ class DebugPanel(bpy.types.Panel):
 
         layout.row().prop(cfg, 'allow_missing_shapekeys')
         layout.row().prop(cfg, 'remove_temp_object')
+        layout.row().prop(cfg, 'use_export_cache')
+        layout.row().prop(cfg, 'write_performance_trace')
         layout.row().prop(cfg, 'export_on_reload')
         layout.row().prop(cfg, 'import_tangent_data_to_attribute')
         
\ No newline at end of file
@@ -18,6 +18,17 @@ blender_version = bpy.app.version
 modules = None
 ordered_classes = None
 
+# Packages and modules without classes to register, they're imported on first use by operators instead of add-on startup
+deferred_modules = (
+    "cli",
+    "libs",
+    "data_models",
+    "blender_import",
+    "blender_export",
+    "extract_frame_data",
+    "migoto_io",
+)
+
 def init():
     global modules
     global ordered_classes
@@ -62,6 +73,8 @@ def iter_submodules(path, package_name):
 
 def iter_submodule_names(path, root=""):
     for _, module_name, is_package in pkgutil.iter_modules([str(path)]):
+        if is_deferred_module(root + module_name):
+            continue
         if is_package:
             sub_path = path / module_name
             sub_root = root + module_name + "."
@@ -69,6 +82,9 @@ def iter_submodule_names(path, root=""):
         else:
             yield root + module_name
 
+def is_deferred_module(name):
+    return any(name == deferred or name.startswith(deferred + ".") for deferred in deferred_modules)
+
 
 # Find classes to register
 #################################################
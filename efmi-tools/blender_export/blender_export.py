@@ -1,6 +1,3 @@
-import time
-import shutil
-
 from typing import List, Dict, Union
 from dataclasses import dataclass, field
 
@@ -10,16 +7,20 @@ from ..migoto_io.blender_interface.utility import *
 from ..migoto_io.blender_interface.collections import *
 from ..migoto_io.blender_interface.objects import *
 from ..migoto_io.blender_interface.mesh import *
+from ..migoto_io.file_writer import FileWriter
+from ..migoto_io.tracing import tracer
 from ..migoto_io.data_model.dxgi_format import DXGIFormat
 from ..migoto_io.data_model.byte_buffer import NumpyBuffer, MigotoFmt, BufferLayout, BufferSemantic, Semantic, AbstractSemantic
 from ..migoto_io.data_model.data_model import DataModel
 
 from ..extract_frame_data.metadata_format import read_metadata, ExtractedObject
 
-from .object_merger import ObjectMerger, SkeletonType, MergedObject, MergedObjectShapeKeys
+from .object_merger import ObjectMerger, SkeletonType, MergedObject, MergedObjectShapeKeys, get_component_objects
+from .export_cache import ExportCache, ExportCacheEntry, ObjectFingerprint, export_cache
 from .metadata_collector import Version, ModInfo
 from .texture_collector import Texture, get_textures
 from .ini_maker import IniMaker
+from .live_ini_updater import start_live_ini_updates
 
 from ..data_models.data_model_efmi import DataModelEFMI
 
@@ -57,7 +58,6 @@ class ModExporter:
     
         self.verify_config()
 
-        start_time = time.time()
         print(f"Mod export started for '{self.cfg.component_collection.name}' object")
 
         if self.cfg.custom_template_live_update:
@@ -95,8 +95,22 @@ class ModExporter:
             if component.lods is None:
                 component.lods = []
 
+            fingerprint = None
+            if self.cfg.use_export_cache:
+                with tracer.span('Fingerprint component'):
+                    fingerprint = self.get_component_fingerprint(component_id)
+                cache_entry = export_cache.get(self.get_cache_key(component_id), fingerprint)
+                if cache_entry is not None:
+                    print(f'Component {component_id} is unchanged, reusing cached data buffers')
+                    self.merged_object.components += ExportCache.detach_components(cache_entry.components)
+                    self.buffers.update(cache_entry.buffers)
+                    index_count += cache_entry.index_count
+                    vertex_count += cache_entry.vertex_count
+                    continue
+
             try:
-                merged_object = self.build_merged_object(component_id)
+                with tracer.span('Build merged object'):
+                    merged_object = self.build_merged_object(component_id)
             except ConfigError as e:
                 raise e
             except Exception as e:
@@ -104,8 +118,12 @@ class ModExporter:
             
             self.merged_object.components += merged_object.components
 
+            old_buffers = dict(self.buffers)
+
             try:
-                self.build_data_buffers(merged_object, component_id)
+                with tracer.span('Build data buffers') as span:
+                    self.build_data_buffers(merged_object, component_id)
+                    span.add(vertices=merged_object.vertex_count, indices=merged_object.index_count)
             except Exception as e:
                 raise e
             finally:
@@ -115,6 +133,15 @@ class ModExporter:
 
             index_count += merged_object.index_count
             vertex_count += merged_object.vertex_count
+
+            if fingerprint is not None:
+                export_cache.put(self.get_cache_key(component_id), ExportCacheEntry(
+                    fingerprint=fingerprint,
+                    components=ExportCache.detach_components(merged_object.components),
+                    vertex_count=merged_object.vertex_count,
+                    index_count=merged_object.index_count,
+                    buffers={name: buffer for name, buffer in self.buffers.items() if old_buffers.get(name, None) is not buffer},
+                ))
             # shapekeys_vertex_count += merged_object.shapekeys.vertex_count
 
         self.merged_object.index_count = index_count
@@ -122,35 +149,70 @@ class ModExporter:
         # self.merged_object.shapekeys.vertex_count = shapekeys_vertex_count
 
         if not self.cfg.partial_export:
-            self.textures = get_textures(self.object_source_folder, ['af26db30', '1320a071', '10d7937d', '87505b2b'] if self.cfg.skip_known_cubemap_textures else [])
+            with tracer.span('Collect textures'):
+                self.textures = get_textures(self.object_source_folder, ['af26db30', '1320a071', '10d7937d', '87505b2b'] if self.cfg.skip_known_cubemap_textures else [])
 
             if self.cfg.write_ini:
                 try:
-                    self.build_mod_ini()
+                    with tracer.span('Build mod.ini'):
+                        self.build_mod_ini()
                 except FileNotFoundError:
                     raise ConfigError('custom_template_source', f'Specified custom template file not found!')
                 except Exception as e:
                     raise ConfigError('use_custom_template', f'Failed to build mod.ini from ini template:\n{e}')
 
         if self.cfg.custom_template_live_update:
-            print(f'Total live ini template initialization time: {time.time() - start_time :.3f}s')
             return
 
         try:
-            self.write_files()
+            with tracer.span('Write files', count=len(self.buffers)):
+                self.write_files()
         except Exception as e:
             raise ConfigError('mod_output_folder', f'Failed to write files to mod folder:\n{e}')
 
-        print(f'Total mod export time: {time.time() - start_time :.3f}s')
-
     def verify_config(self):
         if self.cfg.component_collection is None:
             raise ConfigError('component_collection', f'Components collection is not specified!')
         if self.cfg.component_collection not in list(get_scene_collections()):
             raise ConfigError('component_collection', f'Collection "{self.cfg.component_collection.name}" is not a member of "Scene Collection"!')
 
+    def get_cache_key(self, component_id: int):
+        return str(self.object_source_folder), component_id
+
+    def get_component_fingerprint(self, component_id: int) -> str:
+        fingerprint = ObjectFingerprint()
+        # Export settings affecting data buffers
+        fingerprint.update_value((
+            self.cfg.ignore_nested_collections,
+            self.cfg.ignore_hidden_collections,
+            self.cfg.ignore_hidden_objects,
+            self.cfg.ignore_muted_shape_keys,
+            self.cfg.apply_all_modifiers,
+            self.cfg.add_missing_vertex_groups,
+            self.cfg.bake_smooth_normals,
+            self.cfg.mirror_mesh,
+            self.skeleton_type,
+            sorted(self.excluded_buffers),
+            self.context.scene.frame_current,
+        ))
+        # Extracted object sources
+        fingerprint.update_file(self.object_source_folder / 'Metadata.json')
+        fingerprint.update_file(self.object_source_folder / f'Component {component_id}.fmt')
+        # Evaluating depsgraph also flushes pending updates, so cached vertex weights digests of edited meshes get dropped
+        depsgraph = self.context.evaluated_depsgraph_get()
+        if not self.cfg.apply_all_modifiers:
+            # Modifiers don't affect exported data unless they're applied
+            depsgraph = None
+        # Objects of the component
+        for _, obj in get_component_objects(self.cfg.component_collection,
+                                            component_id=component_id,
+                                            ignore_nested_collections=self.cfg.ignore_nested_collections,
+                                            ignore_hidden_collections=self.cfg.ignore_hidden_collections,
+                                            ignore_hidden_objects=self.cfg.ignore_hidden_objects):
+            fingerprint.update_object(obj, depsgraph)
+        return fingerprint.hexdigest()
+
     def build_merged_object(self, component_id = -1):
-        start_time = time.time()
         object_merger = ObjectMerger(
             extracted_object=self.extracted_object,
             component_id=component_id,
@@ -166,13 +228,11 @@ class ModExporter:
             mesh_rotation=(0, 0, 0),
             add_missing_vertex_groups=self.cfg.add_missing_vertex_groups,
             allow_empty_components=True,
+            bake_smooth_normals=self.cfg.bake_smooth_normals,
         )
-        print(f'Merged object build time: {time.time() - start_time :.3f}s ({self.merged_object.vertex_count} vertices, {self.merged_object.index_count} indices)')
         return object_merger.merged_object
 
     def build_data_buffers(self, merged_object: MergedObject, component_id = -1):
-        start_time = time.time()
-
         global data_models
         data_model = data_models['EFMI']
 
@@ -256,12 +316,8 @@ class ModExporter:
                     component.blend_remap_vg_count = vg_count
                     remap_id += 1
                 merged_object.blend_remap_count = remap_id
-
-        print(f'Total mesh data collection time: {time.time() - start_time :.3f}s')
     
     def build_mod_ini(self):
-        start_time = time.time()
-
         ini_maker = IniMaker(
             cfg=self.cfg,
             scene=self.context.scene,
@@ -286,40 +342,37 @@ class ModExporter:
         self.ini = ini_maker
 
         if self.cfg.custom_template_live_update:
-            self.ini.start_live_write(self.context, self.cfg)
+            start_live_ini_updates(self.ini, self.context, self.cfg)
         else:
             self.ini.build_from_template(self.context, self.cfg, with_checksum=True)
 
-        print(f'Total mod ini build time: {time.time() - start_time :.3f}s')
-
     def write_files(self):
-        start_time = time.time()
-
-        for buffer_name, buffer in self.buffers.items():
-            print(f'Writing {buffer_name}.buf...')
-            with open(self.meshes_path / f'{buffer_name}.buf', 'wb') as f:
-                f.write(buffer.get_bytes())
+        # Buffers and textures are written concurrently, mod.ini is written once they're in place
+        with FileWriter() as writer:
+            for buffer_name, buffer in self.buffers.items():
+                print(f'Writing {buffer_name}.buf...')
+                writer.write(self.meshes_path / f'{buffer_name}.buf', buffer.get_bytes())
+
+            if not self.cfg.partial_export:
+                # Write textures
+                if self.cfg.copy_textures:
+                    for texture in self.textures:
+                        texture_path = self.textures_path / texture.filename
+                        if texture_path.is_file():
+                            continue
+                        print(f'Copying {texture_path.name}...')
+                        writer.copy(texture.path, texture_path)
+                # Write mod logo
+                mod_logo_path = resolve_path(self.cfg.mod_logo)
+                if mod_logo_path.is_file():
+                    print(f'Copying {self.local_mod_logo_path.name}...')
+                    writer.copy(mod_logo_path, self.local_mod_logo_path)
 
         if not self.cfg.partial_export:
-            # Write textures
-            if self.cfg.copy_textures:
-                for texture in self.textures:
-                    texture_path = self.textures_path / texture.filename
-                    if texture_path.is_file():
-                        continue
-                    print(f'Copying {texture_path.name}...')
-                    shutil.copy(texture.path, texture_path)
-            # Write mod logo
-            mod_logo_path = resolve_path(self.cfg.mod_logo)
-            if mod_logo_path.is_file():
-                print(f'Copying {self.local_mod_logo_path.name}...')
-                shutil.copy(mod_logo_path, self.local_mod_logo_path)
             # Write mod.ini
             if self.cfg.write_ini:
                 self.ini.write(ini_path=self.mod_output_folder / 'mod.ini')
                 # self.ini.write(ini_path=self.mod_output_folder / 'mod_old.ini', ini_string=self.ini.build_old())
-                
-        print(f'Disk write time: {time.time() - start_time :.3f}s')
 
     def compare_outputs(self, old_path: Path, new_path: Path):
 
@@ -368,6 +421,42 @@ class ModExporter:
 
                         print(f'Found {num_diffs} diffs (out of {len(old_semantic_data)} entries)')
 
+def get_excluded_buffers(cfg) -> List[str]:
+    """
+    Calculates list of exported buffers and processed semantics based on partial export settings
+    Speeds up export of single buffer up to 5 times compared to full export
+    """
+    if cfg.partial_export:
+        # Loop data is used to create list of exported vertices, so there are only two options for partial export:
+        # 1. Recalculate each time whenever Index / Vector / Color / TexCoord buffers is selected
+        # 2. Load from cache if there is no Index / Vector / Color / TexCoord buffers selected
+        exclude_buffers = []
+
+        if not cfg.export_index:
+            exclude_buffers.append('Index')
+        if not cfg.export_positions:
+            exclude_buffers.append('Position')
+        if not cfg.export_blends:
+            exclude_buffers.append('Blend')
+        if not cfg.export_vectors:
+            exclude_buffers.append('Vector')
+        if not cfg.export_colors:
+            exclude_buffers.append('Color')
+        if not cfg.export_texcoords:
+            exclude_buffers.append('TexCoord')
+        if not cfg.export_shapekeys:
+            exclude_buffers.append('ShapeKeyOffset')
+            exclude_buffers.append('ShapeKeyVertexId')
+            exclude_buffers.append('ShapeKeyVertexOffset')
+            
+        return exclude_buffers
+
+    else:
+
+        return []
+
+
 def blender_export(operator, context, cfg, excluded_buffers):
     mod_exporter = ModExporter(context, cfg, excluded_buffers)
-    mod_exporter.export_mod()
+    with tracer.session('Export mod', get_cache_dir('Traces') if cfg.write_performance_trace else None):
+        mod_exporter.export_mod()
@@ -0,0 +1,271 @@
+import hashlib
+import numpy
+import bpy
+
+from bpy.app.handlers import persistent
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional
+
+from ..migoto_io.data_model.byte_buffer import NumpyBuffer
+from ..migoto_io.data_model.data_extractor import BlenderDataExtractor
+
+from .object_merger import MergedObjectComponent, TempObject
+
+
+# Attribute data type -> (foreach_get property name, numpy type, values per element)
+ATTRIBUTE_DATA_FORMATS = {
+    'FLOAT': ('value', numpy.float32, 1),
+    'INT': ('value', numpy.int32, 1),
+    'FLOAT_VECTOR': ('vector', numpy.float32, 3),
+    'FLOAT_COLOR': ('color', numpy.float32, 4),
+    'BYTE_COLOR': ('color', numpy.float32, 4),
+    'BOOLEAN': ('value', numpy.bool_, 1),
+    'FLOAT2': ('vector', numpy.float32, 2),
+    'INT8': ('value', numpy.int32, 1),
+    'INT32_2D': ('value', numpy.int32, 2),
+    'QUATERNION': ('value', numpy.float32, 4),
+}
+
+
+@dataclass
+class ExportCacheEntry:
+    fingerprint: str
+    components: List[MergedObjectComponent]
+    vertex_count: int
+    index_count: int
+    buffers: Dict[str, NumpyBuffer]
+
+
+class ExportCache:
+    """
+    Session-wide storage of per-component export results keyed by object source folder and component id
+    Entry is reused only as long as fingerprint of component objects and export settings stays the same
+    """
+    def __init__(self):
+        self.entries: Dict[Tuple[str, int], ExportCacheEntry] = {}
+
+    def get(self, key: Tuple[str, int], fingerprint: str) -> Optional[ExportCacheEntry]:
+        entry = self.entries.get(key, None)
+        if entry is None or entry.fingerprint != fingerprint:
+            return None
+        return entry
+
+    def put(self, key: Tuple[str, int], entry: ExportCacheEntry):
+        self.entries[key] = entry
+
+    def clear(self):
+        self.entries.clear()
+
+    @staticmethod
+    def detach_components(components: List[MergedObjectComponent]) -> List[MergedObjectComponent]:
+        """
+        Returns copies of merged object components without references to temporary Blender objects
+        """
+        return [
+            MergedObjectComponent(
+                objects=[TempObject(
+                    name=temp_object.name,
+                    object=None,
+                    vertex_count=temp_object.vertex_count,
+                    index_count=temp_object.index_count,
+                    index_offset=temp_object.index_offset,
+                ) for temp_object in component.objects],
+                id=component.id,
+                vertex_count=component.vertex_count,
+                index_count=component.index_count,
+                blend_remap_id=component.blend_remap_id,
+                blend_remap_vg_count=component.blend_remap_vg_count,
+            ) for component in components
+        ]
+
+
+export_cache = ExportCache()
+
+
+def get_vertex_groups_digest(mesh: bpy.types.Mesh) -> bytes:
+    hasher = hashlib.sha256()
+    for data in BlenderDataExtractor.fetch_vertex_groups(mesh):
+        hasher.update(data.tobytes())
+    return hasher.digest()
+
+
+class VertexGroupsDigests:
+    """
+    Digests of vertex weights of original meshes, Blender API allows to read them only via per-vertex Python loop
+    Digest is kept until depsgraph reports geometry update of the mesh or its object, undo and file load drop all of them
+    """
+    def __init__(self):
+        self.digests: Dict[int, bytes] = {}
+        self.is_tracking = False
+
+    def get(self, mesh: bpy.types.Mesh) -> bytes:
+        if not self.is_tracking:
+            self.start_tracking()
+        digest = self.digests.get(mesh.session_uid, None)
+        if digest is None:
+            digest = get_vertex_groups_digest(mesh)
+            self.digests[mesh.session_uid] = digest
+        return digest
+
+    def invalidate(self, depsgraph: bpy.types.Depsgraph):
+        for update in depsgraph.updates:
+            if not update.is_updated_geometry:
+                continue
+            id_data = update.id.original
+            if isinstance(id_data, bpy.types.Object):
+                id_data = id_data.data
+            if isinstance(id_data, bpy.types.Mesh):
+                self.digests.pop(id_data.session_uid, None)
+
+    def clear(self):
+        self.digests.clear()
+
+    def start_tracking(self):
+        bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+        for handlers in [bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post]:
+            handlers.append(on_data_reload)
+        self.is_tracking = True
+
+    def stop_tracking(self):
+        if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+        for handlers in [bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post]:
+            if on_data_reload in handlers:
+                handlers.remove(on_data_reload)
+        self.digests.clear()
+        self.is_tracking = False
+
+
+vertex_groups_digests = VertexGroupsDigests()
+
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    vertex_groups_digests.invalidate(depsgraph)
+
+
+@persistent
+def on_data_reload(*args):
+    vertex_groups_digests.clear()
+
+
+class ObjectFingerprint:
+    """
+    Calculates sha256 of everything that affects exported buffers of given objects:
+    mesh geometry and attributes, vertex groups, shape keys, modifiers and transforms
+    """
+    def __init__(self):
+        self.hasher = hashlib.sha256()
+
+    def hexdigest(self) -> str:
+        return self.hasher.hexdigest()
+
+    def update_value(self, value):
+        self.hasher.update(repr(value).encode())
+
+    def update_file(self, path: Path):
+        self.update_value(str(path))
+        if path.is_file():
+            with open(path, 'rb') as f:
+                self.hasher.update(f.read())
+
+    def update_array(self, data_source, data_name: str, data_type, width: int = 1):
+        data = numpy.empty(len(data_source) * width, dtype=data_type)
+        try:
+            data_source.foreach_get(data_name, data)
+        except (TypeError, RuntimeError):
+            data = numpy.array([getattr(item, data_name) for item in data_source], dtype=data_type)
+        self.update_value((data_name, len(data)))
+        self.hasher.update(data.tobytes())
+
+    def update_matrix(self, matrix):
+        self.update_value([tuple(row) for row in matrix])
+
+    def update_object(self, obj: bpy.types.Object, depsgraph: Optional[bpy.types.Depsgraph] = None):
+        """
+        Evaluated mesh is hashed as well if depsgraph is specified, it's the only way to catch changes of modifier results
+        caused by Geometry Nodes trees and inputs, meshes of modifier target objects and so on
+        """
+        self.update_value((obj.name, obj.type))
+        self.update_matrix(obj.matrix_world)
+
+        self.update_mesh(obj.data)
+        self.update_value([vertex_group.name for vertex_group in obj.vertex_groups])
+        self.hasher.update(vertex_groups_digests.get(obj.data))
+        self.update_shape_keys(obj)
+
+        for modifier in obj.modifiers:
+            self.update_rna_struct(modifier)
+            self.update_id_properties(modifier)
+
+        if depsgraph is not None and len(obj.modifiers) > 0:
+            evaluated_obj = obj.evaluated_get(depsgraph)
+            mesh = evaluated_obj.to_mesh()
+            try:
+                self.update_mesh(mesh)
+                # Evaluated mesh is a temporary copy, so its vertex weights cannot be cached
+                self.hasher.update(get_vertex_groups_digest(mesh))
+            finally:
+                evaluated_obj.to_mesh_clear()
+
+    def update_mesh(self, mesh: bpy.types.Mesh):
+        self.update_value((len(mesh.vertices), len(mesh.loops), len(mesh.polygons)))
+        self.update_array(mesh.vertices, 'co', numpy.float32, 3)
+        self.update_array(mesh.loops, 'vertex_index', numpy.int32)
+        self.update_array(mesh.loops, 'normal', numpy.float32, 3)
+        self.update_array(mesh.polygons, 'loop_start', numpy.int32)
+
+        for attribute in mesh.attributes:
+            if attribute.name.startswith('.'):
+                continue
+            self.update_value((attribute.name, attribute.domain, attribute.data_type))
+            data_format = ATTRIBUTE_DATA_FORMATS.get(attribute.data_type, None)
+            if data_format is not None:
+                self.update_array(attribute.data, *data_format)
+
+    def update_shape_keys(self, obj: bpy.types.Object):
+        shape_keys = obj.data.shape_keys
+        if shape_keys is None:
+            return
+        for key_block in shape_keys.key_blocks:
+            self.update_value((key_block.name, key_block.mute, key_block.value, key_block.slider_min, key_block.slider_max,
+                               key_block.relative_key.name, key_block.vertex_group, key_block.interpolation))
+            self.update_array(key_block.data, 'co', numpy.float32, 3)
+
+    def update_rna_struct(self, struct):
+        self.update_value(struct.bl_rna.identifier)
+        for prop in struct.bl_rna.properties:
+            if prop.identifier == 'rna_type':
+                continue
+            value = getattr(struct, prop.identifier, None)
+            if isinstance(value, bpy.types.Object):
+                # Result of modifiers like Armature depends on state of the target object
+                self.update_value(value.name)
+                self.update_matrix(value.matrix_world)
+                if value.pose is not None:
+                    for pose_bone in value.pose.bones:
+                        self.update_matrix(pose_bone.matrix)
+            elif isinstance(value, bpy.types.ID):
+                self.update_value(value.name)
+            elif isinstance(value, (int, float, bool, str)) or value is None:
+                self.update_value(value)
+            elif hasattr(value, '__len__'):
+                # Vectors, arrays and collections, reprs of nested structs may contain memory addresses
+                self.update_value(tuple(v if isinstance(v, (int, float, bool, str)) else type(v).__name__ for v in value))
+            else:
+                self.update_value(type(value).__name__)
+
+    def update_id_properties(self, struct):
+        """
+        Hashes custom properties of the struct, i.e. Geometry Nodes modifier inputs are stored as `modifier["Input_2"]`
+        """
+        for key in struct.keys():
+            value = struct[key]
+            if isinstance(value, bpy.types.ID):
+                value = value.name
+            elif hasattr(value, 'to_dict'):
+                value = value.to_dict()
+            elif hasattr(value, 'to_list'):
+                value = value.to_list()
+            self.update_value((key, value))
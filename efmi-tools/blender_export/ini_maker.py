@@ -1,12 +1,10 @@
 import hashlib
 import os
-import time
 import bpy
 
 from typing import List, Dict, Union, Optional, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
-from threading import Thread
 from datetime import datetime
 
 from ..addon.settings import EFMI_Settings
@@ -16,6 +14,7 @@ from ..migoto_io.blender_interface.objects import *
 from ..migoto_io.blender_interface.mesh import *
 
 from ..migoto_io.data_model.byte_buffer import NumpyBuffer
+from ..migoto_io.tracing import tracer
 
 from ..extract_frame_data.metadata_format import ExtractedObject
 
@@ -24,11 +23,70 @@ from .metadata_collector import Version, ModInfo
 from .texture_collector import Texture
 from .text_formatter import TextFormatter
 
-from ..libs.jinja2 import Environment, FileSystemLoader, TemplateSyntaxError, UndefinedError
-
-
-chached_template: Optional[str] = None
-chached_template_string: Optional[object] = None
+from ..libs.jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, Template, TemplateSyntaxError, UndefinedError
+
+
+# Suffix of template name to load it with `{{note` lines removed
+NO_COMMENTS_TEMPLATE_SUFFIX = ':no_comments'
+# Name of bytecode cache bucket for templates compiled from string
+CUSTOM_TEMPLATE_NAME = 'custom.ini.j2'
+
+template_environments: Dict[Tuple[str, ...], Environment] = {}
+
+
+def remove_template_comments(template_string: str) -> str:
+    result = ''
+    for line in template_string.split('\n'):
+        if not line.strip().startswith('{{note'):
+            result += line + '\n'
+    return result
+
+
+class TemplateLoader(FileSystemLoader):
+    """
+    FileSystemLoader that removes code comments from templates requested with NO_COMMENTS_TEMPLATE_SUFFIX
+    Template is reloaded once its file modification time changes
+    """
+    def get_source(self, environment, template):
+        remove_comments = template.endswith(NO_COMMENTS_TEMPLATE_SUFFIX)
+        if remove_comments:
+            template = template[:-len(NO_COMMENTS_TEMPLATE_SUFFIX)]
+        source, filename, uptodate = super().get_source(environment, template)
+        if remove_comments:
+            source = remove_template_comments(source)
+        return source, filename, uptodate
+
+
+def get_template_environment(search_paths: List[str]) -> Environment:
+    """
+    Returns session-wide Jinja environment for given search paths
+    Compiled templates are stored in on-disk bytecode cache and reused across Blender sessions
+    """
+    key = tuple(search_paths)
+    env = template_environments.get(key, None)
+    if env is None:
+        bytecode_cache_dir = get_cache_dir('IniTemplates')
+        bytecode_cache_dir.mkdir(parents=True, exist_ok=True)
+        env = Environment(
+            loader=TemplateLoader(search_paths),
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_cache_dir)),
+            auto_reload=True,
+        )
+        template_environments[key] = env
+    return env
+
+
+def load_template_from_string(env: Environment, template_string: str) -> Template:
+    """
+    Compiles template from string using bytecode cache of the environment, bucket gets recompiled once source changes
+    """
+    bucket = env.bytecode_cache.get_bucket(env, CUSTOM_TEMPLATE_NAME, None, template_string)
+    code = bucket.code
+    if code is None:
+        code = env.compile(template_string, CUSTOM_TEMPLATE_NAME)
+        bucket.code = code
+        env.bytecode_cache.set_bucket(bucket)
+    return env.template_class.from_code(env, code, env.make_globals(None))
 
 
 @dataclass
@@ -48,78 +106,31 @@ class IniMaker:
     # Output
     ini_string: str = field(init=False)
     
-    def start_live_write(self, context, cfg):
-        thread = Thread(target=self.live_write_thread, args=(context, cfg))
-        thread.start()
-
-    def live_write_thread(self, context, cfg):
-        print('Started live ini updates.')
-        
-        if cfg.custom_template_source == 'INTERNAL':
-            text = bpy.data.texts["CustomIniTemplate"]
-            template_string = None
-            custom_template_path = None
-            mod_time = None
-        else:
-            custom_template_path = resolve_path(cfg.custom_template_path)
-            mod_time = custom_template_path.stat().st_mtime
-        
-        while True:
-
-            if not cfg.custom_template_live_update:
-                print('Stopped live ini updates.')
-                return
-
-            if mod_time is None:
-                new_template_string = text.as_string()
-                template_updated = template_string != new_template_string
-                if template_updated:
-                    template_string = new_template_string
-            else:
-                new_mod_time = custom_template_path.stat().st_mtime
-                template_updated = mod_time != new_mod_time
-                if template_updated:
-                    new_template_string = self.get_custom_template(context, cfg)
-                    mod_time = new_mod_time
-
-            if template_updated:
-                try:
-                    result = self.build_from_template(context, cfg, template_string=new_template_string, with_checksum=True)
-                except ValueError as e:
-                    result = str(e)
-                except Exception as e:
-                    import traceback
-                    result = f'Ini Template error:\n\n{str(e)}\n\n\n{traceback.format_exc()}'
-
-                self.write(ini_string=result)
-
-            time.sleep(0.05)      
-
     @staticmethod
-    def get_default_template(context, cfg, remove_code_comments = False):
-
-        default_templates_path = Path(os.path.realpath(__file__)).parent.parent / 'templates'
+    def get_templates_path():
+        return Path(os.path.realpath(__file__)).parent.parent / 'templates'
 
+    @staticmethod
+    def get_default_template_name(cfg):
         if cfg.mod_skeleton_type == 'MERGED':
-            default_template_path = default_templates_path / 'merged.ini.j2'
+            return 'merged.ini.j2'
         elif cfg.mod_skeleton_type == 'COMPONENT':
-            default_template_path = default_templates_path / 'per_component.ini.j2'
+            return 'per_component.ini.j2'
         else:
             raise ValueError(f'Unknown skeleton type {cfg.mod_skeleton_type}!')
 
-        result = ''
+    @staticmethod
+    def get_default_template(context, cfg, remove_code_comments = False):
+
+        default_template_path = IniMaker.get_templates_path() / IniMaker.get_default_template_name(cfg)
 
         with open(default_template_path, 'r', encoding='utf-8') as f:
             raw_data = f.read()
 
-            if not remove_code_comments:
-                return raw_data
+        if not remove_code_comments:
+            return raw_data
 
-            for line in raw_data.split('\n'):
-                if not line.strip().startswith('{{note'):
-                    result += line + '\n'
-
-        return result
+        return remove_template_comments(raw_data)
 
     @staticmethod
     def get_custom_template(context, cfg):
@@ -139,41 +150,36 @@ class IniMaker:
         # Try to load custom template
         if template_string is None and cfg.use_custom_template:
             template_string = self.get_custom_template(context, cfg)
-        # Use default template if custom one is not configured or empty
-        if template_string is None or not(template_string.strip()):
-            template_string = self.get_default_template(context, cfg, remove_code_comments=not cfg.comment_ini)
-
-        global chached_template, chached_template_string
-        if chached_template_string is not None and template_string == chached_template_string:
-            template = chached_template
-        else:
-            start_time = time.time()
+        with tracer.span('Load ini template'):
             try:
-                templates_path = Path(os.path.realpath(__file__)).parent.parent / 'templates'
-                search_paths = [str(templates_path)]
+                search_paths = [str(self.get_templates_path())]
                 if cfg.use_custom_template and cfg.custom_template_source != 'INTERNAL':
                     custom_path = resolve_path(cfg.custom_template_path).parent
                     if custom_path.exists():
                         search_paths.append(str(custom_path))
-                env = Environment(loader=FileSystemLoader(search_paths))
-                template = env.from_string(template_string)
-                chached_template = template
-                chached_template_string = template_string
+                env = get_template_environment(search_paths)
+                if template_string is None or not(template_string.strip()):
+                    # Use default template if custom one is not configured or empty
+                    template_name = self.get_default_template_name(cfg)
+                    if not cfg.comment_ini:
+                        template_name += NO_COMMENTS_TEMPLATE_SUFFIX
+                    template = env.get_template(template_name)
+                else:
+                    template = load_template_from_string(env, template_string)
             except TemplateSyntaxError as e:
-                template_lines = template_string.split('\n')
+                template_lines = (e.source or template_string or '').split('\n')
                 template_fragment = ''
                 start_line = max(0, e.lineno - 4)
                 end_line = min(len(template_lines), e.lineno + 2)
-                
+            
                 for i in range(start_line, end_line):
                     template_fragment += f'{i+1}: {template_lines[i]}\n'
-                    
+                
                 raise ValueError(f'Ini Template syntax error:\n\n'
                                  f'{e.message}\n\n'
                                  f'Line Number: {e.lineno} (actual cause may be located above this line)\n\n'
                                  f'Template Fragment:\n'
                                  f'{template_fragment}')
-            print(f'Ini template caching time: {time.time() - start_time :.3f}s')
 
         try:
             rendered_string = template.render({**vars(self), 'enumerate': enumerate})
@@ -0,0 +1,170 @@
+import hashlib
+import traceback
+import bpy
+
+from typing import Optional
+
+from ..addon.settings import EFMI_Settings
+from ..migoto_io.blender_interface.utility import resolve_path
+
+from .ini_maker import IniMaker
+
+
+class LiveIniUpdater:
+    """
+    Rebuilds mod.ini on changes of ini template or settings while live updates are enabled
+    Changes are reported by depsgraph updates and settings property notifications, bursts of them are coalesced with debounce
+    Template is re-rendered only when fingerprint of its inputs differs from the one of the last written mod.ini
+    """
+    def __init__(self, ini_maker: IniMaker, context: bpy.types.Context, cfg: EFMI_Settings):
+        self.ini_maker = ini_maker
+        self.context = context
+        self.cfg = cfg
+        self.fingerprint: Optional[str] = None
+        self.template_signature = None
+
+    def get_template_signature(self):
+        """
+        Returns cheap to calculate value that changes along with the template source
+        Template edits don't trigger any Blender notifications, so it's checked with low frequency
+        """
+        if self.cfg.custom_template_source == 'INTERNAL':
+            text = bpy.data.texts.get('CustomIniTemplate', None)
+            return text.as_string() if text is not None else None
+        else:
+            try:
+                stat = resolve_path(self.cfg.custom_template_path).stat()
+            except OSError:
+                return None
+            return stat.st_mtime_ns, stat.st_size
+
+    def get_fingerprint(self, template_string: str) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(template_string.encode('utf-8'))
+        hasher.update(repr(self.get_struct_values(self.cfg)).encode())
+        return hasher.hexdigest()
+
+    @staticmethod
+    def get_struct_values(struct):
+        result = []
+        for prop in struct.bl_rna.properties:
+            if prop.identifier == 'rna_type':
+                continue
+            value = getattr(struct, prop.identifier, None)
+            if prop.type == 'POINTER' and isinstance(value, bpy.types.PropertyGroup):
+                value = LiveIniUpdater.get_struct_values(value)
+            elif prop.type == 'COLLECTION':
+                value = [LiveIniUpdater.get_struct_values(item) for item in value]
+            elif isinstance(value, bpy.types.ID):
+                value = value.name
+            elif hasattr(value, '__len__') and not isinstance(value, str):
+                value = tuple(value)
+            result.append((prop.identifier, value))
+        return result
+
+    def update(self):
+        try:
+            template_string = self.ini_maker.get_custom_template(self.context, self.cfg)
+        except Exception as e:
+            self.fingerprint = None
+            result = f'Ini Template error:\n\n{str(e)}'
+        else:
+            fingerprint = self.get_fingerprint(template_string or '')
+            if fingerprint == self.fingerprint:
+                return
+            self.fingerprint = fingerprint
+            try:
+                result = self.ini_maker.build_from_template(self.context, self.cfg, template_string=template_string, with_checksum=True)
+            except ValueError as e:
+                result = str(e)
+            except Exception as e:
+                result = f'Ini Template error:\n\n{str(e)}\n\n\n{traceback.format_exc()}'
+
+        self.ini_maker.write(ini_string=result)
+
+
+live_ini_updater: Optional[LiveIniUpdater] = None
+
+debounce_interval = 0.2
+template_watch_interval = 0.5
+
+
+def start_live_ini_updates(ini_maker: IniMaker, context: bpy.types.Context, cfg: EFMI_Settings):
+    global live_ini_updater
+
+    stop_live_ini_updates()
+
+    live_ini_updater = LiveIniUpdater(ini_maker, context, cfg)
+    live_ini_updater.template_signature = live_ini_updater.get_template_signature()
+
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    for prop in cfg.bl_rna.properties:
+        if prop.identifier == 'rna_type' or prop.type in ['POINTER', 'COLLECTION']:
+            continue
+        bpy.msgbus.subscribe_rna(
+            key=cfg.path_resolve(prop.identifier, False),
+            owner=live_ini_updater,
+            args=(),
+            notify=request_live_ini_update,
+        )
+    bpy.app.timers.register(watch_live_ini_template, first_interval=template_watch_interval)
+
+    print('Started live ini updates.')
+
+    live_ini_updater.update()
+
+
+def stop_live_ini_updates():
+    global live_ini_updater
+
+    if live_ini_updater is None:
+        return
+
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+    bpy.msgbus.clear_by_owner(live_ini_updater)
+    for timer in [run_live_ini_update, watch_live_ini_template]:
+        if bpy.app.timers.is_registered(timer):
+            bpy.app.timers.unregister(timer)
+
+    live_ini_updater = None
+
+    print('Stopped live ini updates.')
+
+
+def request_live_ini_update():
+    """
+    Schedules mod.ini rebuild, every new request within debounce interval postpones it further
+    """
+    if bpy.app.timers.is_registered(run_live_ini_update):
+        bpy.app.timers.unregister(run_live_ini_update)
+    bpy.app.timers.register(run_live_ini_update, first_interval=debounce_interval)
+
+
+def on_depsgraph_update(scene, depsgraph):
+    # Geometry updates caused by editing, sculpting or painting of objects cannot affect mod.ini
+    if depsgraph.id_type_updated('SCENE') or depsgraph.id_type_updated('TEXT'):
+        request_live_ini_update()
+
+
+def run_live_ini_update():
+    if live_ini_updater is None:
+        return None
+    if not live_ini_updater.cfg.custom_template_live_update:
+        stop_live_ini_updates()
+        return None
+    live_ini_updater.update()
+    return None
+
+
+def watch_live_ini_template():
+    if live_ini_updater is None:
+        return None
+    if not live_ini_updater.cfg.custom_template_live_update:
+        stop_live_ini_updates()
+        return None
+    template_signature = live_ini_updater.get_template_signature()
+    if template_signature != live_ini_updater.template_signature:
+        live_ini_updater.template_signature = template_signature
+        request_live_ini_update()
+    return template_watch_interval
@@ -1,7 +1,8 @@
 import re
+import numpy
 import bpy
 
-from typing import List, Dict, Union
+from typing import List, Dict, Union, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from textwrap import dedent
@@ -64,205 +65,179 @@ class MergedObject:
     blend_remap_count: int = 0
 
 
+def get_data_array(data_source, data_name, data_type, width=1):
+    """
+    Returns (len(data_source), width) array of data_name property values fetched via foreach_get
+    """
+    result = numpy.empty(len(data_source) * width, dtype=data_type)
+    data_source.foreach_get(data_name, result)
+    return result.reshape(-1, width) if width > 1 else result
 
 
-import math
-from mathutils import Vector, Matrix
-
 def unit_vector_to_octahedron(n):
     """
-    Converts a unit vector to octahedron coordinates.
-    n is a mathutils.Vector
+    Converts (N, 3) array of unit vectors to (N, 2) array of octahedron coordinates.
+    Zero-length vectors are converted to (0, 0).
     """
-    # Ensure input is a unit vector
-    if n.length_squared > 1e-10:
-        n.normalize()
-    else:
-        return Vector((0.0, 0.0))
+    n = numpy.asarray(n, dtype=numpy.float64).reshape(-1, 3)
+
+    result = numpy.zeros((len(n), 2), dtype=numpy.float64)
 
-    # Calculate L1 norm
-    l1_norm = abs(n.x) + abs(n.y) + abs(n.z)
-    if l1_norm < 1e-10:
-        return Vector((0.0, 0.0))
+    # Calculate L1 norm, projection is scale-independent so there's no need to normalize input first
+    l1_norm = numpy.abs(n).sum(axis=1)
+    valid = l1_norm >= 1e-10
 
     # Project to octahedron plane
-    x = n.x / l1_norm
-    y = n.y / l1_norm
+    result[valid] = n[valid, :2] / l1_norm[valid, None]
 
     # Negative hemisphere mapping (only applied when z < 0)
-    if n.z < 0:
-        # Use precise sign function
-        sign_x = math.copysign(1.0, x)
-        sign_y = math.copysign(1.0, y)
-
-        # Original mapping formula (preserves good behavior at z=0)
-        new_x = (1.0 - abs(y)) * sign_x
-        new_y = (1.0 - abs(x)) * sign_y
-
-        # Apply new coordinates directly (remove transition interpolation)
-        x = new_x
-        y = new_y
-
-    return Vector((x, y))
-
-# def calc_smooth_normals(mesh):
-#     """Calculate smooth normals (angle-weighted average)"""
-#     vertex_normals = {}
-
-#     # Use vertex index as key (avoid floating point precision issues)
-#     for i, vert in enumerate(mesh.vertices):
-#         vertex_normals[i] = Vector((0, 0, 0))
-
-#     # Calculate normal for each face and accumulate to vertices with weighting
-#     for poly in mesh.polygons:
-#         verts = [mesh.vertices[i] for i in poly.vertices]
-#         face_normal = poly.normal
-
-#         for i, vert in enumerate(verts):
-#             # Get adjacent edge vectors
-#             v1 = verts[(i+1) % len(verts)].co - vert.co
-#             v2 = verts[(i-1) % len(verts)].co - vert.co
-
-#             # Calculate angle weight
-#             v1_len = v1.length
-#             v2_len = v2.length
-#             if v1_len > 1e-6 and v2_len > 1e-6:
-#                 v1.normalize()
-#                 v2.normalize()
-#                 weight = math.acos(max(-1.0, min(1.0, v1.dot(v2))))
-#             else:
-#                 weight = 0.0
-
-#             # Accumulate weighted normals
-#             vertex_normals[vert.index] += face_normal * weight
-
-#     # Normalize normals
-#     for idx in vertex_normals:
-#         if vertex_normals[idx].length > 1e-6:
-#             vertex_normals[idx].normalize()
-
-#     return vertex_normals
+    negative = valid & (n[:, 2] < 0)
+    x, y = result[negative, 0], result[negative, 1]
+    # copysign keeps sign of -0.0, this mapping preserves good behavior at z=0
+    result[negative, 0] = (1.0 - numpy.abs(y)) * numpy.copysign(1.0, x)
+    result[negative, 1] = (1.0 - numpy.abs(x)) * numpy.copysign(1.0, y)
+
+    return result
+
 
 def calc_smooth_normals(mesh):
-    vertex_normals = {i: Vector((0,0,0)) for i in range(len(mesh.vertices))}
+    """
+    Returns (vertex_count, 3) array of smooth normals (face normals accumulated with corner angle weights)
+    """
+    positions = get_data_array(mesh.vertices, 'co', numpy.float32, 3)
+    loop_vertex_ids = get_data_array(mesh.loops, 'vertex_index', numpy.int32)
+    loop_starts = get_data_array(mesh.polygons, 'loop_start', numpy.int32)
+    loop_totals = get_data_array(mesh.polygons, 'loop_total', numpy.int32)
+    face_normals = get_data_array(mesh.polygons, 'normal', numpy.float32, 3)
 
-    for poly in mesh.polygons:
-        coords = [mesh.vertices[i].co for i in poly.vertices]
-        face_normal = poly.normal
+    # Map every loop to its polygon, loops of each polygon are stored in a contiguous block starting at loop_start
+    polygon_order = numpy.argsort(loop_starts, kind='stable')
+    loop_polygon_ids = numpy.repeat(polygon_order, loop_totals[polygon_order])
 
-        for i, vi in enumerate(poly.vertices):
-            v_prev = coords[i-1] - coords[i]
-            v_next = coords[(i+1) % len(coords)] - coords[i]
+    # Find previous and next loops of the same polygon
+    starts = loop_starts[loop_polygon_ids]
+    totals = loop_totals[loop_polygon_ids]
+    local_ids = numpy.arange(len(loop_vertex_ids)) - starts
+    prev_loop_ids = starts + (local_ids - 1) % totals
+    next_loop_ids = starts + (local_ids + 1) % totals
 
-            # if v_prev.length < 1e-8 or v_next.length < 1e-8:
-            #     continue
+    coords = positions[loop_vertex_ids]
+    v_prev = coords[prev_loop_ids] - coords
+    v_next = coords[next_loop_ids] - coords
 
-            # angle at vertex
-            weight = v_prev.angle(v_next)
-            vertex_normals[vi] += face_normal * weight
+    # Angle at vertex, degenerate corners get zero weight
+    weights = numpy.arctan2(numpy.linalg.norm(numpy.cross(v_prev, v_next), axis=1), numpy.einsum('ij,ij->i', v_prev, v_next))
+
+    vertex_normals = numpy.zeros((len(positions), 3), dtype=numpy.float64)
+    numpy.add.at(vertex_normals, loop_vertex_ids, face_normals[loop_polygon_ids] * weights[:, None])
 
     # Normalize accumulated normals
-    for idx, n in vertex_normals.items():
-        vertex_normals[idx] = n.normalized()
-        # if n.length > 1e-8:
-        #     vertex_normals[idx] = n.normalized()
-        # else:
-        #     vertex_normals[idx] = Vector((0,0,1))
+    lengths = numpy.linalg.norm(vertex_normals, axis=1)
+    valid = lengths > 0
+    vertex_normals[valid] /= lengths[valid, None]
 
     return vertex_normals
 
-def process_object(obj):
 
+def process_object(obj):
+    """
+    Bakes smooth normals converted to tangent space into COLOR1 attribute as octahedron coordinates
+    """
     mesh = obj.data
 
-    # # Set active UV to first layer (index 0) before operation
-    # if len(mesh.uv_layers) > 0:
-    #     mesh.uv_layers.active_index = 0
-
     # Calculate smooth normals
     smooth_normals = calc_smooth_normals(mesh)
 
-    # # Ensure mesh has UV layer (required for tangent calculation)
-    # if len(mesh.uv_layers) == 0:
-    #     mesh.uv_layers.new(name="UVMap")
-
     # Calculate tangent space (TBN matrix)
     mesh.calc_tangents()
+    loop_vertex_ids = get_data_array(mesh.loops, 'vertex_index', numpy.int32)
+    tangents = get_data_array(mesh.loops, 'tangent', numpy.float32, 3)
+    bitangents = get_data_array(mesh.loops, 'bitangent', numpy.float32, 3)
+    normals = get_data_array(mesh.loops, 'normal', numpy.float32, 3)
+    # Free tangent data
+    mesh.free_tangents()
 
-    # # Create/get UV layer
-    # uv_layer_name = "TEXCOORD3.xy"
-    # if uv_layer_name in mesh.uv_layers:
-    #     uv_layer = mesh.uv_layers[uv_layer_name]
-    # else:
-    #     uv_layer = mesh.uv_layers.new(name=uv_layer_name)
+    normal = smooth_normals[loop_vertex_ids]
+
+    # Transform normals from model space to tangent space with inverse of TBN matrix (tangent, bitangent and normal as columns)
+    # Rows of the inverse are cross products of the columns divided by determinant
+    bn = numpy.cross(bitangents, normals)
+    nt = numpy.cross(normals, tangents)
+    tb = numpy.cross(tangents, bitangents)
+    determinants = numpy.einsum('ij,ij->i', tangents, bn)
+    tangent_normals = numpy.stack([
+        numpy.einsum('ij,ij->i', bn, normal),
+        numpy.einsum('ij,ij->i', nt, normal),
+        numpy.einsum('ij,ij->i', tb, normal),
+    ], axis=1)
+
+    invertible = determinants != 0
+    tangent_normals[invertible] /= determinants[invertible, None]
+
+    if not invertible.all():
+        # Fallback for non-invertible matrix
+        print(f'Warning: TBN matrix is non-invertible for {numpy.count_nonzero(~invertible)} loops of {obj.name}, using default normal')
+
+    # Default to Z-axis as normal
+    lengths = numpy.linalg.norm(tangent_normals, axis=1)
+    valid = invertible & (lengths > 1e-6)
+    tangent_normals[valid] /= lengths[valid, None]
+    tangent_normals[~valid] = (0, 0, 1)
+
+    # Octahedral projection
+    oct_coords = unit_vector_to_octahedron(tangent_normals)
+
+    # Color (RGBA)
+    colors = numpy.zeros((len(oct_coords), 4), dtype=numpy.float32)
+    colors[:, 0] = 1 - (oct_coords[:, 0] * 0.5 + 0.5)
+    colors[:, 1] = oct_coords[:, 1] * 0.5 + 0.5
+
+    # Replace existing attribute, otherwise new one would be created as COLOR1.001
+    color_attribute = mesh.color_attributes.get('COLOR1')
+    if color_attribute is not None:
+        mesh.color_attributes.remove(color_attribute)
+    color_attribute = mesh.color_attributes.new(name='COLOR1', type='FLOAT_COLOR', domain='CORNER')
+    color_attribute.data.foreach_set('color', colors.ravel())
+
+
+
+def get_component_objects(collection,
+                          component_id = -1,
+                          ignore_nested_collections = False,
+                          ignore_hidden_collections = False,
+                          ignore_hidden_objects = False,
+                          force_object_name = '') -> List[Tuple[int, bpy.types.Object]]:
+    """
+    Returns list of (component_id, object) of collection objects eligible for export as components
+    """
+    if force_object_name:
+        component_pattern = re.compile(r'^{}'.format(force_object_name))
+    elif component_id == -1:
+        component_pattern = re.compile(r'.*component[_ -]*(\d+).*')
+    else:
+        component_pattern = re.compile(r'.*component[_ -]*({})(?!\d).*'.format(component_id))
 
-    color_attribute = mesh.color_attributes.new(name="COLOR1", type='FLOAT_COLOR', domain='CORNER')
-        
-    # Process each vertex of each face
-    for poly in mesh.polygons:
-        for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-            loop = mesh.loops[loop_idx]
-            vertex_idx = loop.vertex_index
-
-            # Get smooth normal
-            normal = smooth_normals[vertex_idx]
-
-            # Build TBN matrix (tangent space to model space transformation)
-            tbn_matrix = Matrix((
-                loop.tangent,
-                loop.bitangent,
-                loop.normal
-            )).transposed() # Transpose to convert from row vectors to column vectors
-
-            # Check if matrix is invertible
-            try:
-                # Attempt to calculate inverse matrix
-                tbn_inverse = tbn_matrix.inverted()
-
-                # Transform normal from model space to tangent space
-                tangent_normal = tbn_inverse @ normal
-                tangent_normal.normalize()
-            except ValueError:
-                # Fallback for non-invertible matrix
-                print(f"Warning: TBN matrix for vertex {vertex_idx} is non-invertible, using default normal")
-
-                tangent_normal = Vector((0, 0, 1))  # Default to Z-axis as normal
-
-            # # Get smooth normal (model space)
-            # normal = smooth_normals[vertex_idx].normalized()
-
-            # # UE4-correct TBN
-            # T = loop.tangent.normalized()
-            # N = loop.normal.normalized()
-            # B = N.cross(T) * loop.bitangent_sign  # IMPORTANT
-
-            # # Transform into tangent space
-            # tangent_normal = Vector((
-            #     normal.dot(T),
-            #     normal.dot(B),
-            #     normal.dot(N)
-            # ))
-
-            if tangent_normal.length > 1e-6:
-                tangent_normal.normalize()
-            else:
-                tangent_normal = Vector((0, 0, 1))
+    result = []
 
-            # Octahedral projection
-            oct_coords = unit_vector_to_octahedron(tangent_normal)
-            
-            # # Set UV coordinates
-            # u = oct_coords.x
-            # v = oct_coords.y + 1.0
-            # uv_layer.data[loop_idx].uv = (u, v)
+    for obj in get_collection_objects(collection, 
+                                      recursive = not ignore_nested_collections, 
+                                      skip_hidden_collections = ignore_hidden_collections):
 
-            # Color (RGBA)
-            color_attribute.data[loop_idx].color = (1 - (oct_coords.x * 0.5 + 0.5), (oct_coords.y * 0.5 + 0.5), 0, 0)
+        if ignore_hidden_objects and object_is_hidden(obj):
+            continue
 
-            # color_attribute.data[loop_idx].color = (0, 0, 0, 0)
+        if obj.name.startswith('TEMP_'):
+            continue
+        
+        if not force_object_name:
+            match = component_pattern.findall(obj.name.lower())
+            if len(match) == 0:
+                continue
+            result.append((int(match[0]), obj))
+        elif force_object_name == obj.name:
+            result.append((0, obj))
 
-    # Free tangent data
-    mesh.free_tangents()
+    return result
 
 
 @dataclass
@@ -283,6 +258,7 @@ class ObjectMerger:
     add_missing_vertex_groups: bool = False
     force_object_name: str =''
     allow_empty_components: bool = False
+    bake_smooth_normals: bool = False
     # Output
     merged_object: MergedObject = field(init=False)
 
@@ -329,33 +305,13 @@ class ObjectMerger:
     def import_objects_from_collection(self):
 
         num_objects = 0
-        
-        if self.force_object_name:
-            component_pattern = re.compile(r'^{}'.format(self.force_object_name))
-        elif self.component_id == -1:
-            component_pattern = re.compile(r'.*component[_ -]*(\d+).*')
-        else:
-            component_pattern = re.compile(r'.*component[_ -]*({})(?!\d).*'.format(self.component_id))
-
-        for obj in get_collection_objects(self.collection, 
-                                          recursive = not self.ignore_nested_collections, 
-                                          skip_hidden_collections = self.ignore_hidden_collections):
-
-            if self.ignore_hidden_objects and object_is_hidden(obj):
-                continue
 
-            if obj.name.startswith('TEMP_'):
-                continue
-            
-            if not self.force_object_name:
-                match = component_pattern.findall(obj.name.lower())
-                if len(match) == 0:
-                    continue
-                component_id = int(match[0])
-            elif self.force_object_name == obj.name:
-                component_id = 0
-            else:
-                continue
+        for component_id, obj in get_component_objects(self.collection,
+                                                       component_id=self.component_id,
+                                                       ignore_nested_collections=self.ignore_nested_collections,
+                                                       ignore_hidden_collections=self.ignore_hidden_collections,
+                                                       ignore_hidden_objects=self.ignore_hidden_objects,
+                                                       force_object_name=self.force_object_name):
 
             if component_id >= len(self.extracted_object.components):
                 raise ConfigError('object_source_folder', f'Metadata.json in specified folder is missing Component {component_id}!\nMost likely it contains sources for other object.')
@@ -431,7 +387,9 @@ class ObjectMerger:
                 for vg in get_vertex_groups(temp_obj):
                     vg.name = str(vg.index)
 
-                # process_object(temp_obj)
+                # Bake smooth normals into COLOR1 attribute
+                if self.bake_smooth_normals:
+                    process_object(temp_obj)
 
                 # Calculate vertex count of temporary object
                 temp_object.vertex_count = len(temp_obj.data.vertices)
@@ -0,0 +1,128 @@
+"""
+Headless entry point for batch jobs, runs objects extraction and mod export without EFMI Tools UI:
+
+    blender --background --factory-startup --python-exit-code 1 --python cli.py -- extract --config job.json
+    blender --background --factory-startup --python-exit-code 1 --python cli.py -- extract-lods --config job.json
+    blender --background project.blend --python-exit-code 1 --python cli.py -- export --config job.json
+
+Config is JSON object with EFMI_Settings property names as keys (i.e. `frame_dump_folder`), enum properties
+are set by item identifiers and data-block pointers (i.e. `component_collection`) by data-block names
+Job returns exit code 1 on any error, `--python-exit-code 1` passes it to Blender process for schedulers to see
+"""
+import sys
+import json
+import typing
+import argparse
+import traceback
+import importlib
+
+from pathlib import Path
+
+import bpy
+
+
+def get_settings_classes(settings_cls) -> list:
+    """
+    Returns PropertyGroup classes required to register given one, ordered by dependencies
+    """
+    from .auto_load import get_dependency_from_annotation
+    result = []
+    for value in typing.get_type_hints(settings_cls, {}, {}).values():
+        dependency = get_dependency_from_annotation(value)
+        if dependency is not None and issubclass(dependency, bpy.types.PropertyGroup):
+            for cls in get_settings_classes(dependency):
+                if cls not in result:
+                    result.append(cls)
+    result.append(settings_cls)
+    return result
+
+
+def register_settings():
+    """
+    Registers only EFMI_Settings and its property groups, operators and panels are not needed to run the jobs
+    """
+    from .addon.settings import EFMI_Settings
+    for cls in get_settings_classes(EFMI_Settings):
+        if not getattr(cls, 'is_registered', False):
+            bpy.utils.register_class(cls)
+    if not hasattr(bpy.types.Scene, 'efmi_tools_settings'):
+        bpy.types.Scene.efmi_tools_settings = bpy.props.PointerProperty(type=EFMI_Settings)
+    return bpy.context.scene.efmi_tools_settings
+
+
+def apply_settings(cfg, settings: dict):
+    id_data_collections = {
+        'Collection': bpy.data.collections,
+        'Object': bpy.data.objects,
+        'Text': bpy.data.texts,
+    }
+    for name, value in settings.items():
+        prop = cfg.bl_rna.properties.get(name, None)
+        if prop is None or name == 'rna_type':
+            raise ValueError(f'Unknown setting `{name}`!')
+        if prop.type == 'COLLECTION':
+            raise ValueError(f'Setting `{name}` cannot be configured from command line!')
+        if prop.type == 'POINTER':
+            if isinstance(value, dict):
+                apply_settings(getattr(cfg, name), value)
+                continue
+            if value is not None:
+                id_data = id_data_collections.get(prop.fixed_type.identifier, None)
+                if id_data is None or value not in id_data:
+                    raise ValueError(f'Setting `{name}` references unknown {prop.fixed_type.identifier} `{value}`!')
+                value = id_data[value]
+        setattr(cfg, name, value)
+
+
+def run_extract(cfg, extract_lods: bool = False):
+    from .extract_frame_data.extract_frame_data import extract_frame_data
+    objects = extract_frame_data(cfg, extract_lods=extract_lods)
+    if not extract_lods:
+        for object_hash, object_data in objects.items():
+            if object_data.shapekeys.offsets_hash and not object_data.shapekeys.shapekey_offsets:
+                print(f'WARNING: Object {object_hash} was skipped: frame dump is missing shapekeys data!')
+
+
+def run_export(cfg):
+    from .blender_export.blender_export import blender_export, get_excluded_buffers
+    # Live updates require running Blender UI to receive template changes
+    cfg.custom_template_live_update = False
+    blender_export(None, bpy.context, cfg, get_excluded_buffers(cfg))
+
+
+def main(argv: list) -> int:
+    from .addon.exceptions import ConfigError
+
+    parser = argparse.ArgumentParser(prog='cli.py', description='EFMI Tools headless mode')
+    parser.add_argument('command', choices=['extract', 'extract-lods', 'export'])
+    parser.add_argument('--config', type=Path, required=True, help='path to JSON file with EFMI_Settings values')
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+        cfg = register_settings()
+        apply_settings(cfg, settings)
+        if args.command == 'extract':
+            run_extract(cfg)
+        elif args.command == 'extract-lods':
+            run_extract(cfg, extract_lods=True)
+        elif args.command == 'export':
+            run_export(cfg)
+    except (ConfigError, ValueError) as e:
+        print(f'ERROR: {e}')
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    # Script is executed outside of the package, so it imports the add-on by its folder name to resolve relative imports
+    addon_path = Path(__file__).resolve().parent
+    sys.path.insert(0, str(addon_path.parent))
+    cli = importlib.import_module(f'{addon_path.name}.cli')
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    sys.exit(cli.main(argv))
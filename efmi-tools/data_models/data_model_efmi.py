@@ -1,8 +1,6 @@
-import time
 import re
 import numpy
 import bpy
-import json
 
 
 from typing import Tuple, List, Dict, Optional
@@ -10,7 +8,8 @@ from typing import Tuple, List, Dict, Optional
 
 from ..migoto_io.data_model.dxgi_format import DXGIFormat, DXGIType
 from ..migoto_io.data_model.byte_buffer import Semantic, AbstractSemantic, BufferSemantic, BufferLayout, NumpyBuffer, MigotoFmt
-from ..migoto_io.data_model.data_model import DataModel
+from ..migoto_io.data_model.data_model import DataModel, export_data_store
+from ..migoto_io.tracing import tracer
 
 
 class DataModelEFMI(DataModel):
@@ -197,7 +196,9 @@ class DataModelEFMI(DataModel):
             if blend_buffer is not None:
                 index_buffer = buffers.get('Index', None)
                 vg_buffer = buffers.get('BlendRemapVertexVG', None)
-                blend_remaps = self.build_blend_remap(context, object_index_layout, index_buffer, blend_buffer, vg_buffer)
+                with tracer.span('Build blend remap') as span:
+                    blend_remaps = self.build_blend_remap(context, object_index_layout, index_buffer, blend_buffer, vg_buffer)
+                    span.add(count=len(blend_remaps['BlendRemapForward']) // 512)
                 buffers.update(blend_remaps)
 
         return buffers, len(vertex_ids)
@@ -318,13 +319,10 @@ class DataModelEFMI(DataModel):
                          blend_buffer: NumpyBuffer,
                          vg_buffer: NumpyBuffer) -> Dict[str, NumpyBuffer]:
         
-        start_time = time.time()
-
-        remapped_vgs_counts = []
-
-        if context.scene.efmi_tools_settings.index_data_cache:
-            # Partial export is enabled and index buffer cache exists, lets load it
-            index_data = numpy.array(json.loads(context.scene.efmi_tools_settings.index_data_cache)).ravel()
+        index_data = export_data_store.load(context.scene.efmi_tools_settings.index_data_cache)
+        if index_data is not None:
+            # Partial export is enabled and index buffer cache exists
+            index_data = index_data.ravel()
         else:
             if index_buffer is None:
                 raise ValueError(f'Failed to build blend remap: `Index` buffer does not exist!')
@@ -332,56 +330,44 @@ class DataModelEFMI(DataModel):
 
         vg_ids = vg_buffer.get_field(vg_buffer.layout.get_element(AbstractSemantic(Semantic.Blendindices, 1)))
         vg_weights = blend_buffer.get_field(blend_buffer.layout.get_element(AbstractSemantic(Semantic.Blendweight, 0)))
-        
-        blend_remap_forward = numpy.empty(0, dtype=numpy.uint16)
-        blend_remap_reverse = numpy.empty(0, dtype=numpy.uint16)
-
-        index_offset = 0
-        for index_count in index_layout:
-            # Skip remapping the component if its custom mesh is empty
-            if index_count == 0:
-                remapped_vgs_counts.append(0)
-                continue
-    
-            # Extract a segment of Index Buffer for the component (index_count number of indices starting from index_offset)
-            vertex_ids = index_data[index_offset:index_offset+index_count]
-            # Remove duplicate vertex ids (since multiple indices may reference the same vertex)
-            vertex_ids = numpy.unique(vertex_ids)
 
-            # Get VG ids used to weight vertices used in the component
-            obj_vg_ids = vg_ids[vertex_ids].flatten()
-            
-            # Skip remapping the component if it references VG ids below 256 only
-            if numpy.max(obj_vg_ids) < 256:
-                index_offset += index_count
-                remapped_vgs_counts.append(0)
-                continue
-
-            # Get weights for vertices referenced by the component
-            obj_vg_weights = vg_weights[vertex_ids].flatten()
-            # Get indices of non-zero weights (to skip remapping VG ids that are listed but not actually used)
-            non_zero_idx = numpy.nonzero(obj_vg_weights > 0)[0]
-
-            obj_vg_ids = obj_vg_ids[non_zero_idx]
-            obj_vg_ids = numpy.unique(obj_vg_ids)
-
-            if numpy.max(obj_vg_ids) < 256:
-                index_offset += index_count
-                remapped_vgs_counts.append(0)
-                continue
-            
-            remapped_vgs_counts.append(len(obj_vg_ids))
+        vertex_count = len(vg_ids)
+        vg_ids = vg_ids.reshape(vertex_count, -1)
+        vg_weights = vg_weights.reshape(vertex_count, -1)
+
+        # All components are processed at once, every index is tagged with id of component it belongs to
+        index_counts = numpy.array(index_layout, dtype=numpy.int64)
+        components_count = len(index_counts)
+        component_ids = numpy.repeat(numpy.arange(components_count), index_counts)
+
+        # Mark vertices used by every component, multiple indices may reference the same vertex
+        component_vertices = numpy.zeros((components_count, vertex_count), dtype=bool)
+        component_vertices[component_ids, index_data[:len(component_ids)]] = True
+        component_ids, vertex_ids = numpy.nonzero(component_vertices)
 
-            forward = numpy.zeros(512, dtype=numpy.uint16)
-            forward[numpy.arange(len(obj_vg_ids))] = obj_vg_ids
+        # Mark VG ids used by every component, VG ids with zero weights are listed but not actually used
+        non_zero_weights = vg_weights[vertex_ids] > 0
+        component_vgs = numpy.zeros((components_count, int(vg_ids.max(initial=0)) + 1), dtype=bool)
+        component_vgs[
+            numpy.broadcast_to(component_ids[:, None], non_zero_weights.shape)[non_zero_weights],
+            vg_ids[vertex_ids][non_zero_weights]
+        ] = True
 
-            reverse = numpy.zeros(512, dtype=numpy.uint16)
-            reverse[obj_vg_ids] = numpy.arange(len(obj_vg_ids))
+        # Only components referencing VG ids above 255 are remapped
+        used_vgs_counts = component_vgs.sum(axis=1)
+        remapped = component_vgs[:, 256:].any(axis=1)
+        remapped_vgs_counts = numpy.where(remapped, used_vgs_counts, 0)
 
-            blend_remap_forward = numpy.concatenate((blend_remap_forward, forward), axis=0)
-            blend_remap_reverse = numpy.concatenate((blend_remap_reverse, reverse), axis=0)
+        # Used VG ids of remapped components are listed in ascending order, so their positions are offsets from row starts
+        remap_ids, obj_vg_ids = numpy.nonzero(component_vgs[remapped])
+        remap_vg_counts = used_vgs_counts[remapped]
+        remap_vg_positions = numpy.arange(len(obj_vg_ids)) - (numpy.cumsum(remap_vg_counts) - remap_vg_counts)[remap_ids]
 
-            index_offset += index_count
+        blend_remap_forward = numpy.zeros((len(remap_vg_counts), 512), dtype=numpy.uint16)
+        blend_remap_forward[remap_ids, remap_vg_positions] = obj_vg_ids
+
+        blend_remap_reverse = numpy.zeros((len(remap_vg_counts), 512), dtype=numpy.uint16)
+        blend_remap_reverse[remap_ids, obj_vg_ids] = remap_vg_positions
 
         buffers = {}
 
@@ -395,10 +381,8 @@ class DataModelEFMI(DataModel):
             BufferSemantic(AbstractSemantic(Semantic.RawData, 2), DXGIFormat.R32_UINT),
         ]))
 
-        buffers['BlendRemapForward'].set_data(blend_remap_forward)
-        buffers['BlendRemapReverse'].set_data(blend_remap_reverse)
-        buffers['BlendRemapLayout'].set_data(numpy.array(remapped_vgs_counts))
-
-        print(f'Blend remap time: {time.time() - start_time :.3f}s ({int(len(blend_remap_forward) / 512)} remaps)')
+        buffers['BlendRemapForward'].set_data(blend_remap_forward.ravel())
+        buffers['BlendRemapReverse'].set_data(blend_remap_reverse.ravel())
+        buffers['BlendRemapLayout'].set_data(remapped_vgs_counts)
 
         return buffers
@@ -1,12 +1,13 @@
 import logging
 import copy
+import numpy
 
 from dataclasses import dataclass, field
 from typing import List, Dict
 from pathlib import Path
 from collections import OrderedDict
 
-from ..migoto_io.data_model.byte_buffer import ByteBuffer, IndexBuffer, BufferLayout, BufferSemantic, AbstractSemantic, Semantic, NumpyBuffer
+from ..migoto_io.data_model.byte_buffer import IndexBuffer, BufferLayout, BufferSemantic, AbstractSemantic, Semantic, NumpyBuffer
 from ..migoto_io.dump_parser.filename_parser import ResourceDescriptor, WrappedResource
 
 from .data_extractor import ShapeKeyData, DrawData
@@ -32,8 +33,8 @@ class MeshComponent:
     textures: Dict[str, List[ResourceDescriptor]]
     ib_source: WrappedResource
     # index_buffer: IndexBuffer
-    # vertex_buffer: ByteBuffer
-    # skeleton_buffer: ByteBuffer
+    # vertex_buffer: NumpyBuffer
+    # skeleton_buffer: NumpyBuffer
 
 
 @dataclass()
@@ -132,6 +133,9 @@ class MeshObject:
         
         ib = draw_data.buffers['IB'].buffer
         if is_static_object:
+            # Draw data may be shared between multiple extraction targets, so source buffer must stay intact
+            ib = copy.copy(ib)
+            ib.data = ib.data.copy()
             ib.data['INDEX'] -= draw_data.vertex_offset
 
         vb = NumpyBuffer(vb_layout, size=draw_data.vertex_count)
@@ -186,23 +190,25 @@ class MeshObject:
         for component_id, component in enumerate(self.components):
             vg_map[component_id] = {}
             # Fetch joined list of all VG ids of all vertices of the component (4 VG ids per vertex)
-            vertex_groups = component.vertex_buffer.get_values(AbstractSemantic(Semantic.Blendindices))
+            vertex_groups = component.buffers['VB'].get_field(AbstractSemantic(Semantic.Blendindices))
             # For remapping purposes, VG count is the highest used VG id among all vertices of the component
             # It allows to efficiently construct merged skeleton buffer in-game via vg_offset & vg_count of components
             component.vg_offset = vg_offset
-            component.vg_count = max(vertex_groups) + 1
+            component.vg_count = int(vertex_groups.max()) + 1
             # Ensure frame dump data integrity
-            if component.skeleton_buffer.num_elements < component.vg_count:
+            skeleton_buffer = component.buffers.get('SkeletonBuffer', None)
+            bones_count = 0 if skeleton_buffer is None else len(skeleton_buffer)
+            if bones_count < component.vg_count:
                 raise ValueError('skeleton of Component_%d has only %d bones, while there are %d VGs declared' % (
-                    component_id, component.skeleton_buffer.num_elements, component.vg_count))
+                    component_id, bones_count, component.vg_count))
+            # Fetch data floats of bones which VGs are linked to
+            bones = skeleton_buffer.get_values(AbstractSemantic(Semantic.RawData))[:component.vg_count]
+            bones = bones.reshape(component.vg_count, -1)
+            # Skip zero-valued bones (garbage data)
+            non_zero_vg_ids = numpy.flatnonzero(bones.any(axis=1))
             # Build VG map
-            for vg_id in range(component.vg_count):
-                # Fetch data floats of bone which VG is linked to
-                buffer_element = component.skeleton_buffer.get_element(vg_id)
-                bone_data = tuple(buffer_element.get_value(AbstractSemantic(Semantic.RawData)))
-                # Skip zero-valued bone (garbage data)
-                if all(v == 0 for v in bone_data):
-                    continue
+            for vg_id in non_zero_vg_ids.tolist():
+                bone_data = bones[vg_id].tobytes()
                 # Get desc object of already registered unique bone data
                 unique_bone_data = unique_bones.get(bone_data, None)
                 # Register VG in VG map
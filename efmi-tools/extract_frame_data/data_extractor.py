@@ -6,10 +6,11 @@ from enum import Enum
 from pathlib import Path
 
 from ..migoto_io.data_model.dxgi_format import DXGIFormat
-from ..migoto_io.data_model.byte_buffer import ByteBuffer, IndexBuffer, BufferLayout, BufferSemantic, AbstractSemantic, Semantic, NumpyBuffer, MigotoFormat
+from ..migoto_io.data_model.byte_buffer import IndexBuffer, BufferLayout, BufferSemantic, AbstractSemantic, Semantic, NumpyBuffer, MigotoFormat
 from ..migoto_io.dump_parser.log_parser import CallParameters
 from ..migoto_io.dump_parser.filename_parser import ResourceDescriptor, SlotType
 from ..migoto_io.dump_parser.resource_collector import ShaderCallBranch, WrappedResource, ResourceConflict
+from ..migoto_io.tracing import tracer
 
 
 class PoseConstantBufferFormat(Enum):
@@ -22,9 +23,9 @@ class ShapeKeyData:
     shapekey_hash: str
     shapekey_scale_hash: str
     dispatch_y: int
-    shapekey_offset_buffer: ByteBuffer
-    shapekey_vertex_id_buffer: ByteBuffer
-    shapekey_vertex_offset_buffer: ByteBuffer
+    shapekey_offset_buffer: NumpyBuffer
+    shapekey_vertex_id_buffer: NumpyBuffer
+    shapekey_vertex_offset_buffer: NumpyBuffer
 
 
 @dataclass
@@ -125,8 +126,12 @@ class DataExtractor:
             BufferSemantic(AbstractSemantic(Semantic.TexCoord, 1), format=DXGIFormat.R32G32_FLOAT, input_slot=1, offset=8): 20,  # Levi
         }
 
-        self.handle_shapekey_cs_0(list(self.call_branches.values()))
-        self.handle_draw_vs(list(self.call_branches.values()))
+        with tracer.span('Extract shapekey buffers') as span:
+            self.handle_shapekey_cs_0(list(self.call_branches.values()))
+            span.add(count=len(self.shape_key_data))
+        with tracer.span('Extract draw buffers') as span:
+            self.handle_draw_vs(list(self.call_branches.values()))
+            span.add(count=len(self.draw_data))
 
     def handle_shapekey_cs_0(self, call_branches):
         for call_branch in call_branches:
@@ -443,7 +448,6 @@ class DataExtractor:
                             with open(path, 'r') as f:
                                 data = f.read()
                                 buffer.import_txt_data(data, remapped_semantics)
-                                print(1)
 
                             buffers[vb_id].buffer = buffer
 
@@ -1,12 +1,10 @@
 import os
 import sys
-import time
 import json
-import shutil
 
 from pathlib import Path
-from typing import Dict
-from dataclasses import dataclass
+from typing import Dict, List, Set, Optional
+from dataclasses import dataclass, field
 from collections import OrderedDict
 from textwrap import dedent
 
@@ -16,8 +14,10 @@ from ..migoto_io.blender_interface.utility import *
 from ..migoto_io.blender_interface.collections import *
 from ..migoto_io.blender_interface.objects import *
 
+from ..migoto_io.file_writer import FileWriter, ContentStore
+from ..migoto_io.tracing import tracer
 from ..migoto_io.data_model.dxgi_format import DXGIFormat
-from ..migoto_io.data_model.byte_buffer import ByteBuffer, IndexBuffer, MigotoFmt, BufferLayout, BufferSemantic, AbstractSemantic, Semantic, NumpyBuffer
+from ..migoto_io.data_model.byte_buffer import IndexBuffer, MigotoFmt, BufferLayout, BufferSemantic, AbstractSemantic, Semantic, NumpyBuffer
 from ..migoto_io.data_model.numpy_mesh import NumpyMesh, GeometryMatcher, VertexGroupsMatcher
 
 from ..migoto_io.dump_parser.filename_parser import ShaderType, SlotType, SlotId
@@ -165,71 +165,76 @@ configuration = Configuration(
 )
 
 
+TEXTURE_STORE_DIRECTORY_NAME = '.TextureStore'
+
+
 def write_objects(output_directory, objects: Dict[str, ObjectData], allow_missing_shapekeys = False):
     output_directory = Path(output_directory)
 
     output_directory.mkdir(parents=True, exist_ok=True)
 
-    for object_hash, object_data in objects.items():
-        object_name = object_hash
-        
-        if object_data.shapekeys.offsets_hash and not object_data.shapekeys.shapekey_offsets:
-            if allow_missing_shapekeys:
-                object_name += '_MISSING_SHAPEKEYS'
-            else:
-                continue
+    # Textures are stored once per content and hardlinked into object folders as read-only files
+    texture_store = ContentStore(output_directory / TEXTURE_STORE_DIRECTORY_NAME)
 
-        object_directory = output_directory / object_name
-        object_directory.mkdir(parents=True, exist_ok=True)
+    # Buffers, textures and metadata of all objects are written concurrently
+    with FileWriter() as writer:
 
-        textures = {}
-        texture_usage = {}
-        
-        for component_id, component in enumerate(object_data.components):
+        for object_hash, object_data in objects.items():
+            object_name = object_hash
+            
+            if object_data.shapekeys.offsets_hash and not object_data.shapekeys.shapekey_offsets:
+                if allow_missing_shapekeys:
+                    object_name += '_MISSING_SHAPEKEYS'
+                else:
+                    continue
 
-            component_filename = f'Component {component_id}'
+            object_directory = output_directory / object_name
+            object_directory.mkdir(parents=True, exist_ok=True)
 
-            # Write buffers
-            with open(object_directory / f'{component_filename}.ib', "wb") as f:
-                f.write(component.ib)
-            with open(object_directory / f'{component_filename}.vb', "wb") as f:
-                f.write(component.vb)
-            with open(object_directory / f'{component_filename}.fmt', "w") as f:
-                f.write(component.fmt)
+            textures = {}
+            texture_usage = {}
+            
+            for component_id, component in enumerate(object_data.components):
 
-            # Write textures
-            texture_usage[component_filename] = OrderedDict()
-            for texture in component.textures:
+                component_filename = f'Component {component_id}'
 
-                if texture.hash not in textures:
-                    textures[texture.hash] = {
-                        'path': texture.path,
-                        'components': []
-                    }
+                # Write buffers
+                writer.write(object_directory / f'{component_filename}.ib', component.ib)
+                writer.write(object_directory / f'{component_filename}.vb', component.vb)
+                writer.write(object_directory / f'{component_filename}.fmt', component.fmt)
 
-                textures[texture.hash]['components'].append(str(component_id))
+                # Write textures
+                texture_usage[component_filename] = OrderedDict()
+                for texture in component.textures:
 
-                if texture.get_slot() not in texture_usage[component_filename]:
-                    texture_usage[component_filename][texture.get_slot()] = []
+                    if texture.hash not in textures:
+                        textures[texture.hash] = {
+                            'path': texture.path,
+                            'sha256': texture.data.sha256,
+                            'components': []
+                        }
 
-                shaders = '-'.join([shader.raw for shader in texture.shaders])
-                texture_usage[component_filename][texture.get_slot()].append(f'{texture.hash}-{shaders}')
-                
-            texture_usage[component_filename] = OrderedDict(sorted(texture_usage[component_filename].items()))
+                    textures[texture.hash]['components'].append(str(component_id))
 
-        for texture_hash, texture in textures.items():
-            path = Path(texture['path'])
-            components = '-'.join(sorted(list(set(texture['components']))))
-            shutil.copyfile(path, object_directory / f'Components-{components} t={texture_hash}{path.suffix}')
-            
-        with open(object_directory / f'TextureUsage.json', "w") as f:
-            f.write(json.dumps(texture_usage, indent=4))
+                    if texture.get_slot() not in texture_usage[component_filename]:
+                        texture_usage[component_filename][texture.get_slot()] = []
+
+                    shaders = '-'.join([shader.raw for shader in texture.shaders])
+                    texture_usage[component_filename][texture.get_slot()].append(f'{texture.hash}-{shaders}')
+                    
+                texture_usage[component_filename] = OrderedDict(sorted(texture_usage[component_filename].items()))
+
+            for texture_hash, texture in textures.items():
+                path = Path(texture['path'])
+                components = '-'.join(sorted(list(set(texture['components']))))
+                writer.submit(texture_store.link, path, object_directory / f'Components-{components} t={texture_hash}{path.suffix}', texture['sha256'])
+                
+            writer.write(object_directory / f'TextureUsage.json', json.dumps(texture_usage, indent=4))
 
-        with open(object_directory / f'Metadata.json', "w") as f:
-            f.write(object_data.metadata)
+            writer.write(object_directory / f'Metadata.json', object_data.metadata)
 
 
-def extract_frame_data(cfg, extract_lods=False):
+def get_configuration(extract_lods=False) -> Configuration:
 
     configuration_new = Configuration(
         shader_data_pattern={
@@ -269,146 +274,243 @@ def extract_frame_data(cfg, extract_lods=False):
     if not extract_lods:
         for i in range(32):
             configuration_new.shader_resources[f'TEXTURE_{i}'] = DataMap([Source('DRAW_VS', ShaderType.Pixel, SlotType.Texture, SlotId(i), ignore_missing=True)])
+
+    return configuration_new
+
+
+@dataclass
+class FrameDumpData:
+    """
+    Draw data of all objects found in the frame dump
+    Dump is parsed once and can be used to build any number of extraction targets
+    """
+    # Input
+    dump_path: Path
+    configuration: Configuration
+    # Output
+    data_extractor: DataExtractor = field(init=False)
+    shapekeys: ShapeKeyBuilder = field(init=False)
+
+    def __post_init__(self):
+        # Create data model of the frame dump
+        with tracer.span('Parse dump'):
+            dump = Dump(
+                dump_directory=self.dump_path,
+                index_cache_directory=get_cache_dir('DumpIndex'),
+            )
+
+        # Get data view from dump data model
+        with tracer.span('Collect data'):
+            frame_data = DataCollector(
+                dump=dump,
+                shader_data_pattern=self.configuration.shader_data_pattern,
+                shader_resources=self.configuration.shader_resources
+            )
+
+        # Extract mesh objects data from data view
+        with tracer.span('Extract buffers'):
+            self.data_extractor = DataExtractor(
+                call_branches=frame_data.call_branches
+            )
+
+        # Build shape keys index from byte buffers
+        with tracer.span('Build shapekeys'):
+            self.shapekeys = ShapeKeyBuilder(
+                shapekey_data=self.data_extractor.shape_key_data
+            )
+
+    def get_ib_hashes(self) -> Set[str]:
+        return set(draw_data.ib_hash for draw_data in self.data_extractor.draw_data.values())
+
+    def build_objects(self, cfg, ib_hashes: Optional[List[str]] = None) -> OutputBuilder:
+        """
+        Builds objects from draw calls of the dump, only draw calls with listed IB hashes are used if ib_hashes is specified
+        """
+        draw_data = self.data_extractor.draw_data
+        if ib_hashes is not None:
+            draw_data = {draw_guid: data for draw_guid, data in draw_data.items() if data.ib_hash in ib_hashes}
+
+        # Build components from byte buffers
+        with tracer.span('Build components', count=len(draw_data)):
+            component_builder = ComponentBuilder(
+                output_vb_layout=None,
+                shader_hashes=self.data_extractor.shader_hashes,
+                shapekeys=self.shapekeys.shapekeys,
+                draw_data=draw_data
+            )
+
+        # Build output data object
+        with tracer.span('Build objects', count=len(component_builder.mesh_objects)):
+            return OutputBuilder(
+                shapekeys=self.shapekeys.shapekeys,
+                mesh_objects=component_builder.mesh_objects,
+                texture_filter=TextureFilter(
+                    min_file_size=cfg.skip_small_textures_size*1024 if cfg.skip_small_textures else 0,
+                    exclude_extensions=['jpg'] if cfg.skip_jpg_textures else [],
+                    exclude_same_slot_hash_textures=cfg.skip_same_slot_hash_textures,
+                    exclude_hashes=['af26db30', '1320a071', '10d7937d', '87505b2b'] if cfg.skip_known_cubemap_textures else []
+                )
+            )
+
+
+def parse_extract_targets(targets: str) -> Dict[str, List[str]]:
+    """
+    Parses comma-separated list of extraction targets, each target is IB hash or multiple IB hashes joined with `+`
+    """
+    result = {}
+    for target in targets.split(','):
+        ib_hashes = [ib_hash.strip().lower() for ib_hash in target.split('+') if ib_hash.strip()]
+        if len(ib_hashes) > 0:
+            result['+'.join(ib_hashes)] = ib_hashes
+    return result
+
+
+def build_target_objects(cfg, frame_dump_data: FrameDumpData, targets: Dict[str, List[str]]) -> Dict[str, ObjectData]:
+    """
+    Builds objects of every extraction target from single parsed dump, objects are named after their targets
+    """
+    dump_ib_hashes = frame_dump_data.get_ib_hashes()
+    missing_ib_hashes = [ib_hash for ib_hashes in targets.values() for ib_hash in ib_hashes if ib_hash not in dump_ib_hashes]
+    if len(missing_ib_hashes) > 0:
+        raise ConfigError('extract_targets', f'No draw calls with IB hashes {", ".join(missing_ib_hashes)} found in the dump!')
+
+    objects = {}
+    for target_name, ib_hashes in targets.items():
+        target_objects = frame_dump_data.build_objects(cfg, ib_hashes).objects
+        for object_id, object_data in target_objects.items():
+            object_name = target_name if len(target_objects) == 1 else f'{target_name} {object_id}'
+            objects[object_name] = object_data
+        print(f'Built {len(target_objects)} objects for target {target_name}')
+    return objects
+
+
+def extract_frame_data(cfg, extract_lods=False) -> Dict[str, ObjectData]:
+
+    if not extract_lods:
         dump_path = resolve_path(cfg.frame_dump_folder)
     else:
         dump_path = resolve_path(cfg.lod_frame_dump_folder)
-        
-    start_time = time.time()
 
     if not dump_path.is_dir():
         raise ConfigError('frame_dump_folder', 'Specified dump folder does not exist!')
     if not Path(dump_path / 'log.txt').is_file():
         raise ConfigError('frame_dump_folder', 'Specified dump folder is missing log.txt file!')
-    
-    # Create data model of the frame dump
-    dump = Dump(
-        dump_directory=dump_path
-    )
 
-    # Get data view from dump data model
-    frame_data = DataCollector(
-        dump=dump,
-        shader_data_pattern=configuration_new.shader_data_pattern,
-        shader_resources=configuration_new.shader_resources
-    )
+    trace_directory = get_cache_dir('Traces') if cfg.write_performance_trace else None
 
-    # Extract mesh objects data from data view
-    data_extractor = DataExtractor(
-        call_branches=frame_data.call_branches
-    )
+    with tracer.session('Extract LoDs' if extract_lods else 'Extract objects', trace_directory):
 
-    # Build shape keys index from byte buffers
-    shapekeys = ShapeKeyBuilder(
-        shapekey_data=data_extractor.shape_key_data
-    )
+        frame_dump_data = FrameDumpData(
+            dump_path=dump_path,
+            configuration=get_configuration(extract_lods),
+        )
 
-    # Build components from byte buffers
-    component_builder = ComponentBuilder(
-        output_vb_layout=None,
-        shader_hashes=data_extractor.shader_hashes,
-        shapekeys=shapekeys.shapekeys,
-        draw_data=data_extractor.draw_data
-    )
+        targets = parse_extract_targets(cfg.extract_targets) if not extract_lods else {}
 
-    # Build output data object
-    output_builder = OutputBuilder(
-        shapekeys=shapekeys.shapekeys,
-        mesh_objects=component_builder.mesh_objects,
-        texture_filter=TextureFilter(
-            min_file_size=cfg.skip_small_textures_size*1024 if cfg.skip_small_textures else 0,
-            exclude_extensions=['jpg'] if cfg.skip_jpg_textures else [],
-            exclude_same_slot_hash_textures=cfg.skip_same_slot_hash_textures,
-            exclude_hashes=['af26db30', '1320a071', '10d7937d', '87505b2b'] if cfg.skip_known_cubemap_textures else []
-        )
-    )
+        if len(targets) > 0:
+            objects = build_target_objects(cfg, frame_dump_data, targets)
+        else:
+            objects = frame_dump_data.build_objects(cfg).objects
 
-    if extract_lods:
-        # full_model_path = Path(r"C:\Projects\XXMI\XXMI-Launcher\!RELEASES\1.9.6\XXMI Launcher\HIMI\Extracted Objects\ENDMIN_FULL")
-        object_source_folder = resolve_path(cfg.object_source_folder)
+        if extract_lods:
+            # full_model_path = Path(r"C:\Projects\XXMI\XXMI-Launcher\!RELEASES\1.9.6\XXMI Launcher\HIMI\Extracted Objects\ENDMIN_FULL")
+            object_source_folder = resolve_path(cfg.object_source_folder)
 
-        # lod_model_path = Path(r"C:\Projects\XXMI\XXMI-Launcher\!RELEASES\1.9.6\XXMI Launcher\HIMI\Extracted Objects\ENDMIN_LOD_OW")
+            # lod_model_path = Path(r"C:\Projects\XXMI\XXMI-Launcher\!RELEASES\1.9.6\XXMI Launcher\HIMI\Extracted Objects\ENDMIN_LOD_OW")
     
-        lod_matcher = LODMatcher(
-            full_model_path=object_source_folder,
-            lod_model_path=None,
-            lod_objects=output_builder.objects,
-            geo_matcher=GeometryMatcher(samples_count=500),
-            vg_matcher=VertexGroupsMatcher(candidates_count=3),
-        )
-
-        lod_matcher.run()
+            lod_matcher = LODMatcher(
+                full_model_path=object_source_folder,
+                lod_model_path=None,
+                lod_objects=objects,
+                geo_matcher=GeometryMatcher(samples_count=500, seed=0),
+                vg_matcher=VertexGroupsMatcher(candidates_count=3),
+            )
 
-        extracted_object = read_metadata(object_source_folder / 'Metadata.json')
-        imported_lods_count = 0
+            with tracer.span('Match LoDs'):
+                lod_matcher.run()
 
-        imported_objects = []
+            extracted_object = read_metadata(object_source_folder / 'Metadata.json')
+            imported_lods_count = 0
 
-        if cfg.import_matched_lod_objects:
-            model = DataModelEFMI()
-            model.unpack_normal = True
-    
-        for component_id, component in enumerate(extracted_object.components):
-            (lod_vb0_hash, vg_map, best_similarity) = lod_matcher.vg_maps.get(component.vb0_hash, (None, None, None))
-            if lod_vb0_hash is None:
-                continue
-            if component.lods is None:
-                component.lods = []
-            if component.vb0_hash != lod_vb0_hash:
-                imported_lods_count += 1
+            imported_objects = []
 
             if cfg.import_matched_lod_objects:
-                # Import lod mesh for debug
-                lod_name = f'LOD mesh {lod_vb0_hash}' if lod_vb0_hash != component.vb0_hash else '(full mesh used as LOD)'
-                mesh = bpy.data.meshes.new(f'Component {component_id} {component.vb0_hash} {lod_name}')
-                obj = bpy.data.objects.new(mesh.name, mesh)
-                # global_matrix = axis_conversion(from_forward=axis_forward, from_up=axis_up).to_4x4()
-                # obj.matrix_world = global_matrix
-                mesh_name = lod_matcher.matched[component.vb0_hash]
-                matched_mesh: NumpyMesh = lod_matcher.lod_meshes.get(mesh_name, None) or lod_matcher.full_meshes.get(mesh_name, None)
-                model.set_data(obj, mesh, matched_mesh.index_buffer, matched_mesh.vertex_buffer, None, mirror_mesh=cfg.mirror_mesh, mesh_scale=1.00, mesh_rotation=(0, 0, 0), import_tangent_data_to_attribute=False)
-                imported_objects.append(obj)
-
-            if best_similarity < cfg.geo_matcher_error_threshold and not cfg.skip_lods_below_error_threshold:
-                raise ConfigError('lod_frame_dump_folder', dedent(f"""
-                    Best matching LoD for Component {component_id} has {best_similarity:.2f}% similarity!
-                    It is below configured {cfg.geo_matcher_error_threshold:.2f}% Geometry Matcher Error Threshold.
-                    If it's not too far off, try to lower threshold. Otherwise either dump is missing some data or search engine fails to handle it.
-                """))
-            print(f'LOD Found: Component {component_id} {component.vb0_hash} matches LOD {lod_vb0_hash} ({best_similarity:.2f}% similarity)')
-
-            # Skip LoD import if it already exists in Metadata.json
-            if any(obj.vb0_hash == lod_vb0_hash for obj in component.lods):
-                print(f'LOD {lod_vb0_hash} import skipped (already in Metdata.json)')
-                continue
-
-            component.lods.append(ExtractedObjectComponentLOD(vb0_hash=lod_vb0_hash, vg_map=vg_map))
-
-        col = new_collection(f'{object_source_folder.stem} LoDs (for view only)')
-        for obj in imported_objects:
-            link_object_to_collection(obj, col)
+                model = DataModelEFMI()
+                model.unpack_normal = True
+    
+            for component_id, component in enumerate(extracted_object.components):
+                (lod_vb0_hash, vg_map, best_similarity) = lod_matcher.vg_maps.get(component.vb0_hash, (None, None, None))
+                if lod_vb0_hash is None:
+                    continue
+                if component.lods is None:
+                    component.lods = []
+                if component.vb0_hash != lod_vb0_hash:
+                    imported_lods_count += 1
+
+                if cfg.import_matched_lod_objects:
+                    # Import lod mesh for debug
+                    lod_name = f'LOD mesh {lod_vb0_hash}' if lod_vb0_hash != component.vb0_hash else '(full mesh used as LOD)'
+                    mesh = bpy.data.meshes.new(f'Component {component_id} {component.vb0_hash} {lod_name}')
+                    obj = bpy.data.objects.new(mesh.name, mesh)
+                    # global_matrix = axis_conversion(from_forward=axis_forward, from_up=axis_up).to_4x4()
+                    # obj.matrix_world = global_matrix
+                    mesh_name = lod_matcher.matched[component.vb0_hash]
+                    matched_mesh: NumpyMesh = lod_matcher.lod_meshes.get(mesh_name, None) or lod_matcher.full_meshes.get(mesh_name, None)
+                    model.set_data(obj, mesh, matched_mesh.index_buffer, matched_mesh.vertex_buffer, None, mirror_mesh=cfg.mirror_mesh, mesh_scale=1.00, mesh_rotation=(0, 0, 0), import_tangent_data_to_attribute=False)
+                    imported_objects.append(obj)
+
+                if best_similarity < cfg.geo_matcher_error_threshold and not cfg.skip_lods_below_error_threshold:
+                    raise ConfigError('lod_frame_dump_folder', dedent(f"""
+                        Best matching LoD for Component {component_id} has {best_similarity:.2f}% similarity!
+                        It is below configured {cfg.geo_matcher_error_threshold:.2f}% Geometry Matcher Error Threshold.
+                        If it's not too far off, try to lower threshold. Otherwise either dump is missing some data or search engine fails to handle it.
+                    """))
+                print(f'LOD Found: Component {component_id} {component.vb0_hash} matches LOD {lod_vb0_hash} ({best_similarity:.2f}% similarity)')
+
+                # Skip LoD import if it already exists in Metadata.json
+                if any(obj.vb0_hash == lod_vb0_hash for obj in component.lods):
+                    print(f'LOD {lod_vb0_hash} import skipped (already in Metdata.json)')
+                    continue
+
+                component.lods.append(ExtractedObjectComponentLOD(vb0_hash=lod_vb0_hash, vg_map=vg_map))
+
+            col = new_collection(f'{object_source_folder.stem} LoDs (for view only)')
+            for obj in imported_objects:
+                link_object_to_collection(obj, col)
             
-        with open(object_source_folder / f'Metadata.json', 'w') as f:
-            f.write(extracted_object.as_json())
-
-        if imported_lods_count < len(extracted_object.components) / 2:
-            bpy.context.window_manager.popup_menu(
-                lambda self, context: self.layout.label(text=f'Imported LoDs count {imported_lods_count} is suspiciously low for {len(extracted_object.components)} components total. Please try to create another Open World dump with being further away from the character in case you get LoD issues with exported mod.'),
-                title="LOD Extraction Warning",
-                icon='WARNING_LARGE'
-            )
-        else:
-            bpy.context.window_manager.popup_menu(
-                lambda self, context: self.layout.label(text=f'Successfully extracted {imported_lods_count} LODs for {len(extracted_object.components)} components to Metadata.json ({len(extracted_object.components)-imported_lods_count} components seem to use full mesh as LOD).'),
-                title="LOD Extraction Complete",
-                icon='INFO'
-            )
-
-    if not extract_lods:
-        write_objects(resolve_path(cfg.extract_output_folder), output_builder.objects, cfg.allow_missing_shapekeys)
-
-    print(f"Execution time: %s seconds" % (time.time() - start_time))
-
-    return output_builder
+            with open(object_source_folder / f'Metadata.json', 'w') as f:
+                f.write(extracted_object.as_json())
+
+            if imported_lods_count < len(extracted_object.components) / 2:
+                show_message(
+                    f'Imported LoDs count {imported_lods_count} is suspiciously low for {len(extracted_object.components)} components total. Please try to create another Open World dump with being further away from the character in case you get LoD issues with exported mod.',
+                    title="LOD Extraction Warning",
+                    icon='WARNING_LARGE'
+                )
+            else:
+                show_message(
+                    f'Successfully extracted {imported_lods_count} LODs for {len(extracted_object.components)} components to Metadata.json ({len(extracted_object.components)-imported_lods_count} components seem to use full mesh as LOD).',
+                    title="LOD Extraction Complete",
+                    icon='INFO'
+                )
+
+        if not extract_lods:
+            with tracer.span('Write objects', count=len(objects)):
+                write_objects(resolve_path(cfg.extract_output_folder), objects, cfg.allow_missing_shapekeys)
+
+    return objects
+
+
+def show_message(text, title, icon):
+    # There are no windows to show popup in when Blender runs in background mode
+    if bpy.app.background:
+        print(f'{title}: {text}')
+        return
+    bpy.context.window_manager.popup_menu(
+        lambda self, context: self.layout.label(text=text),
+        title=title,
+        icon=icon
+    )
 
 
 def get_dir_path():
@@ -1,12 +1,14 @@
+import os
 import json
-import time
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from operator import itemgetter
 from typing import Optional, Dict, Tuple
 
 from ..migoto_io.data_model.byte_buffer import MigotoFormat
 from ..migoto_io.data_model.numpy_mesh import NumpyMesh, GeometryMatcher, VertexGroupsMatcher
+from ..migoto_io.tracing import tracer
 
 from .output_builder import ObjectData
 
@@ -19,12 +21,14 @@ class LODMatcher:
         full_model_path: Path,
         lod_model_path: Optional[Path] = None,
         lod_objects: Optional[Dict[str, ObjectData]] = None,
+        workers_count: int = 0,
     ):
         self.geo_matcher = geo_matcher
         self.vg_matcher = vg_matcher
         self.full_model_path = full_model_path
         self.lod_model_path = lod_model_path
         self.lod_objects: Optional[Dict[str, ObjectData]] = lod_objects
+        self.workers_count = workers_count
 
         self.full_components: Dict[str, str] = {}
         self.lod_components: Dict[str, str] = {}
@@ -67,8 +71,6 @@ class LODMatcher:
         self.lod_hash_to_name = {hash: name for name, hash in self.lod_components.items()}
 
     def load_meshes(self):
-        t0 = time.time()
-
         self.full_meshes = {
             name: NumpyMesh.from_paths(vb_path=self.full_model_path / f'{name}.vb')
             for name in self.full_components
@@ -91,8 +93,6 @@ class LODMatcher:
                         print(f'Failed to load mesh `{object_id} - Component {component_id}`: {component.ib_source.data.path}')
                         self.lod_meshes[f'{object_id} - Component {component_id}'] = None
 
-        print(f'Models data load time: {time.time() - t0:.03f}s')
-
     # -------------------------
     # Matching
     # -------------------------
@@ -119,42 +119,65 @@ class LODMatcher:
                 f'similarity={similarity:.2f}'
             )
 
+    def calculate_similarities(self) -> Dict[Tuple[str, str], float]:
+        """
+        Scores all pairs of not yet matched full components and LoD candidates in parallel
+        Threads are used since heavy numpy operations release GIL, while Blender doesn't play well with subprocesses
+        """
+        pairs = [
+            (full_name, lod_hash)
+            for full_name, full_hash in self.full_components.items() if full_hash not in self.matched
+            for lod_hash, lod_name in self.lod_hash_to_name.items() if self.lod_meshes[lod_name] is not None
+        ]
+
+        def score_pair(pair):
+            full_name, lod_hash = pair
+            lod_name = self.lod_hash_to_name[lod_hash]
+            return self.geo_matcher.calculate_similarity(self.full_meshes[full_name], self.lod_meshes[lod_name])
+
+        workers_count = self.workers_count or os.cpu_count() or 1
+        if workers_count == 1 or len(pairs) < 2:
+            scores = list(map(score_pair, pairs))
+        else:
+            with ThreadPoolExecutor(max_workers=workers_count) as executor:
+                scores = list(executor.map(score_pair, pairs))
+
+        return dict(zip(pairs, scores))
+
     def match_by_geometry(self):
+        with tracer.span('Calculate similarities') as span:
+            pair_similarities = self.calculate_similarities()
+            span.add(count=len(pair_similarities))
+
         for full_name, full_hash in self.full_components.items():
 
             if full_hash in self.matched:
                 continue
 
             full_mesh = self.full_meshes[full_name]
-            similarities = {}
 
-            t_geo = time.time()
-
-            for lod_hash, lod_name in self.lod_hash_to_name.items():
-                if self.lod_meshes[lod_name] is None:
-                    continue
-                similarity = self.geo_matcher.calculate_similarity(
-                    full_mesh, self.lod_meshes[lod_name]
-                )
-                similarities[lod_hash] = similarity
+            # Candidates are limited to LoDs not matched yet, scores are deterministic so the greedy order is preserved
+            similarities = {
+                lod_hash: pair_similarities[(full_name, lod_hash)]
+                for lod_hash in self.lod_hash_to_name.keys()
+                if (full_name, lod_hash) in pair_similarities
+            }
 
             similarities = dict(
                 sorted(similarities.items(), key=itemgetter(1), reverse=True)
             )
-            t_geo = time.time() - t_geo
 
             best_lod_hash, best_similarity = next(iter(similarities.items()))
             best_lod_name = self.lod_hash_to_name.pop(best_lod_hash)
 
             self.matched[full_hash] = best_lod_name
 
-            t_vg = time.time()
-            vg_map = self.vg_matcher.match_vertex_groups(
-                full_mesh,
-                self.lod_meshes[best_lod_name],
-            )
+            with tracer.span('Match vertex groups'):
+                vg_map = self.vg_matcher.match_vertex_groups(
+                    full_mesh,
+                    self.lod_meshes[best_lod_name],
+                )
             self.vg_maps[full_hash] = (best_lod_hash, vg_map, best_similarity)
-            t_vg = time.time() - t_vg
 
             remapped = sum(1 for k, v in vg_map.items() if k != v)
 
@@ -164,21 +187,20 @@ class LODMatcher:
                 f'similarity={best_similarity:.2f}%, '
                 f'remapped VGs={remapped}/{len(vg_map) or 1}'
             )
-            print(f'    LoD meshes match time: {t_geo:.03f}s')
-            print(f'    Vertex Groups match time: {t_vg:.03f}s')
 
     # -------------------------
     # Public API
     # -------------------------
 
     def run(self) -> Dict[str, str]:
-        t0 = time.time()
-
-        self.load_metadata()
-        self.load_meshes()
+        with tracer.span('Load LoD meshes') as span:
+            self.load_metadata()
+            self.load_meshes()
+            span.add(count=len(self.full_meshes) + len(self.lod_meshes))
 
-        self.match_by_hash()
-        self.match_by_geometry()
+        with tracer.span('Match LoDs by hash'):
+            self.match_by_hash()
+        with tracer.span('Match LoDs by geometry'):
+            self.match_by_geometry()
 
-        print(f'Total processing time: {time.time() - t0:.03f}s')
         return self.matched
@@ -8,6 +8,7 @@ from pathlib import Path
 from ..migoto_io.data_model.dxgi_format import DXGIFormat
 from ..migoto_io.data_model.byte_buffer import Semantic, AbstractSemantic
 from ..migoto_io.dump_parser.filename_parser import ResourceDescriptor, WrappedResource
+from ..migoto_io.tracing import tracer
 
 from .shapekey_builder import ShapeKeys
 from .component_builder import MeshObject
@@ -53,20 +54,22 @@ class OutputBuilder:
 
             shapekeys = self.shapekeys.get(mesh_object.shapekey_hash, ShapeKeys(offsets_hash=mesh_object.shapekey_hash or ''))
             
-            self.filter_textures(mesh_object)
-            self.objects[object_id] = ObjectData(
-                metadata=self.build_metadata(mesh_object, shapekeys),
-                components=[
-                    ComponentData(
-                        fmt=self.build_fmt(component.buffers['VB'], component.buffers['IB']),
-                        vb=component.buffers['VB'].get_bytes(),
-                        ib=component.buffers['IB'].get_bytes(),
-                        textures=component.textures,
-                        ib_source=component.ib_source,
-                    ) for component in mesh_object.components
-                ],
-                shapekeys=shapekeys
-            )
+            with tracer.span('Filter textures'):
+                self.filter_textures(mesh_object)
+            with tracer.span('Build output data'):
+                self.objects[object_id] = ObjectData(
+                    metadata=self.build_metadata(mesh_object, shapekeys),
+                    components=[
+                        ComponentData(
+                            fmt=self.build_fmt(component.buffers['VB'], component.buffers['IB']),
+                            vb=component.buffers['VB'].get_bytes(),
+                            ib=component.buffers['IB'].get_bytes(),
+                            textures=component.textures,
+                            ib_source=component.ib_source,
+                        ) for component in mesh_object.components
+                    ],
+                    shapekeys=shapekeys
+                )
 
     def filter_textures(self, mesh_object):
 
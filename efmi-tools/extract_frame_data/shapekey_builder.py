@@ -1,9 +1,11 @@
+import numpy
+
 from dataclasses import dataclass, field
 
-from typing import List, Dict
+from typing import Dict
 
 from ..migoto_io.data_model.dxgi_format import DXGIFormat
-from ..migoto_io.data_model.byte_buffer import ByteBuffer, BufferLayout, BufferSemantic, AbstractSemantic, Semantic
+from ..migoto_io.data_model.byte_buffer import NumpyBuffer, BufferLayout, BufferSemantic, AbstractSemantic, Semantic
 
 from .data_extractor import ShapeKeyData, DrawData
 
@@ -14,52 +16,43 @@ class ShapeKeys:
     scale_hash: str = ''
     dispatch_y: int = 0
     shapekey_offsets: list = field(default_factory=lambda: [])
-    # ShapeKey ID based indexed list of {VertexID: VertexOffsets}
-    shapekeys_index: List[Dict[int, List[float]]] = field(default_factory=lambda: [])
-    # Vertex ID based indexed dict of {ShapeKeyID: VertexOffsets}
-    indexed_shapekeys: Dict[int, Dict[int, List[float]]] = field(default_factory=lambda: {})
+    # CSR-style entries sorted by ShapeKeyID: VertexID, ShapeKeyID and VertexOffsets (xyz) of every entry
+    vertex_ids: numpy.ndarray = field(default_factory=lambda: numpy.empty(0, dtype=numpy.int64))
+    shapekey_ids: numpy.ndarray = field(default_factory=lambda: numpy.empty(0, dtype=numpy.int64))
+    vertex_offsets: numpy.ndarray = field(default_factory=lambda: numpy.empty((0, 3), dtype=numpy.float32))
+
+    def get_range_mask(self, vertex_offset, vertex_count):
+        return (self.vertex_ids >= vertex_offset) & (self.vertex_ids < vertex_offset + vertex_count)
 
     def get_shapekey_ids(self, vertex_offset, vertex_count):
         """
         Returns sorted list of shapekey ids applied to provided range of vertices
         """
-        shapekey_ids = []
-        for vertex_id in range(vertex_offset, vertex_offset + vertex_count):
-            shapekeys = self.indexed_shapekeys.get(vertex_id, None)
-            if shapekeys is None:
-                continue
-            for shapekey_id in shapekeys.keys():
-                if shapekey_id not in shapekey_ids:
-                    shapekey_ids.append(shapekey_id)
-        shapekey_ids.sort()
-        return shapekey_ids
+        return numpy.unique(self.shapekey_ids[self.get_range_mask(vertex_offset, vertex_count)]).tolist()
 
     def build_shapekey_buffer(self, vertex_offset, vertex_count):
         """
-        Returns Blender-importable ByteBuffer for shapekeys within provided range of vertices
+        Returns Blender-importable NumpyBuffer for shapekeys within provided range of vertices
         """
-        shapekey_ids = self.get_shapekey_ids(vertex_offset, vertex_count)
+        mask = self.get_range_mask(vertex_offset, vertex_count)
+        shapekey_ids = numpy.unique(self.shapekey_ids[mask])
 
         if len(shapekey_ids) == 0:
             return None
 
         layout = BufferLayout([
             BufferSemantic(AbstractSemantic(Semantic.ShapeKey, shapekey_id), DXGIFormat.R16G16B16_FLOAT)
-            for shapekey_id in shapekey_ids
+            for shapekey_id in shapekey_ids.tolist()
         ])
 
-        shapekey_buffer = ByteBuffer(layout)
-        shapekey_buffer.extend(vertex_count)
+        # Scatter offsets of all entries within the range into per-shapekey arrays, vertices without entries stay zero
+        shapekey_values = numpy.zeros((len(shapekey_ids), vertex_count, 3), dtype=numpy.float16)
+        columns = numpy.searchsorted(shapekey_ids, self.shapekey_ids[mask])
+        shapekey_values[columns, self.vertex_ids[mask] - vertex_offset] = self.vertex_offsets[mask]
 
-        for vertex_id in range(vertex_offset, vertex_offset + vertex_count):
-            indexed_vertex_shapekeys = self.indexed_shapekeys.get(vertex_id, None)
-            element_id = vertex_id - vertex_offset
-            for semantic in shapekey_buffer.layout.semantics:
-                shapekey_id = semantic.abstract.index
-                if indexed_vertex_shapekeys is None or shapekey_id not in indexed_vertex_shapekeys:
-                    shapekey_buffer.get_element(element_id).set_value(semantic, [0, 0, 0])
-                else:
-                    shapekey_buffer.get_element(element_id).set_value(semantic, indexed_vertex_shapekeys[shapekey_id])
+        shapekey_buffer = NumpyBuffer(layout, size=vertex_count)
+        for column, semantic in enumerate(shapekey_buffer.layout.semantics):
+            shapekey_buffer.set_field(semantic.get_name(), shapekey_values[column])
 
         return shapekey_buffer
 
@@ -76,9 +69,11 @@ class ShapeKeyBuilder:
 
         for shapekey_hash, shapekey_data in self.shapekey_data.items():
 
-            shapekey_offsets = shapekey_data.shapekey_offset_buffer.get_values(AbstractSemantic(Semantic.RawData))[0:128]
-            vertex_ids = shapekey_data.shapekey_vertex_id_buffer.get_values(AbstractSemantic(Semantic.RawData))
-            vertex_offsets = shapekey_data.shapekey_vertex_offset_buffer.get_values(AbstractSemantic(Semantic.RawData))
+            raw_data = AbstractSemantic(Semantic.RawData)
+            shapekey_offsets = shapekey_data.shapekey_offset_buffer.get_values(raw_data).ravel()[0:128].tolist()
+            vertex_ids = shapekey_data.shapekey_vertex_id_buffer.get_values(raw_data).ravel()
+            # Each row of the vertex_offsets buffer consists of 3 floats and 3 zeroes
+            vertex_offsets = shapekey_data.shapekey_vertex_offset_buffer.get_values(raw_data).ravel().reshape(-1, 6)[:, :3]
 
             # Detect last non-zero entry in the vertex_offsets buffer consisting of 3 floats and 3 zeroes per row
             # vertex_offsets_len = int(len(vertex_offsets) / 6)
@@ -98,29 +93,26 @@ class ShapeKeyBuilder:
 
             last_data_entry_id = shapekey_offsets[-1]
 
-            # Process shapekey entries, we'll build both VertexID and ShapeKeyID based outputs for fast indexing
-            shapekeys_index = []
-            indexed_shapekeys = {}
-            for shapekey_id, first_entry_id in enumerate(shapekey_offsets):
-                # Stop processing if next entries have no data
-                if first_entry_id >= last_data_entry_id:
-                    break
-                # Process all entries from current shapekey offset 'till offset of the next shapekey
-                entries = {}
-                for entry_id in range(first_entry_id, shapekey_offsets[shapekey_id + 1]):
-                    vertex_id = vertex_ids[entry_id]
-                    vertex_offset = vertex_offsets[entry_id * 6:entry_id * 6 + 3]
-                    entries[vertex_id] = vertex_offset
-                    if vertex_id not in indexed_shapekeys:
-                        indexed_shapekeys[vertex_id] = {}
-                    indexed_shapekeys[vertex_id][shapekey_id] = vertex_offset
-                shapekeys_index.append(entries)
+            # Process shapekey entries, every shapekey owns entries from its offset 'till offset of the next shapekey
+            offsets = numpy.array(shapekey_offsets, dtype=numpy.int64)
+            # Stop processing at the first shapekey which entries have no data
+            shapekeys_count = int(numpy.argmax(offsets >= last_data_entry_id))
+            entry_counts = numpy.maximum(offsets[1:shapekeys_count + 1] - offsets[:shapekeys_count], 0)
+            entry_ids = numpy.arange(entry_counts.sum()) + numpy.repeat(offsets[:shapekeys_count] - (numpy.cumsum(entry_counts) - entry_counts), entry_counts)
+            shapekey_ids = numpy.repeat(numpy.arange(shapekeys_count), entry_counts)
+            entry_vertex_ids = numpy.asarray(vertex_ids, dtype=numpy.int64)[entry_ids]
+            entry_vertex_offsets = numpy.asarray(vertex_offsets, dtype=numpy.float32)[entry_ids]
+
+            # Last entry wins if the same vertex is listed more than once for the same shapekey
+            _, last_entries = numpy.unique(numpy.stack([shapekey_ids, entry_vertex_ids])[:, ::-1], axis=1, return_index=True)
+            last_entries = numpy.sort(len(entry_ids) - 1 - last_entries)
 
             self.shapekeys[shapekey_hash] = ShapeKeys(
                 offsets_hash=shapekey_data.shapekey_hash,
                 scale_hash=shapekey_data.shapekey_scale_hash,
                 dispatch_y=shapekey_data.dispatch_y,
                 shapekey_offsets=shapekey_offsets,
-                shapekeys_index=shapekeys_index,
-                indexed_shapekeys=indexed_shapekeys,
+                vertex_ids=entry_vertex_ids[last_entries],
+                shapekey_ids=shapekey_ids[last_entries],
+                vertex_offsets=entry_vertex_offsets[last_entries],
             )
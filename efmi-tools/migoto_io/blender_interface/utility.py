@@ -1,4 +1,5 @@
 import math
+import tempfile
 import mathutils
 
 from pathlib import Path
@@ -15,6 +16,10 @@ def get_blend_file_path() -> Path:
     return Path(bpy.data.filepath)
 
 
+def get_cache_dir(name: str) -> Path:
+    return Path(tempfile.gettempdir()) / 'EFMI-Tools' / name
+
+
 def resolve_path(path) -> Path:
     abspath = bpy.path.abspath(path)
     if abspath is None:
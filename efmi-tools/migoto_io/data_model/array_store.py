@@ -0,0 +1,85 @@
+import os
+import uuid
+import hashlib
+import zipfile
+import numpy
+
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class ArrayStore:
+    """
+    Compressed .npz sidecar storage for numpy arrays referenced by content hash
+    Allows to keep only short hash strings in Blender properties instead of serialized array data
+    Entries are released once property references another key, so memory and disk hold only referenced arrays
+    """
+    def __init__(self, store_directory: Path):
+        self.store_directory = Path(store_directory)
+        # Stored arrays are immutable, so once loaded they can be reused without reading from disk again
+        self.loaded_arrays: Dict[str, numpy.ndarray] = {}
+
+    def get_path(self, key: str) -> Path:
+        return self.store_directory / f'{key}.npz'
+
+    @staticmethod
+    def get_key(data: numpy.ndarray) -> str:
+        data = numpy.ascontiguousarray(data)
+        hasher = hashlib.sha256()
+        hasher.update(repr((data.dtype.str, data.shape)).encode())
+        hasher.update(data.tobytes())
+        return hasher.hexdigest()
+
+    def save(self, data: numpy.ndarray, replaced_key: str = '') -> str:
+        """
+        Writes array to the store (unless identical one is already there) and returns its key
+        Entry of replaced_key is released if it differs from the new one
+        """
+        key = self.get_key(data)
+        path = self.get_path(key)
+        if not path.is_file():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+            try:
+                with open(temp_path, 'wb') as f:
+                    numpy.savez_compressed(f, data=data)
+                os.replace(temp_path, path)
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+        self.loaded_arrays[key] = data
+        if replaced_key != key:
+            self.release(replaced_key)
+        return key
+
+    def load(self, key: str) -> Optional[numpy.ndarray]:
+        """
+        Returns array stored with given key or None if there's no such entry or it cannot be read
+        """
+        if not key:
+            return None
+        data = self.loaded_arrays.get(key, None)
+        if data is not None:
+            return data
+        try:
+            with numpy.load(self.get_path(key), allow_pickle=False) as npz:
+                data = npz['data']
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+        self.loaded_arrays[key] = data
+        return data
+
+    def release(self, key: str):
+        """
+        Removes no longer referenced entry from memory and deletes its sidecar file
+        """
+        if not key:
+            return
+        self.loaded_arrays.pop(key, None)
+        try:
+            self.get_path(key).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def clear(self):
+        self.loaded_arrays.clear()
@@ -1,7 +1,6 @@
 import io
 import copy
 import textwrap
-import math
 import numpy
 import re
 
@@ -360,6 +359,18 @@ class NumpyBuffer:
             return None
         return self.data[semantic.get_name()]
 
+    def get_values(self, field: Union[AbstractSemantic, Semantic, int, str]) -> Optional[numpy.ndarray]:
+        """
+        Returns field data decoded from its storage format (i.e. UNORM8 to [0.0, 1.0] floats)
+        """
+        semantic = self.layout.get_element(field)
+        if semantic is None:
+            return None
+        data = self.data[semantic.get_name()]
+        if semantic.format.type_decoder is not None:
+            data = semantic.format.type_decoder(data)
+        return data
+
     def remove_duplicates(self, keep_order = True):
         if keep_order:
             _, unique_index = numpy.unique(self.data, return_index=True)
@@ -414,54 +425,41 @@ class NumpyBuffer:
         self.data = numpy.frombuffer(data, dtype=self.layout.get_numpy_type())
 
     def import_txt_data(self, data: str, remapped_semantics):
+        """
+        Imports vertex-data section of 3dmigoto .txt buffer dump
+        Lines of every semantic are collected by single regex pass and their values are converted by numpy in bulk
+        Values of semantic are expected in lines formatted as `vb0[0]+000 POSITION: 0.1, 0.2, 0.3`
+        """
         remapped_semantics = remapped_semantics or {}
-        # Build regex pattern dynamically
-        pattern_lines = []
-
-        # float_pattern = r"[+-]?\d+(?:\.\d*)?(?:[eE][+-]?\d+)?"
-        float_pattern = r"[+-]?(?:\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|nan)"
-
-        # Strict matching
-        # for i, semantic in enumerate(self.layout.semantics):
-        #     semantic_name = remapped_semantics.get(semantic.abstract, semantic).get_name()
-        #     semantic_name = semantic_name.split('.')[0]
-        #     # Each number in its own capture group
-        #     groups = ",".join([f"({float_pattern})" for _ in range(semantic.get_num_values())])
-        #     groups = groups.replace(",", r",\s*")
-        #     newline = r"\s*\n" if i < len(self.layout.semantics) - 1 else ""
-        #     # Match optional prefix "vb0[...]"
-        #     line_pattern = rf"vb0\[\d+\]\+\d+\s+{semantic_name}:\s*{groups}{newline}"
-        #     pattern_lines.append(line_pattern)
 
+        vertex_data_start = data.find('vertex-data:')
+        if vertex_data_start != -1:
+            data = data[vertex_data_start:]
+
+        vertex_count = None
         for semantic in self.layout.semantics:
             semantic_name = remapped_semantics.get(semantic.abstract, semantic).get_name()
             semantic_name = semantic_name.split('.')[0]
-            groups = ",".join([f"({float_pattern})" for _ in range(semantic.get_num_values())])
-            groups = groups.replace(",", r",\s*")
-            line_pattern = rf"vb\d+\[\d+\]\+\d+\s+{semantic_name}:\s*{groups}\s*\n?"
-            pattern_lines.append(line_pattern)
-            
-        # Join all lines
-        full_pattern = "".join(pattern_lines)
-
-        # Compile regex
-        pattern = re.compile(full_pattern)
-
-        matches = pattern.findall(data)
-        if not matches:
-            raise ValueError
-        
-        data = numpy.array(matches, dtype=numpy.float32)  # parse floats first
-
-        # Fill fields
-        start = 0
-        for semantic in self.layout.semantics:
-            n = semantic.get_num_values()
-            field_data = data[:, start:start+n].astype(semantic.format.numpy_base_type)
-            if n == 1:
+            num_values = semantic.get_num_values()
+
+            # Pattern starts with literal to let regex engine skip to candidates fast, as `vb0[0]+000 ` prefix is costly to match
+            lines = re.findall(rf' {re.escape(semantic_name)}:(.*)', data)
+            if not lines:
+                raise ValueError(f'No {semantic_name} data found in txt buffer!')
+            if vertex_count is None:
+                vertex_count = len(lines)
+            elif len(lines) != vertex_count:
+                raise ValueError(f'Txt buffer has {len(lines)} {semantic_name} values instead of {vertex_count}!')
+
+            # Values are parsed as float64 to keep 32-bit integers intact
+            values = numpy.fromstring(','.join(lines), dtype=numpy.float64, sep=',')
+            if len(values) != vertex_count * num_values:
+                raise ValueError(f'Failed to parse {semantic_name} data of txt buffer: expected {num_values} values per vertex!')
+
+            field_data = values.reshape(vertex_count, num_values).astype(semantic.format.numpy_base_type)
+            if num_values == 1:
                 field_data = field_data.ravel()
             self.set_field(semantic.get_name(), field_data)
-            start += n
 
     def get_bytes(self):
         return self.data.tobytes()
@@ -640,8 +638,11 @@ class MigotoFormat:
         return cls.from_dict(migoto_data)
 
     @classmethod
-    def extract_txt_file_fmt_text(cls, file_data: io.IOBase) -> dict:
-        lines = ''
+    def extract_txt_file_fmt_text(cls, file_data: io.IOBase) -> str:
+        """
+        Reads header of 3dmigoto .txt buffer dump, file is read line by line only until vertex data section begins
+        """
+        lines = []
         for line in file_data:
             if not line.strip():
                 continue
@@ -649,8 +650,8 @@ class MigotoFormat:
                 break
             if line.startswith(('vertex-data', 'instance-data')):
                 break
-            lines += line
-        return lines
+            lines.append(line)
+        return ''.join(lines)
     
     @classmethod
     def from_txt_file(cls, file_data: io.IOBase) -> 'MigotoFormat':
@@ -710,233 +711,29 @@ class MigotoFmt:
             raise ValueError(f'vb buffer layout format stride mismatch: {vb_stride} != {self.vb_layout.stride}')
 
 
-
-        
-
-class BufferElement:
-    def __init__(self, buffer, index):
-        self.buffer = buffer
-        self.index = index
-        self.layout = self.buffer.layout
-
-    def get_bytes(self, semantic, return_buffer_semantic=False):
-        if isinstance(semantic, AbstractSemantic):
-            semantic = self.layout.get_element(semantic)
-        byte_offset = self.index * semantic.stride
-        data_bytes = self.buffer.data[semantic][byte_offset : byte_offset + semantic.stride]
-        if not return_buffer_semantic:
-            return data_bytes
-        else:
-            return data_bytes, semantic
-
-    def set_bytes(self, semantic, data_bytes):
-        if isinstance(semantic, AbstractSemantic):
-            semantic = self.layout.get_element(semantic)
-        byte_offset = self.index * semantic.stride
-        self.buffer.data[semantic][byte_offset: byte_offset + semantic.stride] = data_bytes
-
-    def get_value(self, semantic):
-        if isinstance(semantic, AbstractSemantic):
-            semantic = self.layout.get_element(semantic)
-        data_bytes = self.get_bytes(semantic)
-        return semantic.format.decoder(data_bytes).tolist()
-
-    def set_value(self, semantic, value):
-        if isinstance(semantic, AbstractSemantic):
-            semantic = self.layout.get_element(semantic)
-        self.set_bytes(semantic, semantic.format.encoder(value).tobytes())
-
-    def get_all_bytes(self):
-        data_bytes = bytearray()
-        for semantic in self.layout.semantics:
-            data_bytes.extend(self.get_bytes(semantic))
-        return data_bytes
-
-
-class ByteBuffer:
-    def __init__(self, layout, data_bytes=None):
-        self.layout = None
-        self.data = {}
-        self.num_elements = 0
-
-        self.update_layout(layout)
-
-        if data_bytes is not None:
-            self.from_bytes(data_bytes)
-
-    def validate(self):
-        result = {}
-        for semantic in self.layout.semantics:
-            result[semantic] = len(self.data[semantic]) / semantic.stride
-        if min(result.values()) != max(result.values()):
-            result = ', '.join([f'{k.abstract}: {v}' for k, v in result.items()])
-            raise ValueError(f'elements count mismatch in buffers: {result}')
-        if len(self.layout.semantics) != len(self.data):
-            raise ValueError(f'data structure must match buffer layout!')
-        self.num_elements = int(min(result.values()))
-
-    def update_layout(self, layout):
-        self.layout = layout
-        if len(self.data) != 0:
-            self.validate()
-
-    def from_bytes(self, data_bytes):
-        if self.layout.force_stride:
-            data_bytes.extend(bytearray((math.ceil(len(data_bytes) / self.layout.stride)) * self.layout.stride - len(data_bytes)))
-
-        num_elements = len(data_bytes) / self.layout.stride
-        if num_elements % 1 != 0:
-            raise ValueError(f'buffer stride {self.layout.stride} must be multiplier of bytes len {len(data_bytes)}')
-        num_elements = int(num_elements)
-
-        self.data = {}
-        for semantic in self.layout.semantics:
-            self.data[semantic] = bytearray()
-
-        byte_offset = 0
-        for element_id in range(num_elements):
-            for semantic in self.layout.semantics:
-                self.data[semantic].extend(data_bytes[byte_offset:byte_offset+semantic.stride])
-                byte_offset += semantic.stride
-
-        if byte_offset != len(data_bytes):
-            raise ValueError(f'layout mismatch: input ended at {byte_offset} instead of {len(data_bytes)}')
-
-        self.validate()
-
-    def get_element(self, index):
-        return BufferElement(self, index)
-
-    def extend(self, num_elements):
-        if num_elements <= 0:
-            raise ValueError(f'cannot extend buffer by {num_elements} elements')
-        for semantic in self.layout.semantics:
-            if semantic in self.data:
-                self.data[semantic].extend(bytearray(num_elements * semantic.stride))
-            else:
-                self.data[semantic] = bytearray(num_elements * semantic.stride)
-        self.validate()
-
-    def get_fragment(self, offset, element_count):
-        fragment = ByteBuffer(self.layout)
-        for semantic in self.layout.semantics:
-            byte_offset = offset * semantic.stride
-            byte_count = element_count * semantic.stride
-            fragment.data[semantic] = self.data[semantic][byte_offset:byte_offset+byte_count]
-        fragment.validate()
-        return fragment
-
-    def import_buffer(self, src_byte_buffer, semantic_map=None, skip_missing=False):
-        """
-        Imports elements from source buffer based on their semantics
-        Without 'semantic_map' provided creates new 'semantic_map' containing all source semantics
-        Errors if any of 'semantic_map' elements is not found in src or dst buffers and 'skip_missing' is False
-        """
-        # Ensure equal number of elements in both buffers
-        if src_byte_buffer.num_elements != self.num_elements:
-            raise ValueError('source buffer len %d differs from destination buffer len %d' % (
-                    src_byte_buffer.num_elements, self.num_elements))
-        
-        # Calculate semantic map
-        semantic_map = self.map_semantics(src_byte_buffer, self, semantic_map=semantic_map, skip_missing=skip_missing)
-
-        # Import data bytes
-        for src_semantic, dst_semantic in semantic_map.items():
-            if src_semantic.format == dst_semantic.format:
-                self.data[dst_semantic] = src_byte_buffer.data[src_semantic]
-            else:
-                src_values = src_semantic.format.decoder(src_byte_buffer.data[src_semantic]).tolist()
-                self.data[dst_semantic] = dst_semantic.format.encoder(src_values).tobytes()
-
-        self.validate()
-
-    def get_bytes(self, semantic=None):
-        if semantic is None:
-            data_bytes = bytearray()
-            for element_id in range(self.num_elements):
-                data_bytes.extend(self.get_element(element_id).get_all_bytes())
-            return data_bytes
-        else:
-            if isinstance(semantic, AbstractSemantic):
-                semantic = self.layout.get_element(semantic)
-            return self.data[semantic]
-
-    def get_values(self, semantic):
-        if isinstance(semantic, AbstractSemantic):
-            semantic = self.layout.get_element(semantic)
-        data_bytes = self.get_bytes(semantic)
-        return semantic.format.decoder(data_bytes).tolist()
-
-    def set_bytes(self, semantic, data_bytes):
-        if isinstance(semantic, AbstractSemantic):
-            semantic = self.layout.get_element(semantic)
-        self.data[semantic] = data_bytes
-        self.validate()
-
-    def set_values(self, semantic, values):
-        if isinstance(semantic, AbstractSemantic):
-            semantic = self.layout.get_element(semantic)
-        self.set_bytes(semantic, semantic.format.encoder(values).tobytes())
-
-    @staticmethod
-    def map_semantics(src_byte_buffer, dst_byte_buffer, semantic_map=None, skip_missing=False):
-        """
-        
-        """
-        verified_semantic_map = {}
-        if semantic_map is not None:
-            # Semantic map may consist of AbstractSemantic instead of BufferSemantic, we need to convert it in this case
-            # AbstractSemantic is independent of buffer specifics and contains only SemanticName and SemanticIndex
-            # BufferSemantic wraps AbstractSemantic and describes where AbstractSemantic is located in given buffer
-            for src_semantic, dst_semantic in semantic_map.items():
-                # Ensure source semantic location in source buffer
-                src_semantic = src_semantic
-                if isinstance(src_semantic, AbstractSemantic):
-                    src_semantic = src_byte_buffer.layout.get_element(src_semantic)
-                if src_semantic not in src_byte_buffer.layout.semantics:
-                    if not skip_missing:
-                        raise ValueError(f'source buffer has no {src_semantic.abstract} semantic')
-                    continue
-                # Ensure destination semantic location in destination buffer
-                dst_semantic = src_semantic
-                if isinstance(src_semantic, AbstractSemantic):
-                    dst_semantic = dst_byte_buffer.layout.get_element(dst_semantic)
-                if dst_semantic not in dst_byte_buffer.layout.semantics:
-                    if not skip_missing:
-                        raise ValueError(f'destination buffer has no {dst_semantic.abstract} semantic')
-                    continue
-                # Add semantic to verified map
-                verified_semantic_map[src_semantic] = dst_semantic
-        else:
-            # If there is no semantics map provided, map everything by default
-            for src_semantic in src_byte_buffer.layout.semantics:
-                # Locate matching semantic in destination buffer
-                dst_semantic = dst_byte_buffer.layout.get_element(src_semantic.abstract)
-                if dst_semantic is None:
-                    if not skip_missing:
-                        raise ValueError(f'destination buffer has no {src_semantic.abstract} semantic')
-                    continue
-                verified_semantic_map[src_semantic] = dst_semantic
-
-        return verified_semantic_map
-
-
-class IndexBuffer(ByteBuffer):
-    def __init__(self, layout, data, load_indices=True):
+class IndexBuffer(NumpyBuffer):
+    """
+    Index buffer loaded from 3dmigoto .txt dump (header + faces) or from raw bytes
+    Faces are stored as (face_count, 3) numpy array
+    """
+    def __init__(self, layout: BufferLayout, data, load_indices=True):
         self.offset = None
         self.first_index = None
         self.index_count = None
         self.topology = None
         self.format = None
         self.faces = None
+        self.data = None
+
+        super().__init__(layout)
 
         if isinstance(data, io.IOBase):
             self.parse_format(data)
             if load_indices:
                 self.parse_faces(data)
-            super().__init__(layout)
-        elif isinstance(data, bytearray):
-            super().__init__(layout, data)
+                self.faces_to_data()
+        elif isinstance(data, (bytes, bytearray, memoryview, numpy.ndarray)):
+            self.import_raw_data(data)
             self.bytes_to_faces()
         else:
             raise ValueError(f'unknown IB data format {data}')
@@ -962,40 +759,35 @@ class IndexBuffer(ByteBuffer):
                 break
 
     def parse_faces(self, f):
-        self.faces = []
-        for line in map(str.strip, f):
-            face = tuple(map(int, line.split()))
-            assert (len(face) == 3)
-            self.faces.append(face)
+        indices = numpy.array(f.read().split(), dtype=numpy.int64)
+        if len(indices) % 3 != 0:
+            raise ValueError(f'failed to parse IB faces: {len(indices)} indices is not a multiple of 3')
+        self.faces = indices.reshape(-1, 3)
         if self.index_count:
             assert (len(self.faces) * 3 == self.index_count)
         else:
             self.index_count = len(self.faces) * 3
 
-    def faces_to_bytes(self):
-        indices = []
-        for face in self.faces:
-            assert (len(face) == 3)
-            indices.extend(list(face))
-        assert (len(indices) == self.index_count)
-        data_bytes = self.layout.semantics[0].format.encoder(indices).tobytes()
-        self.from_bytes(data_bytes)
-        assert (self.num_elements * 3 == self.index_count)
+    def faces_to_data(self):
+        semantic = self.layout.semantics[0]
+        indices = self.faces.reshape(-1).astype(semantic.format.numpy_base_type)
+        num_values = semantic.get_num_values()
+        self.data = numpy.zeros(len(indices) // num_values, dtype=self.layout.get_numpy_type())
+        self.data[semantic.get_name()] = indices.reshape(self.data[semantic.get_name()].shape)
 
     def bytes_to_faces(self):
-        self.faces = []
-        for element_id in range(self.num_elements):
-            face = self.get_element(element_id).get_value(self.layout.semantics[0])
-            self.faces.append(tuple(face))
-
-    def get_bytes(self, semantic=None):
-        if self.num_elements * 3 != self.index_count:
-            self.faces_to_bytes()
-        assert (self.num_elements * 3 == self.index_count)
-        return super().get_bytes(semantic)
-    
+        self.faces = self.data[self.layout.semantics[0].get_name()].reshape(-1, 3)
+        self.index_count = self.faces.size
+
+    def get_bytes(self):
+        if self.data is None:
+            self.faces_to_data()
+        return super().get_bytes()
+
     def get_numpy_array(self):
-        return numpy.frombuffer(self.get_bytes(), dtype=self.layout.semantics[0].get_numpy_type())
+        if self.data is None:
+            self.faces_to_data()
+        return self.data[self.layout.semantics[0].get_name()]
 
     def get_format(self):
-        return self.layout.get_element(AbstractSemantic(Semantic.Index)).get_format()
\ No newline at end of file
+        return self.layout.get_element(AbstractSemantic(Semantic.Index)).get_format()
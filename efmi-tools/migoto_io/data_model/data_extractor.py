@@ -1,14 +1,12 @@
-import collections
 import copy
 import numpy
-import time
 import bpy
 
 from typing import List, Tuple, Dict, Optional
-from operator import attrgetter, itemgetter
 
 from .byte_buffer import AbstractSemantic, Semantic, BufferSemantic, NumpyBuffer, BufferLayout
 from .dxgi_format import DXGIFormat, DXGIType
+from ..tracing import tracer
 
 
 class BlenderDataExtractor:
@@ -46,7 +44,9 @@ class BlenderDataExtractor:
 
         if vertex_ids_cache is None:
             # Extract requested data from blender loop vertices
-            loop_data, index_data = self.get_loop_data(mesh, proxy_layout, flip_winding=flip_winding, dedupe = True)
+            with tracer.span('Fetch loop data') as span:
+                loop_data, index_data = self.get_loop_data(mesh, proxy_layout, flip_winding=flip_winding, dedupe = True)
+                span.add(count=len(loop_data.get_data()))
             vertex_ids = loop_data.get_field(AbstractSemantic(Semantic.VertexId).get_name())
         else:
             loop_data, index_data = None, None
@@ -54,7 +54,8 @@ class BlenderDataExtractor:
             print(f'Skipped loop data fetching!')
 
         # Extract requested data from blender vertices
-        vertex_data = self.get_vertex_data(mesh, proxy_layout)
+        with tracer.span('Fetch vertex data'):
+            vertex_data = self.get_vertex_data(mesh, proxy_layout)
 
         if vertex_data is not None:
             # Output vb is based on actual faces we're going to draw, so we need to make vertex_data match the loop_data
@@ -155,8 +156,6 @@ class BlenderDataExtractor:
                       flip_winding = False, 
                       dedupe = False) -> Tuple[NumpyBuffer, numpy.ndarray]:
         
-        start_time = time.time()
-
         # Make loop data layout
         layout = BufferLayout([])
         for buffer_semantic in proxy_layout.semantics:
@@ -220,17 +219,21 @@ class BlenderDataExtractor:
         # Build IB
         index_data = None
         index_semantic = proxy_layout.get_element(AbstractSemantic(Semantic.Index))
-        if index_semantic is not None:
-            indexed_vertices = collections.OrderedDict()
+        if index_semantic is not None or dedupe:
+            # View every packed loop record as single opaque value, so loops are compared by their raw bytes
+            records = numpy.ascontiguousarray(loop_data.data)
+            records = records.view(numpy.dtype((numpy.void, records.dtype.itemsize)))
+            _, unique_index, unique_inverse = numpy.unique(records, return_index=True, return_inverse=True)
+            # numpy.unique sorts records by value, while vertices must be indexed in order of their first occurrence
             # Note: foreach_get provides loop data in the same order as iteration over polygons
-            index_data = [indexed_vertices.setdefault(data.tobytes(), len(indexed_vertices)) for data in loop_data.data]
-            index_data = numpy.array(index_data, dtype=index_semantic.get_numpy_type())
-                
-        # Remove vertices with the exactly same attributes
-        if dedupe:
-            loop_data.remove_duplicates()
-
-        print(f'Loop data fetch time: {time.time() - start_time :.3f}s ({len(loop_data.get_data())} vertices, {len(index_data)} indices)')
+            first_occurrence_order = numpy.argsort(unique_index, kind='stable')
+            vertex_ids = numpy.empty_like(first_occurrence_order)
+            vertex_ids[first_occurrence_order] = numpy.arange(len(first_occurrence_order))
+            if index_semantic is not None:
+                index_data = vertex_ids[unique_inverse.ravel()].astype(index_semantic.get_numpy_type())
+            # Remove vertices with the exactly same attributes
+            if dedupe:
+                loop_data.data = loop_data.data[unique_index[first_occurrence_order]]
 
         return loop_data, index_data
 
@@ -238,8 +241,6 @@ class BlenderDataExtractor:
                         mesh: bpy.types.Mesh, 
                         proxy_layout: BufferLayout) -> NumpyBuffer:
         
-        start_time = time.time()
-
         # Make vertex data layout
         layout = BufferLayout([])
         for buffer_semantic in proxy_layout.semantics:
@@ -254,12 +255,12 @@ class BlenderDataExtractor:
         size = len(mesh.vertices)
         vertex_data = NumpyBuffer(layout, size=size)
 
-        vertex_groups = None
-        for buffer_semantic in proxy_layout.semantics:
-            if buffer_semantic.abstract.enum in [Semantic.Blendindices, Semantic.Blendweight]:
-                vertex_groups = [sorted(vertex.groups, key=attrgetter('weight'), reverse=True)
-                                 for vertex in mesh.vertices]
-                break
+        # Both blend semantics are sliced from the same top VGs, so they're selected only once
+        top_vertex_groups = None
+        num_top_vgs = max([buffer_semantic.get_num_values() for buffer_semantic in proxy_layout.semantics
+                           if buffer_semantic.abstract.enum in [Semantic.Blendindices, Semantic.Blendweight]], default=0)
+        if num_top_vgs > 0:
+            top_vertex_groups = self.get_top_vertex_groups(*self.fetch_vertex_groups(mesh), size, num_top_vgs)
 
         # Fetch data for requested semantics
         for buffer_semantic in proxy_layout.semantics:
@@ -269,16 +270,11 @@ class BlenderDataExtractor:
 
             if semantic == Semantic.Position:
                 data = self.fetch_data(mesh.vertices, 'undeformed_co', numpy_type, size)
-            elif semantic == Semantic.Blendindices:
+            elif semantic in [Semantic.Blendindices, Semantic.Blendweight]:
                 dtype = numpy_type[0] if isinstance(numpy_type, tuple) else numpy_type
                 num_vgs = buffer_semantic.get_num_values()
-                data = numpy.array([[vg.group for vg in groups[:num_vgs]] + [0] * (num_vgs - len(groups))
-                                    for groups in vertex_groups], dtype=dtype)
-            elif semantic == Semantic.Blendweight:
-                dtype = numpy_type[0] if isinstance(numpy_type, tuple) else numpy_type
-                num_vgs = buffer_semantic.get_num_values()
-                data = numpy.array([[vg.weight for vg in groups[:num_vgs]] + [0] * (num_vgs - len(groups))
-                                    for groups in vertex_groups], dtype=dtype)
+                vg_ids, vg_weights = top_vertex_groups
+                data = (vg_ids if semantic == Semantic.Blendindices else vg_weights)[:, :num_vgs].astype(dtype)
             elif semantic == Semantic.Attribute:
                 data = self.fetch_data(mesh.attributes[semantic_name].data, 'color', numpy_type, size)
             else:
@@ -288,16 +284,54 @@ class BlenderDataExtractor:
             
             vertex_data.set_field(buffer_semantic.get_name(), data)
 
-        print(f'Vertex data fetch time: {time.time() - start_time :.3f}s ({len(vertex_data.get_data())} vertices)')
-
         return vertex_data
 
+    @staticmethod
+    def fetch_vertex_groups(mesh: bpy.types.Mesh) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """
+        Returns VG ids and weights of all vertices as flat CSR arrays along with per-vertex count of VGs
+        """
+        vg_counts = numpy.empty(len(mesh.vertices), dtype=numpy.int64)
+        vg_ids, vg_weights = [], []
+        for vertex_id, vertex in enumerate(mesh.vertices):
+            groups = vertex.groups
+            vg_counts[vertex_id] = len(groups)
+            for vg in groups:
+                vg_ids.append(vg.group)
+                vg_weights.append(vg.weight)
+        return vg_counts, numpy.array(vg_ids, dtype=numpy.int64), numpy.array(vg_weights, dtype=numpy.float32)
+
+    @staticmethod
+    def get_top_vertex_groups(vg_counts: numpy.ndarray,
+                              vg_ids: numpy.ndarray,
+                              vg_weights: numpy.ndarray,
+                              vertex_count: int,
+                              num_vgs: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Returns (vertex_count, num_vgs) arrays of VG ids and weights sorted by weight in descending order
+        VGs beyond num_vgs heaviest ones are dropped, vertices with fewer VGs are padded with zeroes
+        """
+        vertex_ids = numpy.repeat(numpy.arange(vertex_count), vg_counts)
+        # Stable sort by vertex id, then by weight in descending order (ties keep original VG order)
+        order = numpy.lexsort((-vg_weights, vertex_ids))
+        # Position of every VG within its vertex after sorting
+        row_starts = numpy.cumsum(vg_counts) - vg_counts
+        ranks = numpy.arange(len(order)) - numpy.repeat(row_starts, vg_counts)
+        mask = ranks < num_vgs
+        order = order[mask]
+        rows, cols = vertex_ids[order], ranks[mask]
+
+        top_vg_ids = numpy.zeros((vertex_count, num_vgs), dtype=vg_ids.dtype)
+        top_vg_weights = numpy.zeros((vertex_count, num_vgs), dtype=vg_weights.dtype)
+        top_vg_ids[rows, cols] = vg_ids[order]
+        top_vg_weights[rows, cols] = vg_weights[order]
+
+        return top_vg_ids, top_vg_weights
+
     def get_shapekey_data(self, 
                           obj: bpy.types.Object, 
                           names_filter: Optional[List[str]] = None, 
                           deduct_basis = False) -> Dict[str, numpy.ndarray]:
-        
-        start_time = time.time()
 
         numpy_type = self.blender_data_formats[Semantic.ShapeKey].get_numpy_type()
 
@@ -323,8 +357,6 @@ class BlenderDataExtractor:
 
             result[shapekey.name] = data
 
-        print(f'Shape Keys fetch time: {time.time() - start_time :.3f}s ({len(result)} shapekeys)')
-
         return result
 
     @staticmethod
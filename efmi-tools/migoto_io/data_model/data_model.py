@@ -1,5 +1,3 @@
-import time
-import json
 import numpy
 import copy
 import math
@@ -13,6 +11,14 @@ from .dxgi_format import DXGIFormat, DXGIType
 from .byte_buffer import Semantic, AbstractSemantic, BufferSemantic, BufferLayout, NumpyBuffer
 from .data_extractor import BlenderDataExtractor
 from .data_importer import BlenderDataImporter
+from .array_store import ArrayStore
+
+from ..blender_interface.utility import get_cache_dir
+from ..tracing import tracer
+
+
+# Vertex ids and index data of partial export are stored as .npz sidecars, scene settings hold only their keys
+export_data_store = ArrayStore(get_cache_dir('ExportDataCache'))
 
 
 class DataModel:
@@ -124,9 +130,12 @@ class DataModel:
         if buffers_format is None:
             buffers_format = self.buffers_format
 
-        index_data, vertex_buffer = self.export_data(context, collection, mesh, excluded_buffers, buffers_format, mirror_mesh)
+        with tracer.span('Fetch mesh data'):
+            index_data, vertex_buffer = self.export_data(context, collection, mesh, excluded_buffers, buffers_format, mirror_mesh)
 
-        buffers = self.build_buffers(index_data, vertex_buffer, excluded_buffers, buffers_format)
+        with tracer.span('Build buffers') as span:
+            buffers = self.build_buffers(index_data, vertex_buffer, excluded_buffers, buffers_format)
+            span.add(count=len(buffers))
 
         return buffers, len(vertex_buffer)
 
@@ -136,8 +145,6 @@ class DataModel:
                       excluded_buffers: List[str],
                       buffers_format: Dict[str, BufferLayout]) -> Dict[str, NumpyBuffer]:
         
-        start_time = time.time()
-
         result = {}
         for buffer_name, buffer_layout in buffers_format.items():
             buffer = None
@@ -160,8 +167,6 @@ class DataModel:
                 continue
             result[buffer_name] = buffer
 
-        print(f'Buffers build time: {time.time() - start_time :.3f}s ({len(result)} buffers)')
-
         return result
 
     def export_data(self, 
@@ -223,20 +228,22 @@ class DataModel:
         if not fetch_loop_data:
             if collection != context.scene.efmi_tools_settings.vertex_ids_cached_collection:
                 # Cache contains data for different object and must be cleared
+                export_data_store.release(context.scene.efmi_tools_settings.vertex_ids_cache)
                 context.scene.efmi_tools_settings.vertex_ids_cache = ''
                 fetch_loop_data = True
                 cache_vertex_ids = True
             else:
                 # Partial export is enabled
-                if context.scene.efmi_tools_settings.vertex_ids_cache:
-                    # Valid vertex ids cache exists, lets load it
-                    vertex_ids_cache = numpy.array(json.loads(context.scene.efmi_tools_settings.vertex_ids_cache))
-                else:
-                    # Cache is clear, we'll have to fetch loop data once 
+                # Valid vertex ids cache may exist, lets load it
+                vertex_ids_cache = export_data_store.load(context.scene.efmi_tools_settings.vertex_ids_cache)
+                if vertex_ids_cache is None:
+                    # Cache is clear or its sidecar is gone, we'll have to fetch loop data once 
                     fetch_loop_data = True
                     cache_vertex_ids = True
         elif context.scene.efmi_tools_settings.vertex_ids_cache:
             # We're going to fetch loop data, cache must be cleared
+            export_data_store.release(context.scene.efmi_tools_settings.vertex_ids_cache)
+            export_data_store.release(context.scene.efmi_tools_settings.index_data_cache)
             context.scene.efmi_tools_settings.vertex_ids_cache = ''
             context.scene.efmi_tools_settings.index_data_cache = ''
 
@@ -270,9 +277,11 @@ class DataModel:
         if cache_vertex_ids:
             # As vertex_ids_cache is None, get_data fetched loop data for us and we can cache vertex ids
             vertex_ids = vertex_buffer.get_field(AbstractSemantic(Semantic.VertexId).get_name())
-            context.scene.efmi_tools_settings.vertex_ids_cache = json.dumps(vertex_ids.tolist())
+            context.scene.efmi_tools_settings.vertex_ids_cache = export_data_store.save(
+                vertex_ids, context.scene.efmi_tools_settings.vertex_ids_cache)
             if cache_index_data:
-                context.scene.efmi_tools_settings.index_data_cache = json.dumps(index_buffer.tolist())
+                context.scene.efmi_tools_settings.index_data_cache = export_data_store.save(
+                    index_buffer, context.scene.efmi_tools_settings.index_data_cache)
             context.scene.efmi_tools_settings.vertex_ids_cached_collection = collection
 
         return index_buffer, vertex_buffer
@@ -97,6 +97,93 @@ class NumpyMesh:
         return mesh
 
 
+class SpatialHashGrid:
+    """Uniform grid over point cloud for exact nearest neighbour distance queries.
+
+    Points are bucketed into cubic cells sorted by cell key, so each cell is a contiguous slice of sorted points.
+    Queries scan rings of neighbour cells of growing radius until found distance is guaranteed to be minimal.
+    """
+    def __init__(self, points: numpy.ndarray, points_per_cell = 4):
+        self.points = numpy.asarray(points, dtype=numpy.float64)
+        self.origin = self.points.min(axis=0)
+        extent = self.points.max(axis=0) - self.origin
+
+        # Mesh vertices are mostly distributed over surfaces, so cell size is based on bbox surface area
+        surface_area = 2 * (extent[0] * extent[1] + extent[1] * extent[2] + extent[2] * extent[0])
+        if surface_area == 0:
+            surface_area = float(extent.max()) ** 2
+        self.cell_size = math.sqrt(surface_area * points_per_cell / len(self.points)) if surface_area > 0 else 1.0
+        self.dims = (extent // self.cell_size).astype(numpy.int64) + 1
+
+        keys = self.get_keys(self.get_cells(self.points))
+        order = numpy.argsort(keys, kind='stable')
+        self.points = self.points[order]
+        self.cell_keys, self.cell_starts, cell_counts = numpy.unique(keys[order], return_index=True, return_counts=True)
+        self.cell_ends = self.cell_starts + cell_counts
+
+    def get_cells(self, points: numpy.ndarray) -> numpy.ndarray:
+        cells = numpy.floor((points - self.origin) / self.cell_size).astype(numpy.int64)
+        return numpy.clip(cells, 0, self.dims - 1)
+
+    def get_keys(self, cells: numpy.ndarray) -> numpy.ndarray:
+        return cells[..., 0] + self.dims[0] * (cells[..., 1] + self.dims[1] * cells[..., 2])
+
+    @staticmethod
+    def get_ring_offsets(ring: int) -> numpy.ndarray:
+        """Returns (N, 3) array of cell offsets with Chebyshev distance of exactly `ring`."""
+        offsets = numpy.indices((2 * ring + 1,) * 3).reshape(3, -1).T - ring
+        return offsets[numpy.abs(offsets).max(axis=1) == ring]
+
+    def get_cell_ranges(self, cells: numpy.ndarray):
+        """Returns start and end positions of sorted points for given cells, empty or out-of-grid cells yield 0:0."""
+        valid = numpy.all((cells >= 0) & (cells < self.dims), axis=-1)
+        keys = self.get_keys(cells)
+        positions = numpy.searchsorted(self.cell_keys, keys)
+        positions = numpy.minimum(positions, len(self.cell_keys) - 1)
+        found = valid & (self.cell_keys[positions] == keys)
+        starts = numpy.where(found, self.cell_starts[positions], 0)
+        ends = numpy.where(found, self.cell_ends[positions], 0)
+        return starts, ends
+
+    def query_min_distances(self, queries: numpy.ndarray, max_ring = 3, chunk_size = 4096):
+        """Computes distance from every query point to the nearest grid point.
+
+        Returns distances along with indices of queries not resolved within `max_ring` rings (their distances are
+        only upper bounds and should be calculated by other means).
+        """
+        queries = numpy.asarray(queries, dtype=numpy.float64)
+        distances = numpy.full(len(queries), numpy.inf)
+        query_cells = self.get_cells(queries)
+
+        active = numpy.arange(len(queries))
+        for ring in range(max_ring + 1):
+            offsets = self.get_ring_offsets(ring)
+            for start in range(0, len(active), chunk_size):
+                chunk = active[start:start + chunk_size]
+                starts, ends = self.get_cell_ranges(query_cells[chunk, None, :] + offsets[None, :, :])
+                counts = (ends - starts).sum(axis=1)
+                if counts.sum() == 0:
+                    continue
+                # Expand (query, cell range) pairs into flat list of (query, point) pairs
+                starts, ends = starts.ravel(), ends.ravel()
+                range_counts = ends - starts
+                point_ids = numpy.arange(range_counts.sum()) + numpy.repeat(starts - (numpy.cumsum(range_counts) - range_counts), range_counts)
+                query_ids = numpy.repeat(chunk, counts)
+                pair_distances = numpy.linalg.norm(queries[query_ids] - self.points[point_ids], axis=1)
+                # Pairs are grouped by query, so minimum of every group can be reduced in one go
+                has_points = counts > 0
+                group_starts = (numpy.cumsum(counts) - counts)[has_points]
+                chunk_distances = numpy.minimum.reduceat(pair_distances, group_starts)
+                chunk = chunk[has_points]
+                distances[chunk] = numpy.minimum(distances[chunk], chunk_distances)
+            # Points outside of scanned rings are at least `ring` cells away from the query
+            active = active[distances[active] > ring * self.cell_size]
+            if len(active) == 0:
+                break
+
+        return distances, active
+
+
 class ChamferMixin:
 
     @staticmethod
@@ -105,11 +192,24 @@ class ChamferMixin:
         dist1 = VertexGroupsMatcher.calculate_min_distances(points_a, points_b)
         dist2 = VertexGroupsMatcher.calculate_min_distances(points_b, points_a)
         return numpy.mean(dist1) + numpy.mean(dist2)
-    
+
     @staticmethod
     def calculate_min_distances(points_a: numpy.ndarray, points_b: numpy.ndarray, chunk_size = 256):
+        """Computes minimum distance for each vertex in points_a to any vertex in points_b using spatial hash grid."""
+        if len(points_a) == 0 or len(points_b) <= chunk_size:
+            return ChamferMixin.calculate_min_distances_brute_force(points_a, points_b, chunk_size)
+        grid = SpatialHashGrid(points_b)
+        distances, unresolved = grid.query_min_distances(points_a)
+        if len(unresolved) > 0:
+            # Queries far away from any point of points_b are cheaper to resolve directly
+            distances[unresolved] = ChamferMixin.calculate_min_distances_brute_force(
+                numpy.asarray(points_a, dtype=numpy.float64)[unresolved], grid.points, chunk_size)
+        return distances
+
+    @staticmethod
+    def calculate_min_distances_brute_force(points_a: numpy.ndarray, points_b: numpy.ndarray, chunk_size = 256):
         """Computes minimum distance for each vertex in points_a to any vertex in points_b in chunks to save memory."""
-        cd_chunks = []
+        cd_chunks = [numpy.empty(0)]
         for start in range(0, len(points_a), chunk_size):
             end = start + chunk_size
             diff_chunk = points_a[start:end, None, :] - points_b[None, :, :]
@@ -223,17 +323,20 @@ class VertexGroupsMatcher(ChamferMixin):
 
 
 class GeometryMatcher(ChamferMixin):
-    def __init__(self, samples_count=5000, sensivity=0.5):
+    def __init__(self, samples_count=5000, sensivity=0.5, seed=0):
         self.samples_count = samples_count
         self.sensivity = sensivity
+        self.seed = seed
 
     def calculate_similarity(self, mesh_a: NumpyMesh, mesh_b: NumpyMesh) -> float:
         """Calculates similarity between Mesh A and Mesh B.
         
         Algo is based on average Chamfer distance between uniformly sampled triangles.
+        Sampling uses its own generator seeded per call, so result doesn't depend on calls order or threads.
         """
-        points_a = self.sample_points_on_mesh(mesh_a)
-        points_b = self.sample_points_on_mesh(mesh_b)
+        rng = numpy.random.default_rng(self.seed)
+        points_a = self.sample_points_on_mesh(mesh_a, rng)
+        points_b = self.sample_points_on_mesh(mesh_b, rng)
         
         cd = self.calculate_linear_chamfer_distance(points_a, points_b)
         
@@ -246,8 +349,11 @@ class GeometryMatcher(ChamferMixin):
 
         return similarity
 
-    def sample_points_on_mesh(self, mesh: NumpyMesh) -> numpy.ndarray:
+    def sample_points_on_mesh(self, mesh: NumpyMesh, rng: Optional[numpy.random.Generator] = None) -> numpy.ndarray:
         """Uniformly samples points on a mesh surface using triangle areas."""
+        if rng is None:
+            rng = numpy.random.default_rng(self.seed)
+
         indices = mesh.get_data(Semantic.Index)
         positions = mesh.get_data(Semantic.Position)
 
@@ -260,11 +366,11 @@ class GeometryMatcher(ChamferMixin):
         tri_probs = tri_areas / numpy.sum(tri_areas)
 
         # Sample triangles proportional to area
-        tri_indices = numpy.random.choice(len(indices), size=self.samples_count, p=tri_probs)
+        tri_indices = rng.choice(len(indices), size=self.samples_count, p=tri_probs)
 
         # Barycentric coordinates
-        r1 = numpy.sqrt(numpy.random.rand(self.samples_count))
-        r2 = numpy.random.rand(self.samples_count)
+        r1 = numpy.sqrt(rng.random(self.samples_count))
+        r2 = rng.random(self.samples_count)
         a = 1 - r1
         b = r1 * (1 - r2)
         c = r1 * r2
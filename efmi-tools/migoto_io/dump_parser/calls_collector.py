@@ -3,10 +3,10 @@ from typing import Union, List, Dict
 
 from dataclasses import dataclass, field
 
-from ..data_model.byte_buffer import ByteBuffer, IndexBuffer
+from ..data_model.byte_buffer import NumpyBuffer, IndexBuffer
 
 from .filename_parser import ShaderType, SlotType, SlotId, CallDescriptor, WrappedResource
-from .dict_filter import DictFilter, FilterCondition, Filter
+from .dict_filter import DictIndex
 from .dump_parser import Dump
 
 
@@ -30,7 +30,7 @@ class ShaderMap:
 @dataclass
 class BranchCall:
     call: CallDescriptor
-    resources: Dict[str, Union[WrappedResource, ByteBuffer, IndexBuffer]] = field(default_factory=lambda: {})
+    resources: Dict[str, Union[WrappedResource, NumpyBuffer, IndexBuffer]] = field(default_factory=lambda: {})
     textures: List[WrappedResource] = field(default_factory=lambda: [])
 
 
@@ -54,6 +54,7 @@ class CallsCollector:
 
     def __post_init__(self):
         self.cache = {}
+        self.resources_index = DictIndex(self.dump.resources)
         self.call_branches = self.get_call_branches()
 
     def get_call_branches(self):
@@ -82,12 +83,10 @@ class CallsCollector:
                             if input_slot.shader_id != shader_id:
                                 continue
                             input_filter_attributes = {
+                                **self.get_slot_filter_attributes(shader_map.shader_type, input_slot),
                                 'call_id': root_resource.call_id,  # ID of child call should differ from parent call
                             }
-                            input_candidate_resources = DictFilter(Filter(
-                                attributes=input_filter_attributes,
-                                dictionaries=self.get_all_slot_resources(shader_map.shader_type, input_slot)
-                            )).filtered_dict
+                            input_candidate_resources = self.resources_index.query_keys(input_filter_attributes)
                             if len(input_candidate_resources) > 0:
                                 continue
 
@@ -129,14 +128,12 @@ class CallsCollector:
         branch = ShaderCallBranch(shader_id=shader_id, calls=[], nested_branches=[])
 
         input_filter_attributes = {
+            **self.get_slot_filter_attributes(shader_map.shader_type, input_slot),
             '!call_id': parent_resource.call_id,  # ID of child call should differ from parent call
             'hash': parent_resource.hash,  # Hash of input resource should be the same as one of parent's output
         }
 
-        input_candidate_resources = DictFilter(Filter(
-            attributes=input_filter_attributes,
-            dictionaries=self.get_all_slot_resources(shader_map.shader_type, input_slot)
-        )).filtered_dict
+        input_candidate_resources = self.resources_index.query(input_filter_attributes)
 
         if len(input_candidate_resources) == 0:
             return None
@@ -229,22 +226,22 @@ class CallsCollector:
         if cached_result is not None:
             return cached_result
 
-        input_filter_attributes = {
+        slot_resources = self.resources_index.query(self.get_slot_filter_attributes(shader_type, slot))
+
+        self.cache[hash] = slot_resources
+
+        return slot_resources
+
+    @staticmethod
+    def get_slot_filter_attributes(shader_type, slot):
+        filter_attributes = {
             'shaders:type': shader_type,
             'slot_type': slot.slot_type,
         }
         if slot.slot_id is not None:
-            input_filter_attributes['slot_id'] = slot.slot_id
+            filter_attributes['slot_id'] = slot.slot_id
         if slot.shader_type != ShaderType.Empty:
-            input_filter_attributes['slot_shader_type'] = slot.shader_type
-
-        slot_resources = DictFilter(Filter(
-            attributes=input_filter_attributes,
-            dictionaries=[self.dump.resources]
-        )).filtered_dict
-
-        self.cache[hash] = slot_resources
-
-        return slot_resources
+            filter_attributes['slot_shader_type'] = slot.shader_type
+        return filter_attributes
 
 
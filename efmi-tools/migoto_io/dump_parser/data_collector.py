@@ -4,6 +4,8 @@ from typing import Union, List, Dict
 
 from dataclasses import dataclass, field
 
+from ..tracing import tracer
+
 from .calls_collector import CallsCollector, ShaderMap, Slot, ShaderCallBranch
 from .resource_collector import ResourceCollector, DataMap
 
@@ -20,8 +22,10 @@ class DataCollector:
     call_branches: Dict[str, ShaderCallBranch] = field(init=False)
 
     def __post_init__(self):
-        self.calls_collector = CallsCollector(self.dump, self.shader_data_pattern)
+        with tracer.span('Resolve call branches', count=len(self.dump.calls)):
+            self.calls_collector = CallsCollector(self.dump, self.shader_data_pattern)
         self.call_branches = self.calls_collector.call_branches
-        self.data_collector = ResourceCollector(self.shader_resources, self.call_branches)
+        with tracer.span('Collect resources'):
+            self.data_collector = ResourceCollector(self.shader_resources, self.call_branches)
 
 
@@ -104,6 +104,7 @@ class DictFilter:
         return filter
 
     def intersection(self, list1, list2):
+        list2 = set(list2)
         return [value for value in list1 if value in list2]
 
     def get_filtered_dict(self, filter, data_dict=None):
@@ -220,4 +221,100 @@ class DictFilter:
         return False
 
 
-
+class DictIndex:
+    """
+    Inverted index over attributes of dict entries, supports same attribute syntax as DictFilter:
+        'slot_type' - entry attribute value must be among given values
+        '!call_id' - entry attribute value must not be among given values
+        'shaders:type' - any item of iterable entry attribute must have attribute value among given values
+        'shaders:__key__' - any key of dict entry attribute must be among given values
+    Posting lists {value: set(keys)} are built once per attribute on first query, so queries are set intersections
+    Index is not tracking changes of indexed dict, it must be rebuilt if dict is modified
+    """
+    def __init__(self, data_dict: dict):
+        self.data_dict = data_dict
+        self.order = {key: position for position, key in enumerate(data_dict.keys())}
+        self.postings = {}
+
+    def get_postings(self, attribute):
+        postings = self.postings.get(attribute, None)
+        if postings is not None:
+            return postings
+
+        postings = {}
+        parts = attribute.split(':')
+        if len(parts) > 2:
+            raise ValueError(f'Invalid filter: more than one instance of ":" is not supported!')
+
+        get_attribute = operator.attrgetter(parts[0])
+
+        if len(parts) == 1:
+            for key, entry in self.data_dict.items():
+                postings.setdefault(get_attribute(entry), set()).add(key)
+        else:
+            get_item_attribute = None if parts[1] == '__key__' else operator.attrgetter(parts[1])
+            for key, entry in self.data_dict.items():
+                attribute_value = get_attribute(entry)
+                items = attribute_value.items() if isinstance(attribute_value, dict) else enumerate(attribute_value)
+                for item_key, item in items:
+                    value = item_key if get_item_attribute is None else get_item_attribute(item)
+                    postings.setdefault(value, set()).add(key)
+
+        self.postings[attribute] = postings
+        return postings
+
+    def get_matching_keys(self, attribute, values):
+        if not isinstance(values, list):
+            values = [values]
+        parts = attribute.split(':')
+        # Negation of nested attribute matches entries with any item value outside of given values
+        if len(parts) == 2 and parts[1].startswith('!'):
+            postings = self.get_postings(f'{parts[0]}:{parts[1][1:]}')
+            matching_keys = set()
+            for value, keys in postings.items():
+                if value not in values:
+                    matching_keys |= keys
+            return matching_keys
+        postings = self.get_postings(attribute)
+        if len(values) == 1:
+            return postings.get(values[0], set())
+        matching_keys = set()
+        for value in values:
+            matching_keys |= postings.get(value, set())
+        return matching_keys
+
+    def query_keys(self, attributes: dict, condition: FilterCondition = FilterCondition.AND):
+        if condition == FilterCondition.OR:
+            found = set()
+            for attribute, values in attributes.items():
+                if attribute.startswith('!'):
+                    found |= self.order.keys() - self.get_matching_keys(attribute[1:], values)
+                else:
+                    found |= self.get_matching_keys(attribute, values)
+            return found
+
+        found = None
+        excluded = []
+        # Intersect positive conditions starting from shortest posting lists, negative ones are subtracted afterwards
+        included = []
+        for attribute, values in attributes.items():
+            if attribute.startswith('!'):
+                excluded.append(self.get_matching_keys(attribute[1:], values))
+            else:
+                included.append(self.get_matching_keys(attribute, values))
+        for keys in sorted(included, key=len):
+            found = set(keys) if found is None else found & keys
+            if len(found) == 0:
+                return found
+        if found is None:
+            found = set(self.order.keys())
+        for keys in excluded:
+            found -= keys
+        return found
+
+    def query(self, attributes: dict, condition: FilterCondition = FilterCondition.AND):
+        """
+        Returns dict of entries matching given attributes, entries are kept in order of indexed dict
+        """
+        keys = sorted(self.query_keys(attributes, condition), key=self.order.__getitem__)
+        return {key: self.data_dict[key] for key in keys}
@@ -1,44 +1,165 @@
 import os
+import pickle
+import hashlib
 
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import List, Dict, Optional
 from pathlib import Path
 from dataclasses import dataclass, field
 
+from ..tracing import tracer
+
 from .log_parser import FrameDumpLog
 from .filename_parser import ResourceDescriptor, CallDescriptor
 
 
+# Must be increased whenever layout of ResourceDescriptor or FrameDumpLog index data changes
+DUMP_INDEX_VERSION = 1
+
+
 @dataclass
 class Dump:
     # Input
     dump_directory: Path
+    index_cache_directory: Optional[Path] = None
+    calculate_sha256: bool = False
+    workers_count: int = 0
     # Output
     log: FrameDumpLog = field(init=False)
     resources: Dict[str, ResourceDescriptor] = field(init=False)
     calls: Dict[str, CallDescriptor] = field(init=False)
 
     def __post_init__(self):
-        self.log = FrameDumpLog(self.dump_directory)
         self.resources = {}
         self.calls = {}
 
-        for filename in os.listdir(self.dump_directory):
+        fingerprint = self.get_fingerprint()
+
+        with tracer.span('Load dump index'):
+            index = self.load_index(fingerprint)
+
+        if index is not None:
+            with tracer.span('Parse log (indexed)'):
+                self.log = FrameDumpLog(self.dump_directory, calls_index=index['calls'])
+            resources_index = index['resources']
+        else:
+            with tracer.span('Parse log', bytes=os.path.getsize(os.path.join(self.dump_directory, 'log.txt'))):
+                self.log = FrameDumpLog(self.dump_directory)
+            with tracer.span('Index resources') as span:
+                resources_index = self.index_resources()
+                span.add(count=len(resources_index))
+
+        with tracer.span('Import resources', count=len(resources_index)):
+            for data in resources_index:
+                self.import_resource_descriptor(ResourceDescriptor.from_tuple(self.dump_directory, data))
+
+        if index is None:
+            with tracer.span('Save dump index'):
+                self.save_index(fingerprint, resources_index)
+
+    def index_resources(self) -> List[tuple]:
+        """
+        Parses resource filenames (and hashes resource data if requested) in parallel
+        Directory listing is split into shards, each shard is processed by worker into list of plain tuples
+        Threads are used since sha256 calculation and file reads release GIL, while Blender doesn't play well with subprocesses
+        """
+        filenames = [filename for filename in os.listdir(self.dump_directory) if not filename.endswith('txt')]
+
+        workers_count = self.workers_count or os.cpu_count() or 1
+        if workers_count == 1 or len(filenames) < 2 * workers_count:
+            return self.index_resources_shard(filenames)
+
+        shard_size = max(64, len(filenames) // (workers_count * 4) + 1)
+        shards = [filenames[i:i + shard_size] for i in range(0, len(filenames), shard_size)]
+
+        resources_index = []
+        with ThreadPoolExecutor(max_workers=workers_count) as executor:
+            for shard_index in executor.map(self.index_resources_shard, shards):
+                resources_index.extend(shard_index)
+        return resources_index
+
+    def index_resources_shard(self, filenames: List[str]) -> List[tuple]:
+        shard_index = []
+        for filename in filenames:
             resource_path = os.path.join(self.dump_directory, filename)
 
             if not os.path.isfile(resource_path):
                 continue
-            if filename.endswith('txt'):
-                continue
 
-            resource_descriptor = ResourceDescriptor(resource_path)
-            self.resources[resource_descriptor.raw] = resource_descriptor
+            resource_descriptor = ResourceDescriptor(resource_path, calculate_sha256=self.calculate_sha256)
+            shard_index.append(resource_descriptor.to_tuple())
+        return shard_index
+
+    def import_resource_descriptor(self, resource_descriptor: ResourceDescriptor):
+        self.resources[resource_descriptor.raw] = resource_descriptor
+
+        if resource_descriptor.call_id not in self.calls:
+            self.calls[resource_descriptor.call_id] = CallDescriptor(resource_descriptor.call_id)
+        call = self.calls[resource_descriptor.call_id]
+        resource_descriptor.call = call
+
+        call.import_resource_descriptor(resource_descriptor)
+        logged_call = self.log.calls.get(call.id, None)
+        if logged_call is not None:
+            call.parameters = logged_call.parameters
+
+    def get_fingerprint(self):
+        """
+        Dump folder is considered unchanged as long as its mtime, file count and log.txt stats stay the same
+        """
+        dump_directory = Path(self.dump_directory).resolve()
+        log_stat = os.stat(dump_directory / 'log.txt')
+        return (
+            str(dump_directory),
+            os.stat(dump_directory).st_mtime_ns,
+            len(os.listdir(dump_directory)),
+            log_stat.st_mtime_ns,
+            log_stat.st_size,
+        )
+
+    @staticmethod
+    def get_index_path(index_cache_directory: Path, dump_directory: Path) -> Path:
+        """
+        Returns path of index file of given dump folder, one index is kept per dump folder path
+        """
+        dump_path_hash = hashlib.sha1(str(Path(dump_directory).resolve()).encode()).hexdigest()
+        return Path(index_cache_directory) / f'{dump_path_hash}.index'
 
-            if resource_descriptor.call_id not in self.calls:
-                self.calls[resource_descriptor.call_id] = CallDescriptor(resource_descriptor.call_id)
-            call = self.calls[resource_descriptor.call_id]
-            resource_descriptor.call = call
+    def load_index(self, fingerprint):
+        if self.index_cache_directory is None:
+            return None
+        index_path = self.get_index_path(self.index_cache_directory, self.dump_directory)
+        if not index_path.is_file():
+            return None
+        try:
+            with open(index_path, 'rb') as f:
+                index = pickle.load(f)
+            if index['version'] != DUMP_INDEX_VERSION or index['fingerprint'] != fingerprint:
+                return None
+            if self.calculate_sha256 and not index['sha256']:
+                return None
+            return index
+        except Exception as e:
+            print(f'Failed to load dump index {index_path}: {e}')
+            return None
 
-            call.import_resource_descriptor(resource_descriptor)
-            logged_call = self.log.calls.get(call.id, None)
-            if logged_call is not None:
-                call.parameters = logged_call.parameters
+    def save_index(self, fingerprint, resources_index: List[tuple]):
+        if self.index_cache_directory is None:
+            return
+        index_path = self.get_index_path(self.index_cache_directory, self.dump_directory)
+        index = {
+            'version': DUMP_INDEX_VERSION,
+            'fingerprint': fingerprint,
+            'sha256': self.calculate_sha256,
+            'resources': resources_index,
+            'calls': self.log.export_calls_index(),
+        }
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = index_path.with_suffix('.tmp')
+            with open(temp_path, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            print(f'Failed to save dump index {index_path}: {e}')
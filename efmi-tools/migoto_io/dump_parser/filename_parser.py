@@ -3,15 +3,17 @@ import os
 import shutil
 import hashlib
 import re
+import numpy
 
 from enum import Enum, auto
 from typing import Optional, Union, List, Dict, Set
 from textwrap import dedent
 from pathlib import Path
 
-from ..data_model.byte_buffer import ByteBuffer, BufferLayout, IndexBuffer, MigotoFormat, NumpyBuffer
+from ..data_model.byte_buffer import BufferLayout, IndexBuffer, MigotoFormat, NumpyBuffer
+from ..tracing import tracer
 
-from .dict_filter import DictFilter, FilterCondition, Filter
+from .dict_filter import DictIndex
 
 
 class ShaderType(Enum):
@@ -66,6 +68,11 @@ slot_type_codepage = {
 }
 
 
+call_id_pattern = re.compile(r'^(\d+)-(.*)\.([a-z0-9]+)')
+shaders_pattern = re.compile(r'-([a-z]s=[a-f0-9]+)')
+slot_ref_pattern = re.compile(r'^([a-z]+)([0-9]+)?')
+
+
 class ShaderRef:
     def __init__(self, raw_shader_ref):
         self.raw = raw_shader_ref
@@ -112,9 +119,16 @@ class ResourceData:
             raise ValueError("Failed to update resource header hash: file not loaded!")
         self.header_sha256 = hashlib.sha256(self.header.encode()).hexdigest()
 
+    def map(self, dtype=numpy.uint8) -> numpy.ndarray:
+        """
+        Returns read-only zero-copy view of file data, file pages are served and shared via OS page cache
+        """
+        if os.path.getsize(self.path) == 0:
+            return numpy.empty(0, dtype=dtype)
+        return numpy.memmap(self.path, dtype=dtype, mode='r')
+
     def load(self):
-        with open(self.path, "rb") as f:
-            self.bytes = bytearray(f.read())
+        self.bytes = self.map()
 
     def unload(self):
         self.bytes = None
@@ -162,6 +176,51 @@ class ResourceDescriptor:
     def __repr__(self):
         return self.raw
 
+    def to_tuple(self):
+        """
+        Returns parsed descriptor as plain tuple to be stored in dump index
+        """
+        return (
+            self.raw,
+            self.marked,
+            self.call_id,
+            self.ext,
+            self.slot_type.value,
+            self.slot_id,
+            self.slot_shader_type.value if self.slot_shader_type is not None else None,
+            self.hash,
+            self.old_hash,
+            tuple(shader.raw for shader in self.shaders),
+            self.data.sha256,
+            self.data.len,
+        )
+
+    @classmethod
+    def from_tuple(cls, dump_directory, data):
+        """
+        Restores descriptor from plain tuple made by `to_tuple` without parsing of its filename
+        """
+        (raw, marked, call_id, ext, slot_type, slot_id, slot_shader_type, resource_hash, old_hash,
+         raw_shader_refs, sha256, data_len) = data
+        resource_descriptor = cls.__new__(cls)
+        resource_descriptor.path = os.path.join(dump_directory, raw)
+        resource_descriptor.raw = raw
+        resource_descriptor.marked = marked
+        resource_descriptor.call = None
+        resource_descriptor.call_id = call_id
+        resource_descriptor.ext = ext
+        resource_descriptor.slot_type = SlotType(slot_type)
+        resource_descriptor.slot_id = slot_id
+        resource_descriptor.slot_shader_type = ShaderType(slot_shader_type) if slot_shader_type is not None else None
+        resource_descriptor.hash = resource_hash
+        resource_descriptor.old_hash = old_hash
+        resource_descriptor.data = ResourceData(resource_descriptor.path)
+        resource_descriptor.data.sha256 = sha256
+        resource_descriptor.data.len = data_len
+        resource_descriptor.shaders = []
+        resource_descriptor.parse_raw_shader_refs(raw_shader_refs)
+        return resource_descriptor
+
     def validate(self):
         if self.call_id is None:
             raise ValueError(f'Failed to parse raw descriptor "{self.raw}": no call id detected!')
@@ -230,7 +289,6 @@ class ResourceDescriptor:
             self.marked = True
             raw_call = raw_call.replace('!U!=', '')
         # Match call id
-        call_id_pattern = re.compile(r'^(\d+)-(.*)\.([a-z0-9]+)')
         result = call_id_pattern.findall(raw_call)
         # Return if call id not found
         if len(result) != 1:
@@ -243,14 +301,13 @@ class ResourceDescriptor:
         raw_refs = result[1]
         ext = result[2]
         # Match shader refs
-        shaders_pattern = re.compile(r'-([a-z]s=[a-f0-9]+)')
         raw_shaders_refs = shaders_pattern.findall(raw_refs)
         # Return if no shader refs found
         if len(raw_shaders_refs) < 1:
             return
         # Remove shaders refs from the raw string
         # Only resource ref should be left in raw string at this point
-        raw_resource_ref = re.sub(shaders_pattern, '', raw_refs)
+        raw_resource_ref = shaders_pattern.sub('', raw_refs)
 
         self.call_id = call_id
         self.ext = ext
@@ -283,7 +340,6 @@ class ResourceDescriptor:
             self.parse_raw_slot_ref(resource_desc[1], resource_desc[0])
 
     def parse_raw_slot_ref(self, raw_slot_ref, raw_shader_type):
-        slot_ref_pattern = re.compile(r'^([a-z]+)([0-9]+)?')
         result = slot_ref_pattern.findall(raw_slot_ref)
         if len(result) != 1:
             return
@@ -374,9 +430,10 @@ class WrappedResource:
             raise NotImplementedError
         if self.ext != 'buf':
             raise ValueError(f'Buffer loading is not supported for `.{self.ext}` resource {self}')
-        with open(self.data.path, 'rb') as f:
+        with tracer.span('Load buffer') as span:
             self.buffer = NumpyBuffer(layout)
-            self.buffer.import_raw_data(f.read())
+            self.buffer.import_raw_data(self.data.map(layout.get_numpy_type()))
+            span.add(bytes=self.buffer.data.nbytes)
 
     def get_format(self, call_id = None, header_fmt_text= None):
         if call_id:
@@ -395,6 +452,7 @@ class CallDescriptor:
         self.parameters = {}
         self.shaders = {}
         self.resources = {}
+        self.resources_index = None
 
     def import_resource_descriptor(self, resource_descriptor):
         if resource_descriptor.call_id != self.id:
@@ -405,22 +463,16 @@ class CallDescriptor:
             self.shaders[shader.raw] = shader
 
         self.resources[resource_descriptor.raw] = resource_descriptor
+        self.resources_index = None
 
     def hash_resources(self):
-        for resource in self.resources:
+        for resource in self.resources.values():
             resource.hash_data()
 
     def get_filtered_resources(self, filter_attributes):
-        resource_filter = Filter(
-            condition=FilterCondition.AND,
-            attributes_condition=FilterCondition.AND,
-            attributes=filter_attributes,
-            dictionaries_condition=FilterCondition.AND,
-            dictionaries=[
-                self.resources
-            ]
-        )
-        return DictFilter(resource_filter).filtered_dict
+        if self.resources_index is None:
+            self.resources_index = DictIndex(self.resources)
+        return self.resources_index.query(filter_attributes)
 
     def get_filtered_resource(self, filter_attributes):
         result = self.get_filtered_resources(filter_attributes)
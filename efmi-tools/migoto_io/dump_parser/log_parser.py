@@ -1,8 +1,11 @@
 import os
 import re
+import mmap
 
 from enum import Enum, auto
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
+
+from .filename_parser import ShaderType, SlotType
 
 
 @dataclass
@@ -34,72 +37,318 @@ class CallParameters(Enum):
     DrawIndexedInstanced = auto()
 
 
+call_parameters_classes = {
+    CallParameters.Dispatch: Dispatch,
+    CallParameters.DrawIndexed: DrawIndexed,
+    CallParameters.DrawIndexedInstanced: DrawIndexedInstanced,
+}
+
+
+@dataclass
+class FrameDumpShader:
+    type: ShaderType
+    pointer: str
+    hash: str
+    last_set_call_id: int = -1
+
+
+@dataclass
+class FrameDumpResource:
+    pointer: str
+    hash: str
+    last_set_call_id: int = -1
+
+
+# Patterns are compiled once on module import and matched against command arguments
+CALL_PARAMETERS_PATTERNS = {
+    'Dispatch': (
+        CallParameters.Dispatch,
+        re.compile(r'\(ThreadGroupCountX:(\d+), ThreadGroupCountY:(\d+), ThreadGroupCountZ:(\d+)\)'),
+        lambda data: Dispatch(int(data[0]), int(data[1]), int(data[2]))
+    ),
+    'DrawIndexed': (
+        CallParameters.DrawIndexed,
+        re.compile(r'\(IndexCount:(\d+), StartIndexLocation:(\d+), BaseVertexLocation:(-?\d+)\)'),
+        lambda data: DrawIndexed(int(data[0]), int(data[1]), int(data[2]))
+    ),
+    'DrawIndexedInstanced': (
+        CallParameters.DrawIndexedInstanced,
+        re.compile(r'\(IndexCountPerInstance:(\d+), InstanceCount:(\d+), StartIndexLocation:(\d+), BaseVertexLocation:(-?\d+), StartInstanceLocation:(\d+)\)'),
+        lambda data: DrawIndexedInstanced(int(data[0]), int(data[1]), int(data[2]), int(data[3]), int(data[4]))
+    ),
+}
+
+COMMAND_NAME_PATTERN = re.compile(r'\w+')
+# CSSetShader(pComputeShader:0x000001ECFC102310, ppClassInstances:0x0000000000000000, NumClassInstances:0) hash=743108cc03f39cbf
+SET_SHADER_PATTERN = re.compile(r'\(p\w*Shader:(0x[0-9a-fA-F]+)[^)]*\)(?:.* hash=([0-9a-fA-F]+))?')
+# PSSetShaderResources(StartSlot:0, NumViews:1, ppShaderResourceViews:0x000000BD5846E248)
+# VSSetConstantBuffers1(StartSlot:2, NumBuffers:1, ppConstantBuffers:0x000000BD5846C5F8, ...)
+# CSSetUnorderedAccessViews(StartSlot:0, NumUAVs:1, ppUnorderedAccessViews:0x000000BD5846E250, ...)
+SET_SLOTS_PATTERN = re.compile(r'\(StartSlot:(\d+), Num\w+:(\d+)')
+# IASetIndexBuffer(pIndexBuffer:0x000001ED5C1A1AF8, Format:57, Offset:0) hash=e07d9851
+SET_INDEX_BUFFER_PATTERN = re.compile(r'\(pIndexBuffer:(0x[0-9a-fA-F]+)[^)]*\)(?:.* hash=([0-9a-fA-F]+))?')
+# CopyResource(pDstResource:0x000001ED0D731CF8, pSrcResource:0x000001ED5B6B6DB8)
+COPY_RESOURCE_PATTERN = re.compile(r'\(pDstResource:(0x[0-9a-fA-F]+), pSrcResource:(0x[0-9a-fA-F]+)')
+# 0: view=0x000001ED1D4188D0 resource=0x000001ED0D731CF8 hash=2f103f55
+# 1: resource=0x000001ECE165C2B8 hash=f24bbeee
+# Src: resource=0x000001ED5B6B6DB8 hash=6590112a
+COMMAND_ENTRY_PATTERN = re.compile(r'(\w+): (?:view=0x[0-9a-fA-F]+ )?resource=(0x[0-9a-fA-F]+)(?:.* hash=([0-9a-fA-F]+))?')
+
+NULL_POINTER = '0x0000000000000000'
+
+SHADER_TYPE_PREFIXES = {
+    'CS': ShaderType.Compute,
+    'VS': ShaderType.Vertex,
+    'PS': ShaderType.Pixel,
+    'GS': ShaderType.Geometry,
+    'HS': ShaderType.Hull,
+    'DS': ShaderType.Domain,
+}
+
+IGNORED_COMMANDS = frozenset([
+    'Map', 'Unmap', 'GetData', 'IASetInputLayout', 'OMGetDepthStencilState',
+    'RSSetViewports', 'PSSetSamplers', 'RSSetState', 'OMSetBlendState', 'OMSetRenderTargets',
+    'ClearRenderTargetView', 'ClearDepthStencilView', 'End', 'CopySubresourceRegion', 'CSSetSamplers',
+    'OMSetDepthStencilState', 'IASetPrimitiveTopology', '3DMigoto', 'UpdateSubresource', 'VSSetSamplers',
+    'RSSetScissorRects', 'OMGetRenderTargets', 'Begin', 'Draw',
+])
+
+
 class FrameDumpCall:
     def __init__(self, call_id):
         self.id = call_id
+        self.raw_id = str(call_id).zfill(6)
         self.parameters = {}
-        self.patterns = {
-            CallParameters.Dispatch: (
-                re.compile(r'^Dispatch\(ThreadGroupCountX:(\d+), ThreadGroupCountY:(\d+), ThreadGroupCountZ:(\d+)\)'),
-                lambda data: Dispatch(int(data[0]), int(data[1]), int(data[2]))
-            ),
-            CallParameters.DrawIndexed: (
-                re.compile(r'^DrawIndexed\(IndexCount:(\d+), StartIndexLocation:(\d+), BaseVertexLocation:(\d+)\)'),
-                lambda data: DrawIndexed(int(data[0]), int(data[1]), int(data[2]))
-            ),
-            CallParameters.DrawIndexedInstanced: (
-                re.compile(r'^DrawIndexedInstanced\(IndexCountPerInstance:(\d+), InstanceCount:(\d+), StartIndexLocation:(\d+), BaseVertexLocation:(\d+), StartInstanceLocation:(\d+)\)'),
-                lambda data: DrawIndexedInstanced(int(data[0]), int(data[1]), int(data[2]), int(data[3]), int(data[4]))
-            ),
-        }
-
-    def import_data(self, raw_log_entry):
-        raw_log_entry = ' '.join(raw_log_entry)
-        for name, (pattern, decoder) in self.patterns.items():
-            result = pattern.findall(raw_log_entry)
-            if len(result) == 0:
-                continue
-            if len(result) != 1:
-                raise ValueError(f'More than 1 data entries for pattern {pattern} in {raw_log_entry}')
-            self.parameters[name] = decoder(result[0])
+        self.output_resources = []
+
+
+class FrameDumpModel:
+    """
+    Tracks shaders and resources bound to the pipeline while log is being parsed
+    Shaders are keyed by shader type id (i.e. `vs`) and resources by slot ref of dump filenames (i.e. `ps-t0`, `vb1`)
+    """
+    def __init__(self):
+        self.call = None
+        self.current_shaders = {}
+        self.current_resources = {}
+        self.shaders = {}
+        self.resources = {}
+        self.resource_copies = {}
+
+    def get_shader(self, pointer):
+        return self.shaders.get(pointer, None)
+
+    def set_shader(self, shader_type, pointer, hash):
+        shader = FrameDumpShader(ShaderType(shader_type), pointer, hash, self.call.id)
+        self.shaders[pointer] = shader
+        return shader
+
+    def get_current_shader(self, shader_type):
+        return self.current_shaders.get(shader_type, None)
+
+    def set_current_shader(self, shader_type, pointer, hash):
+        shader = self.get_shader(pointer)
+        if shader is None:
+            shader = self.set_shader(shader_type, pointer, hash)
+        self.current_shaders[shader_type] = shader
+        return shader
+
+    def clear_current_shader(self, shader_type):
+        self.current_shaders.pop(shader_type, None)
+
+    def get_resource(self, pointer):
+        return self.resources.get(pointer, None)
+
+    def set_resource(self, pointer, hash):
+        resource = FrameDumpResource(pointer, hash, self.call.id)
+        self.resources[pointer] = resource
+        return resource
+
+    def get_current_resource(self, slot):
+        return self.current_resources.get(slot, None)
+
+    def set_current_resource(self, slot, pointer, hash):
+        resource = self.resources.get(pointer, None)
+        if resource is None or (hash is not None and resource.hash != hash):
+            resource = self.set_resource(pointer, hash)
+        self.current_resources[slot] = resource
+        return resource
+
+    def clear_current_resource(self, slot):
+        self.current_resources.pop(slot, None)
 
 
 class FrameDumpLog:
-    def __init__(self, dump_path):
+    """
+    Single-pass parser of 3dmigoto frame dump log.txt
+    Log is memory-mapped and read line by line, each command is routed via dispatch table lookup by its name
+    Only call parameters are parsed by default, tracking of pipeline state (bound shaders and resources, resource copies
+    and SO targets) is enabled by `track_pipeline_state`, as it takes more time than the rest of parsing
+    If `calls_index` made by `export_calls_index` is provided, calls table is restored from it and log is not parsed
+    """
+    def __init__(self, dump_path, calls_index=None, track_pipeline_state=False):
         self.path = os.path.join(dump_path, 'log.txt')
         self.calls = {}
-        self.parse_log()
+        self.track_pipeline_state = track_pipeline_state
+        self.model = FrameDumpModel()
+        self.unknown_commands = set()
+        self.command_handlers = self.build_command_handlers()
+        if calls_index is None:
+            self.parse_log()
+        else:
+            self.import_calls_index(calls_index)
         self.validate()
 
     def validate(self):
         pass
 
+    def export_calls_index(self):
+        """
+        Returns calls table as plain builtins: {raw_call_id: ((parameters_name, parameters_values), ...)}
+        """
+        calls_index = {}
+        for raw_call_id, call in self.calls.items():
+            calls_index[raw_call_id] = tuple((name.name, astuple(parameters)) for name, parameters in call.parameters.items())
+        return calls_index
+
+    def import_calls_index(self, calls_index):
+        self.calls = {}
+        for raw_call_id, call_parameters in calls_index.items():
+            call = FrameDumpCall(int(raw_call_id))
+            for name, values in call_parameters:
+                name = CallParameters[name]
+                call.parameters[name] = call_parameters_classes[name](*values)
+            self.calls[raw_call_id] = call
+
+    def build_command_handlers(self):
+        """
+        Maps encoded command name to (command_handler, command_entry_handler, handler_context)
+        Context is shader type id for shader commands, slot ref prefix for slot commands and pattern for call parameters
+        """
+        handlers = {}
+        for command_name, call_parameters_pattern in CALL_PARAMETERS_PATTERNS.items():
+            handlers[command_name] = (self.handle_call_parameters, None, call_parameters_pattern)
+        if self.track_pipeline_state:
+            for prefix, shader_type in SHADER_TYPE_PREFIXES.items():
+                shader_type = shader_type.value
+                handlers[f'{prefix}SetShader'] = (self.handle_set_shader, None, shader_type)
+                handlers[f'{prefix}SetShaderResources'] = (self.handle_set_slots, self.handle_set_slots_entry, f'{shader_type}-{SlotType.Texture.value}')
+                handlers[f'{prefix}SetConstantBuffers'] = (self.handle_set_slots, self.handle_set_slots_entry, f'{shader_type}-{SlotType.ConstantBuffer.value}')
+                handlers[f'{prefix}SetConstantBuffers1'] = (self.handle_set_slots, self.handle_set_slots_entry, f'{shader_type}-{SlotType.ConstantBuffer.value}')
+            handlers['CSSetUnorderedAccessViews'] = (self.handle_set_slots, self.handle_set_slots_entry, f'{ShaderType.Compute.value}-{SlotType.UAV.value}')
+            handlers['IASetVertexBuffers'] = (self.handle_set_slots, self.handle_set_slots_entry, SlotType.VertexBuffer.value)
+            handlers['IASetIndexBuffer'] = (self.handle_set_index_buffer, None, SlotType.IndexBuffer.value)
+            handlers['CopyResource'] = (self.handle_copy_resource, self.handle_copy_resource_entry, None)
+            handlers['SOSetTargets'] = (None, self.handle_so_set_targets_entry, None)
+        # Lines are matched as raw bytes, so only lines of handled commands are decoded
+        return {command_name.encode(): command_handlers for command_name, command_handlers in handlers.items()}
+
     def parse_log(self):
         self.calls = {}
-        with (open(self.path, "r") as f):
-            lines = f.readlines()
+        if os.path.getsize(self.path) == 0:
+            return
+        command_handlers = self.command_handlers
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log:
             call = None
-            raw_log_entry = []
-            for line_id, line in enumerate(lines):
-                raw_call_id = line[0:6]
-                if raw_call_id.isnumeric():
-                    line_call_id = int(raw_call_id)
-                    if call is None:
-                        call = FrameDumpCall(line_call_id)
-                        self.calls[raw_call_id] = call
-                    elif line_call_id != call.id:
-                        call = FrameDumpCall(line_call_id)
-                        if line_call_id in self.calls:
+            raw_call_id = None
+            entry_handler = None
+            for line_id, line in enumerate(iter(log.readline, b'')):
+                line_call_id = line[0:6]
+                if line_call_id.isdigit():
+                    if line_call_id != raw_call_id:
+                        raw_call_id = line_call_id
+                        if raw_call_id.decode() in self.calls:
                             raise ValueError(f'Malformed log line {line_id}: '
-                                             f'data collection for call id {raw_call_id} was already finished, '
-                                             f'current call id: {call.id}')
-                        self.calls[raw_call_id] = call
-                    call.import_data(raw_log_entry)
-                    raw_log_entry = [line[7:]]
-                elif call is None:
-                    continue
-                else:
-                    raw_log_entry.append(line.strip())
-            # Handle last line of the log
-            call.import_data(raw_log_entry)
+                                             f'data collection for call id {raw_call_id.decode()} was already finished, '
+                                             f'current call id: {call.raw_id}')
+                        call = FrameDumpCall(int(raw_call_id))
+                        self.calls[call.raw_id] = call
+                        self.model.call = call
+                    entry_handler = None
+                    # Command name is followed by its arguments in brackets: `000001 Dispatch(ThreadGroupCountX:1, ...)`
+                    name_end = line.find(b'(', 7)
+                    handlers = command_handlers.get(line[7:name_end], None) if name_end != -1 else None
+                    if handlers is None:
+                        if self.track_pipeline_state:
+                            self.register_unknown_command(line[7:])
+                        continue
+                    command_handler, command_entry_handler, context = handlers
+                    if command_handler is not None:
+                        command_handler(line[name_end:].decode('utf-8', errors='replace').rstrip(), context)
+                    if command_entry_handler is not None:
+                        entry_handler = command_entry_handler, context
+                elif entry_handler is not None:
+                    command_entry_handler, context = entry_handler
+                    command_entry_handler(line.decode('utf-8', errors='replace').strip(), context)
+        if len(self.unknown_commands) > 0:
+            print(f'Unknown frame dump log commands: {", ".join(sorted(self.unknown_commands))}')
+
+    def register_unknown_command(self, command):
+        match = COMMAND_NAME_PATTERN.match(command.decode('utf-8', errors='replace'))
+        if match is not None and match.group(0) not in IGNORED_COMMANDS:
+            self.unknown_commands.add(match.group(0))
+
+    # Command handlers
+
+    def handle_call_parameters(self, args, call_parameters_pattern):
+        name, pattern, decoder = call_parameters_pattern
+        result = pattern.match(args)
+        if result is not None:
+            self.model.call.parameters[name] = decoder(result.groups())
+
+    def handle_set_shader(self, args, shader_type):
+        result = SET_SHADER_PATTERN.match(args)
+        if result is None:
+            return
+        shader_pointer, shader_hash = result.groups()
+        if shader_pointer != NULL_POINTER and shader_hash is not None:
+            self.model.set_current_shader(shader_type, shader_pointer, shader_hash)
+        else:
+            self.model.clear_current_shader(shader_type)
+
+    def handle_set_slots(self, args, slot_prefix):
+        result = SET_SLOTS_PATTERN.match(args)
+        if result is None:
+            return
+        start_slot, num_slots = int(result.group(1)), int(result.group(2))
+        for slot_id in range(start_slot, start_slot + num_slots):
+            self.model.clear_current_resource(f'{slot_prefix}{slot_id}')
+
+    def handle_set_index_buffer(self, args, slot):
+        result = SET_INDEX_BUFFER_PATTERN.match(args)
+        if result is None:
+            return
+        pointer, ib_hash = result.groups()
+        if pointer != NULL_POINTER:
+            self.model.set_current_resource(slot, pointer, ib_hash)
+        else:
+            self.model.clear_current_resource(slot)
+
+    def handle_copy_resource(self, args, context):
+        result = COPY_RESOURCE_PATTERN.match(args)
+        if result is not None:
+            self.model.resource_copies[result.group(1)] = result.group(2)
+
+    # Command entry handlers
+
+    def handle_set_slots_entry(self, line, slot_prefix):
+        result = COMMAND_ENTRY_PATTERN.match(line)
+        if result is None or not result.group(1).isdigit():
+            return
+        slot_id, pointer, resource_hash = result.groups()
+        self.model.set_current_resource(f'{slot_prefix}{slot_id}', pointer, resource_hash)
+
+    def handle_copy_resource_entry(self, line, context):
+        result = COMMAND_ENTRY_PATTERN.match(line)
+        if result is None:
+            return
+        direction, pointer, resource_hash = result.groups()
+        if direction == 'Dst' or (direction == 'Src' and pointer not in self.model.resources):
+            self.model.set_resource(pointer, resource_hash)
 
+    def handle_so_set_targets_entry(self, line, context):
+        result = COMMAND_ENTRY_PATTERN.match(line)
+        if result is None:
+            return
+        slot_id, pointer, resource_hash = result.groups()
+        self.model.call.output_resources.append(self.model.set_resource(pointer, resource_hash))
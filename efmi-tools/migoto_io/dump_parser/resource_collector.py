@@ -3,7 +3,7 @@ import time
 from typing import Union, List, Dict, Optional
 from dataclasses import dataclass
 
-from ..data_model.byte_buffer import ByteBuffer, BufferLayout, IndexBuffer, MigotoFormat, NumpyBuffer
+from ..data_model.byte_buffer import BufferLayout, IndexBuffer, MigotoFormat, NumpyBuffer
 
 from .filename_parser import SlotType, ShaderType, SlotId, ResourceDescriptor, WrappedResource, ResourceConflict
 
@@ -32,7 +32,7 @@ class DataMap:
 class ResourceCollector:
     shader_resources: Dict[str, DataMap]
     call_branches: Dict[str, ShaderCallBranch] = None
-    cache: Dict[str, Union[ByteBuffer, IndexBuffer]] = None
+    cache: Dict[str, Union[NumpyBuffer, IndexBuffer]] = None
 
     def __post_init__(self):
         self.cache = {}
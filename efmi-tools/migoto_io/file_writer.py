@@ -0,0 +1,232 @@
+import os
+import stat
+import hashlib
+import uuid
+import shutil
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Union, List, Dict, Optional
+
+from .tracing import tracer
+
+
+class FileWriter:
+    """
+    Bounded thread pool for concurrent file writes and copies
+    Every file is written to a temporary sibling first and atomically renamed to the destination on completion,
+    so interrupted export never leaves partially written files in place of the old ones
+    """
+    def __init__(self, workers_count: int = 0, max_pending: int = 0):
+        self.workers_count = workers_count or min(32, (os.cpu_count() or 1) + 4)
+        # Limits amount of queued jobs (and data referenced by them) to keep memory usage in check
+        self.pending = threading.BoundedSemaphore(max_pending or self.workers_count * 2)
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.futures: List[Future] = []
+
+    def __enter__(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.workers_count)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.wait()
+        finally:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def write(self, path: Path, data: Union[bytes, bytearray, str]):
+        self.submit(self.write_atomic, Path(path), data)
+
+    def copy(self, src_path: Path, dst_path: Path):
+        self.submit(self.copy_atomic, Path(src_path), Path(dst_path))
+
+    def submit(self, fn, *args):
+        if self.executor is None:
+            raise ValueError('FileWriter must be used as context manager!')
+        self.pending.acquire()
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self.pending.release()
+            raise
+        future.add_done_callback(lambda _: self.pending.release())
+        self.futures.append(future)
+
+    def wait(self):
+        """
+        Waits for all submitted jobs to complete and re-raises the first encountered error
+        """
+        futures, self.futures = self.futures, []
+        error = None
+        for future in futures:
+            exception = future.exception()
+            if exception is not None and error is None:
+                error = exception
+        if error is not None:
+            raise error
+
+    @staticmethod
+    def get_temp_path(path: Path) -> Path:
+        return path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+
+    def write_atomic(self, path: Path, data: Union[bytes, bytearray, str]):
+        temp_path = self.get_temp_path(path)
+        try:
+            with tracer.span('Write file', bytes=len(data)):
+                if isinstance(data, str):
+                    with open(temp_path, 'w', encoding='utf-8') as f:
+                        f.write(data)
+                else:
+                    with open(temp_path, 'wb') as f:
+                        f.write(data)
+                os.replace(temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def copy_atomic(self, src_path: Path, dst_path: Path):
+        temp_path = self.get_temp_path(dst_path)
+        try:
+            with tracer.span('Copy file'):
+                shutil.copyfile(src_path, temp_path)
+                os.replace(temp_path, dst_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+
+def make_read_only(path: Path):
+    os.chmod(path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+
+
+def remove_file(path: Path):
+    """
+    Removes file even if it's read-only (Windows refuses to delete or replace such files)
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+        os.unlink(path)
+
+
+def replace_file(src_path: Path, dst_path: Path):
+    """
+    Atomically replaces dst_path with src_path, read-only destination is made writable first
+    """
+    try:
+        os.replace(src_path, dst_path)
+    except PermissionError:
+        if not os.path.isfile(dst_path) or os.access(dst_path, os.W_OK):
+            raise
+        os.chmod(dst_path, stat.S_IREAD | stat.S_IWRITE)
+        os.replace(src_path, dst_path)
+
+
+class ContentStore:
+    """
+    Content-addressed file cache, every unique file is stored once and linked to its destinations
+    Entries are keyed by sha256 of file data, so entry is reused only for sources with exactly the same content
+    Hardlinks are used when possible, falling back to plain copies if file system doesn't support them
+    Hardlinked files share data with the store entry and each other, so entries are made read-only to keep in-place edit
+    of one object's file from changing files of other objects. Edit is possible only via saving to the new file,
+    which replaces the link. If entry was edited anyway, it's detected by stats recorded on adding and stored again.
+    """
+    def __init__(self, store_directory: Path):
+        self.store_directory = Path(store_directory)
+        self.lock = threading.Lock()
+        self.key_locks: Dict[str, threading.Lock] = {}
+        # Source files stay unchanged while store is in use, so each one is hashed only once
+        self.file_keys: Dict[Path, str] = {}
+
+    def get_path(self, key: str, suffix: str = '') -> Path:
+        return self.store_directory / key[:2] / f'{key}{suffix}'
+
+    @staticmethod
+    def get_stat_path(store_path: Path) -> Path:
+        return store_path.with_name(f'{store_path.name}.stat')
+
+    @staticmethod
+    def format_stat(store_path: Path) -> str:
+        store_stat = store_path.stat()
+        return f'{store_stat.st_size} {store_stat.st_mtime_ns}'
+
+    def get_file_key(self, src_path: Path) -> str:
+        """
+        Returns sha256 of source file data, reading it in chunks to keep memory usage low for large textures
+        """
+        key = self.file_keys.get(src_path, None)
+        if key is not None:
+            return key
+        hasher = hashlib.sha256()
+        with open(src_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        key = hasher.hexdigest()
+        with self.lock:
+            self.file_keys[src_path] = key
+        return key
+
+    def get_key_lock(self, key: str) -> threading.Lock:
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def is_stored(self, store_path: Path) -> bool:
+        """
+        Checks that entry exists and wasn't changed since it was added
+        """
+        try:
+            with open(self.get_stat_path(store_path), 'r') as f:
+                return f.read() == self.format_stat(store_path)
+        except OSError:
+            return False
+
+    def add(self, src_path: Path, key: str) -> Path:
+        src_path = Path(src_path)
+        store_path = self.get_path(key, src_path.suffix)
+        # Lock prevents concurrent jobs from storing the same key twice and linking to different copies
+        with self.get_key_lock(key):
+            if self.is_stored(store_path):
+                return store_path
+            store_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = FileWriter.get_temp_path(store_path)
+            try:
+                shutil.copyfile(src_path, temp_path)
+                replace_file(temp_path, store_path)
+            except BaseException:
+                remove_file(temp_path)
+                raise
+            make_read_only(store_path)
+            with open(self.get_stat_path(store_path), 'w') as f:
+                f.write(self.format_stat(store_path))
+        return store_path
+
+    def link(self, src_path: Path, dst_path: Path, key: Optional[str] = None):
+        """
+        Adds file to the store and atomically places its link at dst_path
+        Key must be sha256 of file data, if it's not known it's calculated from the source file
+        """
+        src_path = Path(src_path)
+        if key is None:
+            key = self.get_file_key(src_path)
+        store_path = self.add(src_path, key)
+        dst_path = Path(dst_path)
+        temp_path = FileWriter.get_temp_path(dst_path)
+        try:
+            try:
+                os.link(store_path, temp_path)
+            except OSError:
+                # Different volumes, FAT32 or other file system without hardlinks support
+                shutil.copyfile(store_path, temp_path)
+            replace_file(temp_path, dst_path)
+        except BaseException:
+            if temp_path.exists():
+                remove_file(temp_path)
+                # Link shares permissions with the entry, so they're restored after removal of read-only link
+                make_read_only(store_path)
+            raise
@@ -6,52 +6,40 @@ Intended to work with 3dm buffers outside of Blender API
 
 import numpy as np
 
-from ..data_model.byte_buffer import ByteBuffer, IndexBuffer, AbstractSemantic, Semantic
+from ..data_model.byte_buffer import NumpyBuffer, IndexBuffer, AbstractSemantic, Semantic
 
 
 class MeshObject:
-    def __init__(self, ib_buffer: IndexBuffer, vb_buffer: ByteBuffer):
+    def __init__(self, ib_buffer: IndexBuffer, vb_buffer: NumpyBuffer):
         self.ib_buffer = ib_buffer
         self.vb_buffer = vb_buffer
 
     def get_vg_count(self):
-        return max(self.vb_buffer.get_values(AbstractSemantic(Semantic.Blendindices))) + 1
+        return int(self.get_vertex_groups().max()) + 1
 
     def get_face_count(self):
-        return self.ib_buffer.num_elements
+        return len(self.get_faces())
 
     def get_vertex_count(self):
-        return self.vb_buffer.num_elements
+        return len(self.vb_buffer)
 
-    def get_face(self, face_id):
-        return self.ib_buffer.get_element(face_id)
+    def get_faces(self):
+        return self.ib_buffer.get_numpy_array().reshape(-1, 3)
 
-    def get_vertex(self, vertex_id):
-        return self.vb_buffer.get_element(vertex_id)
+    def get_positions(self):
+        return self.vb_buffer.get_values(AbstractSemantic(Semantic.Position))
 
-    def get_face_vertex_ids(self, face):
-        if isinstance(face, int):
-            face = self.get_face(face)
-        return face.get_value(AbstractSemantic(Semantic.Index))
+    def get_vertex_groups(self):
+        vertex_groups = self.vb_buffer.get_values(AbstractSemantic(Semantic.Blendindices))
+        return vertex_groups.reshape(len(vertex_groups), -1)
 
-    def get_vertex_position(self, vertex):
-        if isinstance(vertex, int):
-            vertex = self.get_vertex(vertex)
-        return vertex.get_value(AbstractSemantic(Semantic.Position))
+    def get_weights(self):
+        weights = self.vb_buffer.get_values(AbstractSemantic(Semantic.Blendweight))
+        return weights.reshape(len(weights), -1)
 
-    def get_vertex_groups(self, vertex):
-        if isinstance(vertex, int):
-            vertex = self.get_vertex(vertex)
-        return vertex.get_value(AbstractSemantic(Semantic.Blendindices))
-
-    def get_weights(self, vertex):
-        if isinstance(vertex, int):
-            vertex = self.get_vertex(vertex)
-        return vertex.get_value(AbstractSemantic(Semantic.Blendweight))
-
-    def get_triangle_area(self, vertex_ids):
-        triangle = np.array([[self.get_vertex_position(vertex_id) for vertex_id in vertex_ids]])
-        return float(self.calc_area(triangle))
+    def get_triangle_areas(self):
+        positions = np.asarray(self.get_positions(), dtype=np.float64)[:, :3]
+        return self.calc_area(positions[self.get_faces()])
 
     @staticmethod
     def calc_normal(triangles):
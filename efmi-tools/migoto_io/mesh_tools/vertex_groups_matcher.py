@@ -13,76 +13,67 @@ def match_vertex_groups(base_obj: MeshObject, target_obj: MeshObject):
     Evaluates VG layout of two MeshObject's and returns VG map matching VGs of base object to VGs of target object
     """
     vg_map = {}
-    
+
     # Precompute centers for all target vertex groups
-    target_centers = {}
-    target_influence_area = calculate_vertex_influence_area(target_obj)
-    for target_group_id in range(target_obj.get_vg_count()):
-        target_centers[target_group_id] = get_weighted_center(target_obj, target_group_id, target_influence_area)
+    target_centers = get_weighted_centers(target_obj, calculate_vertex_influence_area(target_obj))
+    target_valid = ~np.isnan(target_centers[:, 0])
 
     # Perform the matching and renaming process
-    base_influence_area = calculate_vertex_influence_area(base_obj)
-    for base_group_id in range(base_obj.get_vg_count()):
-        base_center = get_weighted_center(base_obj, base_group_id, base_influence_area)
-        if base_center is None:
+    base_centers = get_weighted_centers(base_obj, calculate_vertex_influence_area(base_obj))
+
+    for base_group_id, base_center in enumerate(base_centers):
+        if np.isnan(base_center[0]):
             continue
 
-        best_match = None
-        best_distance = float('inf')
+        if not target_valid.any():
+            vg_map[base_group_id] = -1
+            continue
 
-        for target_group_name, target_center in target_centers.items():
-            if target_center is None:
-                continue
+        distances = np.linalg.norm(target_centers - base_center, axis=1)
+        distances[~target_valid] = np.inf
+        best_match = int(np.argmin(distances))
 
-            distance = np.linalg.norm(base_center - target_center)
-            if distance < best_distance:
-                best_distance = distance
-                best_match = target_group_name
-
-        if best_match is not None:
-            if base_group_id != best_match:
-                vg_map[base_group_id] = best_match
-        else:
-            vg_map[base_group_id] = -1
+        if base_group_id != best_match:
+            vg_map[base_group_id] = best_match
 
     return vg_map
 
 
 def calculate_vertex_influence_area(obj: MeshObject):
-    vertex_area = [0.0] * obj.get_vertex_count()
+    vertex_area = np.zeros(obj.get_vertex_count(), dtype=np.float64)
 
-    for face_id in range(obj.get_face_count()):
-        # Assuming the area is evenly distributed among the vertices
-        vertex_ids = obj.get_face_vertex_ids(face_id)
-        area_per_vertex = obj.get_triangle_area(vertex_ids) / 3
-        for vertex_id in vertex_ids:
-            vertex_area[vertex_id] += area_per_vertex
+    # Assuming the area is evenly distributed among the vertices
+    area_per_vertex = obj.get_triangle_areas() / 3
+    np.add.at(vertex_area, obj.get_faces(), area_per_vertex[:, None])
 
     return vertex_area
 
 
-def get_weighted_center(obj: MeshObject, vg_id, vertex_influence_area):
-    total_weight_area = 0.0
-    weighted_position_sum = np.array((0.0, 0.0, 0.0))
+def get_weighted_centers(obj: MeshObject, vertex_influence_area):
+    """
+    Returns (vg_count, 3) array of weighted centers of all VGs, VGs without any influence are filled with NaN
+    """
+    vg_count = obj.get_vg_count()
+
+    vertex_groups = obj.get_vertex_groups().astype(np.int64)
+    weights = np.asarray(obj.get_weights(), dtype=np.float64)
+    positions = np.asarray(obj.get_positions(), dtype=np.float64)[:, :3]
 
-    for vertex_id in range(obj.get_vertex_count()):
-        vertex = obj.get_vertex(vertex_id)
+    weight_areas = weights * vertex_influence_area[:, None]
+    weight_areas[weight_areas <= 0] = 0
 
-        vertex_groups = obj.get_vertex_groups(vertex)
-        weights = obj.get_weights(vertex)
-        weight = 0.0
-        for idx, vertex_group in enumerate(vertex_groups):
-            if vertex_group == vg_id:
-                weight += weights[idx]
+    vertex_groups = vertex_groups.ravel()
+    weight_areas_flat = weight_areas.ravel()
+    vertex_ids = np.repeat(np.arange(len(positions)), weights.shape[1])
 
-        influence_area = vertex_influence_area[vertex_id]
-        weight_area = weight * influence_area
+    total_weight_area = np.bincount(vertex_groups, weights=weight_areas_flat, minlength=vg_count)
+    weighted_position_sum = np.stack([
+        np.bincount(vertex_groups, weights=weight_areas_flat * positions[vertex_ids, axis], minlength=vg_count)
+        for axis in range(3)
+    ], axis=1)
 
-        if weight_area > 0:
-            weighted_position_sum += np.array(obj.get_vertex_position(vertex)) * weight_area
-            total_weight_area += weight_area
+    centers = np.full((vg_count, 3), np.nan)
+    valid = total_weight_area > 0
+    centers[valid] = weighted_position_sum[valid] / total_weight_area[valid, None]
 
-    if total_weight_area > 0:
-        return weighted_position_sum / total_weight_area
-    else:
-        return None
+    return centers
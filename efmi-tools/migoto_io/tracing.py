@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import threading
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Optional
+
+
+@dataclass
+class Span:
+    name: str
+    thread_id: int
+    start: float
+    end: float = 0.0
+    parent: Optional['Span'] = None
+    args: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def add(self, **counters: int):
+        """
+        Increments named counters of the span, i.e. `span.add(count=1, bytes=len(data))`
+        """
+        for name, value in counters.items():
+            self.args[name] = self.args.get(name, 0) + value
+
+
+class NullSpan:
+    """
+    Stand-in for spans opened outside of tracing session, so instrumented code doesn't have to check for it
+    """
+    def add(self, **counters: int):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """
+    Records nested timed spans of operation started by `session`, spans opened outside of session cost nearly nothing
+    On session end prints summary tree of all spans and optionally writes them as Chrome trace-event JSON,
+    which can be opened in chrome://tracing or ui.perfetto.dev
+    Spans of worker threads are recorded as roots of their own threads
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.spans: List[Span] = []
+        self.session_name: Optional[str] = None
+        self.session_start: float = 0.0
+
+    @contextmanager
+    def session(self, name: str, trace_directory: Optional[Path] = None):
+        if self.session_name is not None:
+            with self.span(name) as span:
+                yield span
+            return
+        self.spans = []
+        self.session_name = name
+        self.session_start = time.perf_counter()
+        try:
+            with self.span(name) as span:
+                yield span
+        finally:
+            self.session_name = None
+            self.print_summary()
+            if trace_directory is not None:
+                trace_path = Path(trace_directory) / f'{name} {time.strftime("%Y-%m-%d %H-%M-%S")}.json'
+                self.write_chrome_trace(trace_path)
+                print(f'Performance trace written to {trace_path}')
+
+    @contextmanager
+    def span(self, name: str, **counters: int):
+        if self.session_name is None:
+            yield NULL_SPAN
+            return
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        span = Span(name, threading.get_ident(), time.perf_counter(), parent=stack[-1] if stack else None, args=dict(counters))
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+            with self.lock:
+                self.spans.append(span)
+
+    def get_summary(self) -> List[tuple]:
+        """
+        Returns (depth, name, calls, total duration, counters) rows of spans aggregated by their path from the root
+        """
+        nodes = {}
+        with self.lock:
+            spans = list(self.spans)
+        for span in sorted(spans, key=lambda s: s.start):
+            path = [span.name]
+            parent = span.parent
+            while parent is not None:
+                path.insert(0, parent.name)
+                parent = parent.parent
+            path = tuple(path)
+            node = nodes.get(path, None)
+            if node is None:
+                node = nodes[path] = [0, 0.0, {}, span.start]
+            node[0] += 1
+            node[1] += span.duration
+            for counter, value in span.args.items():
+                node[2][counter] = node[2].get(counter, 0) + value
+        # Children are listed right after their parents in order of the first call
+        ordered_paths = sorted(nodes.keys(), key=lambda path: [nodes[path[:i + 1]][3] for i in range(len(path))])
+        return [(len(path) - 1, path[-1], *nodes[path][:3]) for path in ordered_paths]
+
+    def print_summary(self):
+        for depth, name, calls, duration, counters in self.get_summary():
+            details = [f'{calls} calls'] if calls > 1 else []
+            for counter, value in counters.items():
+                details.append(f'{value / 1048576:.2f} MB' if counter == 'bytes' else f'{counter}: {value}')
+            details = f' ({", ".join(details)})' if details else ''
+            print(f'{"  " * depth}{name} time: {duration:.3f}s{details}')
+
+    def write_chrome_trace(self, path: Path):
+        pid = os.getpid()
+        with self.lock:
+            spans = list(self.spans)
+        events = [{
+            'name': span.name,
+            'ph': 'X',
+            'ts': (span.start - self.session_start) * 1000000,
+            'dur': span.duration * 1000000,
+            'pid': pid,
+            'tid': span.thread_id,
+            'args': span.args,
+        } for span in sorted(spans, key=lambda s: s.start)]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+tracer = Tracer()